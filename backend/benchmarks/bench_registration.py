@@ -0,0 +1,39 @@
+"""
+Registration rush: add students one at a time through add_student and report
+insert latency per block as the roster grows. Latency should stay flat.
+
+    python backend/benchmarks/bench_registration.py --students 20000 --block 2000
+"""
+import argparse
+import os
+import statistics
+import time
+
+from common import make_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=20_000)
+    parser.add_argument('--block', type=int, default=2_000)
+    args = parser.parse_args()
+
+    # Lift the PreData cap so the roster can grow past the 100 student preset
+    os.environ['PREDATA_DOUBLE_ROOMS'] = str(args.students)
+    app = make_app()
+    from src.controllers.lottery import add_student
+
+    with app.app_context():
+        latencies = []
+        for i in range(args.students):
+            started = time.perf_counter()
+            add_student(name=f'Student {i}', gpa=3.0)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if len(latencies) == args.block:
+                print(f"roster {i + 1:>8}: p50 {statistics.median(latencies):.3f} ms, "
+                      f"p99 {sorted(latencies)[int(len(latencies) * 0.99)]:.3f} ms")
+                latencies = []
+
+
+if __name__ == '__main__':
+    main()
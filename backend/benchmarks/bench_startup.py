@@ -0,0 +1,89 @@
+"""
+Measure worker cold start: a fresh interpreter importing the app, building it
+and serving its first request, plus an import-time profile of the slowest
+modules.
+
+    python backend/benchmarks/bench_startup.py --runs 10
+    python backend/benchmarks/bench_startup.py --runs 10 --target-ms 450 --importtime 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import BACKEND_DIR
+
+# Run in the child: boot and first-request times, as "boot_ms first_request_ms"
+CHILD = """
+import time
+started = time.perf_counter()
+from src.app import create_app
+app = create_app()
+booted = time.perf_counter()
+status = app.test_client().get('/api/preData/students').status_code
+assert status == 200, status
+print((booted - started) * 1000, (time.perf_counter() - booted) * 1000)
+"""
+
+
+def child_env(db_path):
+    return {**os.environ, 'DB_PATH': db_path}
+
+
+def cold_start(db_path):
+    """Milliseconds from spawning the interpreter to the first response, and the child's own split"""
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD], cwd=BACKEND_DIR, env=child_env(db_path),
+        check=True, capture_output=True, text=True
+    ).stdout
+    total = (time.perf_counter() - started) * 1000
+    boot, first = (float(v) for v in out.split())
+    return total, boot, first
+
+
+def import_profile(db_path, top):
+    """The `top` modules with the highest cumulative import time (python -X importtime)"""
+    err = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from src.app import create_app; create_app()'],
+        cwd=BACKEND_DIR, env=child_env(db_path), check=True, capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--importtime', type=int, default=0, metavar='N', help='also print the N slowest imports')
+    parser.add_argument('--target-ms', type=float, help='exit non-zero if the median exceeds this')
+    args = parser.parse_args()
+
+    db_path = tempfile.mktemp(prefix='bench-', suffix='.db')
+    cold_start(db_path)  # create and stamp the schema once, and warm the bytecode cache
+
+    samples = [cold_start(db_path) for _ in range(args.runs)]
+    total, boot, first = (statistics.median(s[i] for s in samples) for i in range(3))
+    print(f"time to first request {total:7.1f} ms  "
+          f"(boot {boot:6.1f} ms, first request {first:6.1f} ms; median of {args.runs})")
+
+    if args.importtime:
+        print("\nslowest imports (cumulative):")
+        for cumulative, name in import_profile(db_path, args.importtime):
+            print(f"{cumulative / 1000:9.1f} ms  {name}")
+
+    if args.target_ms is not None and total > args.target_ms:
+        print(f"\ntime to first request {total:.1f} ms exceeds the {args.target_ms:.0f} ms target")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Shared setup for benchmark scripts - a throwaway app on its own SQLite file
+"""
+import os
+import random
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def make_app(db_path=None):
+    """Create the Flask app against `db_path` (a fresh temp file by default)"""
+    os.environ['DB_PATH'] = db_path or tempfile.mktemp(prefix='bench-', suffix='.db')
+    from src.app import create_app
+    return create_app()
+
+
+def synthetic_students(n, seed=0):
+    """Rows for a bulk insert into a students table"""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': f'stu-{i:03d}',
+            'seq': i,
+            'name': f'Student {i}',
+            'gpa': round(rng.uniform(0.0, 5.0), 2),
+            'corruption': rng.random() < 0.1,
+            'disabled': rng.random() < 0.1,
+            # Roommate preferences, so runs exercise compatibility matching
+            'sleep_schedule': rng.randint(1, 5),
+            'noise_tolerance': rng.randint(1, 5),
+            'study_habits': rng.randint(1, 5)
+        }
+        for i in range(1, n + 1)
+    ]
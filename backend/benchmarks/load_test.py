@@ -0,0 +1,241 @@
+"""
+Load generator for a running server: replays a registration rush and a
+results-day traffic mix against the preData and realtime APIs from many
+concurrent clients and reports requests/s and p50/p99 latency.
+
+    python backend/src/serve.py --workers 4 --threads 8 &
+    python backend/benchmarks/load_test.py --concurrency 32 --duration 20
+    python backend/benchmarks/load_test.py --scenario results --no-setup --output load.json
+
+- registration: students being added and withdrawn on both systems while
+  others page through the roster; adds past capacity are answered 400
+  and show up in the status counts
+- results: the published assignments being read - mostly first pages and
+  If-None-Match polls, some full lists, runs and the realtime board
+
+Setup (skip with --no-setup) clears both systems; for results it then
+fills them (dummy data, realtime students up to capacity) and runs both
+lotteries, which needs the default room presets. The data is left behind.
+"""
+import argparse
+import http.client
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from urllib.parse import urlsplit
+
+from suite import percentile
+
+SCENARIOS = {
+    "registration": {
+        "predata_add": 30,
+        "predata_delete": 25,
+        "predata_students_page": 20,
+        "realtime_add": 8,
+        "realtime_delete": 7,
+        "realtime_students": 10,
+    },
+    "results": {
+        "predata_assignments_page": 25,
+        "predata_assignments_304": 25,
+        "predata_assignments": 10,
+        "predata_runs": 10,
+        "realtime_assignments": 20,
+        "realtime_students": 10,
+    },
+}
+
+
+class Client:
+    """One keep-alive connection; requests return (status, parsed JSON body or None, response)"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port, self.prefix = parts.hostname, parts.port or 80, parts.path.rstrip("/")
+        self.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.conn.request(method, self.prefix + path, body, headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # The server closed an idle connection (or a worker was recycled): reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    raise
+        is_json = response.getheader("Content-Type", "").startswith("application/json")
+        return response.status, json.loads(data) if is_json and data else None, response
+
+
+class Traffic:
+    """The requests of both scenarios, sharing the ids of the students this run created"""
+
+    def __init__(self):
+        self.created = {"preData": deque(), "realtime": deque()}
+        self.etag = None
+
+    def _add(self, client, system):
+        student = {"name": f"Load {random.randrange(10 ** 6)}", "gpa": round(random.uniform(0, 5), 2)}
+        status, body, _ = client.request("POST", f"/api/{system}/addStudent", student)
+        if status == 201:
+            self.created[system].append(body["id"])
+        return status
+
+    def _delete(self, client, system):
+        try:
+            student_id = self.created[system].popleft()
+        except IndexError:
+            return self._add(client, system)
+        return client.request("DELETE", f"/api/{system}/deleteStudent/{student_id}")[0]
+
+    def predata_add(self, client):
+        return self._add(client, "preData")
+
+    def predata_delete(self, client):
+        return self._delete(client, "preData")
+
+    def realtime_add(self, client):
+        return self._add(client, "realtime")
+
+    def realtime_delete(self, client):
+        return self._delete(client, "realtime")
+
+    def predata_students_page(self, client):
+        return client.request("GET", "/api/preData/students?limit=100")[0]
+
+    def realtime_students(self, client):
+        return client.request("GET", "/api/realtime/students")[0]
+
+    def predata_assignments_page(self, client):
+        return client.request("GET", "/api/preData/assignments?limit=100")[0]
+
+    def predata_assignments(self, client):
+        return client.request("GET", "/api/preData/assignments")[0]
+
+    def predata_assignments_304(self, client):
+        return client.request("GET", "/api/preData/assignments", headers={"If-None-Match": self.etag or ""})[0]
+
+    def predata_runs(self, client):
+        return client.request("GET", "/api/preData/runs")[0]
+
+    def realtime_assignments(self, client):
+        return client.request("GET", "/api/realtime/assignments")[0]
+
+
+def expect(result, status, step):
+    if result[0] != status:
+        sys.exit(f"setup: {step} returned {result[0]}: {result[1]}")
+    return result
+
+
+def setup(client, traffic, scenario):
+    """Clear both systems; for results, fill them and run both lotteries"""
+    for system in ("preData", "realtime"):
+        expect(client.request("POST", f"/api/{system}/clear"), 200, f"{system} clear")
+    if scenario != "results":
+        return
+    expect(client.request("POST", "/api/preData/dummyData"), 201, "preData dummyData")
+    capacity = expect(client.request("GET", "/api/realtime/students"), 200, "realtime students")[1]["max"]
+    for i in range(capacity):
+        student = {"name": f"Realtime {i}", "gpa": round(random.uniform(0, 5), 2)}
+        expect(client.request("POST", "/api/realtime/addStudent", student), 201, "realtime addStudent")
+    for system in ("preData", "realtime"):
+        expect(client.request("POST", f"/api/{system}/runTheLottery"), 200, f"{system} runTheLottery")
+    traffic.etag = client.request("GET", "/api/preData/assignments")[2].getheader("ETag")
+
+
+def drive(url, traffic, mix, concurrency, duration):
+    """Send requests drawn from `mix` from `concurrency` client threads for `duration` seconds"""
+    ops, weights = list(mix), list(mix.values())
+    samples = defaultdict(list)  # op -> [(latency ms, status)]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client_loop(seed):
+        rng = random.Random(seed)
+        client = Client(url)
+        local = defaultdict(list)
+        while time.perf_counter() < deadline:
+            op = rng.choices(ops, weights)[0]
+            started = time.perf_counter()
+            try:
+                status = getattr(traffic, op)(client)
+            except (http.client.HTTPException, OSError):
+                status = 0
+            local[op].append(((time.perf_counter() - started) * 1000, status))
+        with lock:
+            for op, values in local.items():
+                samples[op].extend(values)
+
+    threads = [threading.Thread(target=client_loop, args=(seed,)) for seed in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(op, values, elapsed):
+    latencies = [latency for latency, _ in values]
+    return {
+        "op": op,
+        "requests": len(values),
+        "rps": round(len(values) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "statuses": dict(sorted(Counter(status for _, status in values).items()))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay registration-rush and results-day traffic against a running server")
+    parser.add_argument("--url", default="http://127.0.0.1:3001")
+    parser.add_argument("--scenario", choices=tuple(SCENARIOS) + ("both",), default="both")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per scenario")
+    parser.add_argument("--no-setup", dest="setup", action="store_false", help="use the data already on the server")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    scenarios = tuple(SCENARIOS) if args.scenario == "both" else (args.scenario,)
+    report = []
+    for scenario in scenarios:
+        traffic = Traffic()
+        if args.setup:
+            setup(Client(args.url), traffic, scenario)
+        print(f"{scenario}: {args.concurrency} clients for {args.duration:g}s ...", file=sys.stderr)
+        samples, elapsed = drive(args.url, traffic, SCENARIOS[scenario], args.concurrency, args.duration)
+        rows = [summarize(op, samples[op], elapsed) for op in SCENARIOS[scenario] if samples[op]]
+        total = summarize("total", [v for values in samples.values() for v in values], elapsed)
+        report.append({"scenario": scenario, "concurrency": args.concurrency, "seconds": round(elapsed, 2),
+                       "ops": rows, "total": total})
+
+        print(f"\n{scenario} ({args.concurrency} clients, {elapsed:.1f}s)")
+        print(f"{'op':<26}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}  statuses")
+        for r in rows + [total]:
+            print(f"{r['op']:<26}{r['requests']:>9}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}  "
+                  f"{' '.join(f'{s}:{n}' for s, n in r['statuses'].items())}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Admission stress test: worker processes x threads register PreData students
+through add_student against one SQLite file (DB_PROFILE=production) until
+the roster is full and keep going for a while after. Checks that exactly
+--capacity students were admitted with unique ids and that the roster
+counter agrees, and reports admissions/s and rejects/s per worker count.
+Then every thread races to delete every admitted student (half through
+delete_student, half through batch_students) and the round checks that each
+student was deleted exactly once and the counter is back at zero.
+
+    python backend/benchmarks/stress_admission.py
+    python backend/benchmarks/stress_admission.py --capacity 5000 --workers 1 2 4 8 --threads 8
+
+Exits non-zero if any round over- or under-admits, or deletes a student twice.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from common import make_app
+
+DELETE_BATCH = 50  # ids per batch_students call in the delete phase
+
+
+def configure(capacity):
+    # One single room per student, so the PreData capacity is exactly `capacity`
+    os.environ.update({
+        'DB_PROFILE': 'production',
+        'PREDATA_PREMIUM_ROOMS': '0',
+        'PREDATA_SINGLE_ROOMS': str(capacity),
+        'PREDATA_DOUBLE_ROOMS': '0'
+    })
+
+
+def worker(db_path, capacity, threads, start, duration, results):
+    """One process: `threads` threads calling add_student until `duration` seconds after `start`"""
+    configure(capacity)
+    app = make_app(db_path)
+    from src.controllers.lottery import add_student
+    outcome = {'ids': [], 'rejected': 0, 'errors': [], 'last_admit': 0.0, 'first_reject': None}
+    lock = threading.Lock()
+
+    def loop(n):
+        ids, rejected, errors, last_admit, first_reject = [], 0, [], 0.0, None
+        with app.app_context():
+            while time.time() < start + duration:
+                try:
+                    student_id, _ = add_student(name=f'Stress {os.getpid()}-{n}', gpa=3.0)
+                    ids.append(student_id)
+                    last_admit = time.time()
+                except ValueError:
+                    rejected += 1
+                    first_reject = first_reject or time.time()
+                except Exception as e:
+                    errors.append(str(e))
+        with lock:
+            outcome['ids'] += ids
+            outcome['rejected'] += rejected
+            outcome['errors'] += errors
+            outcome['last_admit'] = max(outcome['last_admit'], last_admit)
+            if first_reject and (outcome['first_reject'] is None or first_reject < outcome['first_reject']):
+                outcome['first_reject'] = first_reject
+
+    pool = [threading.Thread(target=loop, args=(n,)) for n in range(threads)]
+    time.sleep(max(start - time.time(), 0))
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put(outcome)
+
+
+def delete_worker(db_path, capacity, ids, threads, start, results):
+    """One process: every thread tries to delete every id in `ids`, in its own order"""
+    configure(capacity)
+    app = make_app(db_path)
+    from src.controllers.lottery import delete_student, batch_students
+    outcome = {'deleted': [], 'errors': []}
+    lock = threading.Lock()
+
+    def loop(n):
+        order = random.Random(f'{os.getpid()}-{n}').sample(ids, len(ids))
+        deleted, errors = [], []
+        with app.app_context():
+            if n % 2:
+                for start_index in range(0, len(order), DELETE_BATCH):
+                    chunk = order[start_index:start_index + DELETE_BATCH]
+                    try:
+                        summary = batch_students([{'op': 'delete', 'id': student_id} for student_id in chunk])
+                        deleted += [r['id'] for r in summary['results'] if r['status'] == 200]
+                    except Exception as e:
+                        errors.append(str(e))
+            else:
+                for student_id in order:
+                    try:
+                        if delete_student(student_id, repair=False)[0]:
+                            deleted.append(student_id)
+                    except Exception as e:
+                        errors.append(str(e))
+        with lock:
+            outcome['deleted'] += deleted
+            outcome['errors'] += errors
+
+    pool = [threading.Thread(target=loop, args=(n,)) for n in range(threads)]
+    time.sleep(max(start - time.time(), 0))
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put(outcome)
+
+
+def run_delete_round(db_path, capacity, ids, workers, threads):
+    """Race `workers` processes at deleting the same students; each must go exactly once"""
+    app = make_app(db_path)
+    from src.models import Student
+    from src.services import admitted_count
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    start = time.time() + 1.0 + 0.3 * workers
+    processes = [
+        context.Process(target=delete_worker, args=(db_path, capacity, ids, threads, start, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start
+
+    deleted = [student_id for outcome in outcomes for student_id in outcome['deleted']]
+    errors = [error for outcome in outcomes for error in outcome['errors']]
+    with app.app_context():
+        stored = Student.query.count()
+        admitted = admitted_count(Student)
+
+    problems = []
+    if len(deleted) != len(set(deleted)):
+        problems.append(f"{len(deleted) - len(set(deleted))} students deleted twice")
+    if set(deleted) != set(ids):
+        problems.append(f"{len(set(ids) - set(deleted))} students never deleted")
+    if stored or admitted:
+        problems.append(f"table has {stored} students, counter says {admitted}")
+    if errors:
+        problems.append(f"{len(errors)} errors, first: {errors[0]}")
+    return {'deleted': len(deleted), 'delete_rps': len(deleted) / elapsed, 'problems': problems}
+
+
+def run_round(db_path, capacity, workers, threads, duration):
+    """Clear the roster, run `workers` processes at once and check what they admitted"""
+    app = make_app(db_path)
+    from src.controllers.lottery import clear_all_students
+    from src.models import Student
+    from src.config.database import db
+    from src.models.roster_counter import RosterCounter
+    with app.app_context():
+        clear_all_students()
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    start = time.time() + 1.0 + 0.3 * workers  # time for every process to import and build the app
+    processes = [
+        context.Process(target=worker, args=(db_path, capacity, threads, start, duration, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    ids = [student_id for outcome in outcomes for student_id in outcome['ids']]
+    rejected = sum(outcome['rejected'] for outcome in outcomes)
+    errors = [error for outcome in outcomes for error in outcome['errors']]
+    filled = max(outcome['last_admit'] for outcome in outcomes) - start
+    rejects = [outcome['first_reject'] for outcome in outcomes if outcome['first_reject']]
+    reject_seconds = start + duration - min(rejects) if rejects else 0
+    with app.app_context():
+        stored = Student.query.count()
+        counter = db.session.get(RosterCounter, Student.__tablename__)
+        admitted = counter.admitted if counter else None
+
+    problems = []
+    if len(ids) != capacity:
+        problems.append(f"{len(ids)} admitted, expected {capacity}")
+    if len(set(ids)) != len(ids):
+        problems.append(f"{len(ids) - len(set(ids))} duplicate ids")
+    if stored != len(ids) or admitted != stored:
+        problems.append(f"table has {stored} students, counter says {admitted}")
+    if errors:
+        problems.append(f"{len(errors)} errors, first: {errors[0]}")
+    return {
+        'workers': workers,
+        'admitted': len(ids),
+        'admit_rps': len(ids) / filled if filled > 0 else 0,
+        'rejected': rejected,
+        'reject_rps': rejected / reject_seconds if reject_seconds > 0 else 0,
+        'ids': ids,
+        'problems': problems
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--capacity', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='process counts to compare')
+    parser.add_argument('--threads', type=int, default=4, help='threads per process')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of registrations per round')
+    args = parser.parse_args()
+
+    configure(args.capacity)
+    db_path = tempfile.mktemp(prefix='stress-', suffix='.db')
+    failed = False
+    print(f"capacity {args.capacity}, {args.threads} threads per process, {args.duration:g}s per round")
+    print(f"{'workers':>7}{'admitted':>10}{'admits/s':>10}{'rejected':>10}{'rejects/s':>11}"
+          f"{'deleted':>9}{'deletes/s':>11}  result")
+    for workers in args.workers:
+        r = run_round(db_path, args.capacity, workers, args.threads, args.duration)
+        d = run_delete_round(db_path, args.capacity, r['ids'], workers, args.threads)
+        problems = r['problems'] + d['problems']
+        failed = failed or bool(problems)
+        print(f"{r['workers']:>7}{r['admitted']:>10}{r['admit_rps']:>10.0f}{r['rejected']:>10}{r['reject_rps']:>11.0f}"
+              f"{d['deleted']:>9}{d['delete_rps']:>11.0f}  {'; '.join(problems) or 'ok'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""
+Benchmark suite for the lottery, roster and results hot paths.
+
+Runs every hot path against in-memory and on-disk SQLite, through the Flask
+test client and through direct controller calls, for each roster size. Each
+(database, size) combination runs in its own subprocess so settings and
+peak memory are isolated. Results are written as JSON and can be compared
+against a stored baseline:
+
+    python backend/benchmarks/suite.py --sizes 100,10000 --output results.json
+    python backend/benchmarks/suite.py --sizes 100,10000,1000000 --baseline baseline.json
+
+encode_assignments times the JSON encoding of the assignments list alone
+(compare JSON_PROVIDER=stdlib with the default orjson), and the *_rows paths
+the `?shape=rows` responses serialized straight from query rows.
+
+Reported per hot path: throughput (ops/s), p50/p99 latency, SQL statements
+per call and peak Python memory of one call (tracemalloc).
+
+With more than one size, the read and registration paths must issue the
+same number of SQL statements at every size (no per-row queries); the run
+exits non-zero if one does not.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from common import BACKEND_DIR, synthetic_students
+
+DEFAULT_SIZES = "100,10000"
+DATABASES = ("memory", "disk")
+MODES = ("direct", "client")
+
+
+def repeats_for(size):
+    """Fewer repetitions for big rosters so a full run stays in minutes"""
+    return max(3, min(50, 200_000 // size))
+
+
+def preset_env(size):
+    """Room counts whose capacity is exactly `size`, so the PreData preset accepts the roster"""
+    premium = size // 100
+    singles = size // 10
+    if (size - premium - singles) % 2:
+        singles += 1
+    return {
+        'PREDATA_PREMIUM_ROOMS': str(premium),
+        'PREDATA_SINGLE_ROOMS': str(singles),
+        'PREDATA_DOUBLE_ROOMS': str((size - premium - singles) // 2)
+    }
+
+
+# Hot paths whose statement count must not grow with the roster
+CONSTANT_STATEMENT_OPS = (
+    'add_student', 'fetch_all_students', 'get_assignments', 'get_assignment_rows', 'get_assignments_rows',
+    'get_assignments_page', 'get_assignments_304'
+)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def measure(name, fn, repeat, count_statements):
+    """Time `fn` `repeat` times, then count statements and peak memory on one extra call"""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    with count_statements() as counter:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'op': name,
+        'repeat': repeat,
+        'throughput_ops': round(1000 * repeat / sum(latencies), 2) if sum(latencies) else None,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'statements': counter.count,
+        'peak_mem_kb': round(peak / 1024, 1)
+    }
+
+
+def run_worker(db, size, modes):
+    """Benchmark one (database, size) combination in this process and print JSON results"""
+    os.environ.update(preset_env(size))
+    os.environ['DB_PATH'] = ':memory:' if db == 'memory' else tempfile.mktemp(prefix='bench-', suffix='.db')
+    sys.path.insert(0, BACKEND_DIR)
+
+    from src.app import create_app
+    from src.config.database import db as sqla
+    from src.controllers import lottery
+    from src.models import Student
+    from src.services import count_statements, response_cache
+
+    app = create_app()
+    repeat = repeats_for(size)
+    client = app.test_client()
+    results = []
+
+    with app.app_context():
+        # Leave room for the add_student measurements (timed calls + one profiled call) per mode
+        add_repeat = max(1, min(repeat, size // (2 * len(modes)) - 1))
+        rows = synthetic_students(size - (add_repeat + 1) * len(modes))
+        for start in range(0, len(rows), 50_000):
+            sqla.session.execute(Student.__table__.insert(), rows[start:start + 50_000])
+        sqla.session.commit()
+
+        for mode in modes:
+            if mode == 'direct':
+                paths = [
+                    ('add_student', lambda: lottery.add_student(name='Bench Student', gpa=3.5)),
+                ]
+            else:
+                paths = [
+                    ('add_student', lambda: client.post(
+                        '/api/preData/addStudent', json={'name': 'Bench Student', 'gpa': 3.5}
+                    )),
+                ]
+            for name, fn in paths:
+                results.append({'db': db, 'size': size, 'mode': mode, **measure(name, fn, add_repeat, count_statements)})
+
+        for mode in modes:
+            if mode == 'direct':
+                paths = [
+                    ('run_lottery', lambda: lottery.run_lottery()),
+                    ('fetch_all_students', lambda: lottery.fetch_all_students()),
+                    ('get_assignments', lambda: lottery.get_assignments()),
+                    ('get_assignment_rows', lambda: lottery.get_assignment_rows()),
+                    ('get_assignments_page', lambda: lottery.get_assignments(limit=100)),
+                    # The serialization share of the full assignments response
+                    ('encode_assignments', lambda: app.json.dumps(assignments)),
+                ]
+            else:
+                def uncached(url):
+                    # Measure the query + serialization path, not the response cache
+                    def call():
+                        response_cache.clear()
+                        return client.get(url).data
+                    return call
+
+                paths = [
+                    ('run_lottery', lambda: client.post('/api/preData/runTheLottery')),
+                    ('fetch_all_students', uncached('/api/preData/students')),
+                    ('get_assignments', uncached('/api/preData/assignments')),
+                    ('get_assignments_rows', uncached('/api/preData/assignments?shape=rows')),
+                    ('get_assignments_page', uncached('/api/preData/assignments?limit=100')),
+                    ('get_assignments_304', lambda: client.get(
+                        '/api/preData/assignments', headers={'If-None-Match': etag}
+                    )),
+                ]
+            for name, fn in paths:
+                if name == 'encode_assignments':
+                    assignments = lottery.get_assignments()
+                if name == 'get_assignments_304':
+                    etag = client.get('/api/preData/assignments').headers['ETag']
+                results.append({'db': db, 'size': size, 'mode': mode, **measure(name, fn, repeat, count_statements)})
+
+    print(json.dumps(results))
+
+
+def check_statement_counts(results):
+    """Messages for CONSTANT_STATEMENT_OPS whose statement count differs between roster sizes"""
+    counts = {}
+    for r in results:
+        if r['op'] in CONSTANT_STATEMENT_OPS:
+            counts.setdefault((r['db'], r['mode'], r['op']), {})[r['size']] = r['statements']
+    return [
+        f"{'/'.join(key)}: statements per call vary with roster size: "
+        + ", ".join(f"{count} at {size}" for size, count in sorted(by_size.items()))
+        for key, by_size in sorted(counts.items()) if len(set(by_size.values())) > 1
+    ]
+
+
+def compare(results, baseline, tolerance):
+    """Print p50 changes against `baseline`; return the regressions beyond `tolerance`"""
+    key = lambda r: (r['db'], r['size'], r['mode'], r['op'])
+    previous = {key(r): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = previous.get(key(r))
+        if not old or not old['p50_ms']:
+            continue
+        change = (r['p50_ms'] - old['p50_ms']) / old['p50_ms']
+        flag = ''
+        if change > tolerance:
+            flag = '  REGRESSION'
+            regressions.append(r)
+        print(f"{'/'.join(map(str, key(r))):<45} p50 {old['p50_ms']:>10.3f} -> {r['p50_ms']:>10.3f} ms "
+              f"({change:+.0%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lottery, roster and results hot paths")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated roster sizes, e.g. 100,10000,1000000')
+    parser.add_argument('--db', choices=DATABASES + ('both',), default='both')
+    parser.add_argument('--mode', choices=MODES + ('both',), default='both')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 slowdown before flagging')
+    parser.add_argument('--worker', nargs=2, metavar=('DB', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    modes = MODES if args.mode == 'both' else (args.mode,)
+    if args.worker:
+        run_worker(args.worker[0], int(args.worker[1]), modes)
+        return
+
+    databases = DATABASES if args.db == 'both' else (args.db,)
+    results = []
+    for size in [int(s) for s in args.sizes.split(',')]:
+        for db in databases:
+            print(f"running {db} x {size} students ...", file=sys.stderr)
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', db, str(size), '--mode', args.mode],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results.extend(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"\n{'db':<7}{'size':>9} {'mode':<7}{'op':<22}{'ops/s':>10}{'p50 ms':>11}{'p99 ms':>11}{'stmts':>7}{'peak KiB':>11}")
+    for r in results:
+        print(f"{r['db']:<7}{r['size']:>9} {r['mode']:<7}{r['op']:<22}{r['throughput_ops'] or 0:>10.1f}"
+              f"{r['p50_ms']:>11.3f}{r['p99_ms']:>11.3f}{r['statements']:>7}{r['peak_mem_kb']:>11.1f}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'json_provider': os.getenv('JSON_PROVIDER', 'auto'),
+            'platform': platform.platform()
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {args.output}")
+
+    failed = False
+    statement_problems = check_statement_counts(results)
+    for problem in statement_problems:
+        print(f"STATEMENTS  {problem}")
+    failed = bool(statement_problems)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -27,17 +27,31 @@ def create_app():
     
     app.config['SQLALCHEMY_DATABASE_URI'] = settings.SQLALCHEMY_DATABASE_URI
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = settings.SQLALCHEMY_TRACK_MODIFICATIONS
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = settings.get_engine_options()
+    
+    # JSON encoding (orjson when installed)
+    from src.services.json_provider import json_provider_class
+    app.json = json_provider_class(settings.JSON_PROVIDER)(app)
     
     # Initialize database
-    from src.config.database import db
+    from src.config.database import db, register_pragmas
     db.init_app(app)
+    with app.app_context():
+        register_pragmas(db.engine, settings.get_sqlite_pragmas())
+    
+    # Request timing, SQL statement counting and /metrics
+    if settings.METRICS_ENABLED:
+        from src.services.metrics import init_metrics
+        with app.app_context():
+            init_metrics(app, db.engine, settings.SLOW_REQUEST_MS)
     
     # Import models so they're registered with SQLAlchemy
-    from src.models import Student, Assignment, RealtimeStudent, RealtimeAssignment
+    from src.models import Student, Assignment, RealtimeStudent, RealtimeAssignment, RosterCounter, LotteryRun, PublishedRun, LotteryJob, Dorm, Room, DatasetVersion
     
-    # Create tables
+    # Create tables (and upgrade a database left by an older version)
+    from src.config.database import ensure_schema
     with app.app_context():
-        db.create_all()
+        ensure_schema(db)
 
     # Register API blueprints
     from src.controllers.routes import register_blueprints
@@ -49,8 +63,21 @@ def create_app():
 
     return app
 
-app = create_app()
+
+def __getattr__(name):
+    # `app` is built on first access (WSGI servers, `flask run`), so importing
+    # create_app alone - benchmarks, scripts, a worker factory - builds nothing
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     from src.config.settings import settings
+    from src.services import lottery_jobs
+    app = create_app()
+    with app.app_context():
+        lottery_jobs.recover()  # jobs the previous server left queued or running
     app.run(host=settings.HOST, port=settings.PORT, debug=settings.DEBUG)
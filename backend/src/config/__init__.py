@@ -1,7 +1,7 @@
 """
 Configuration module
 """
-from src.config.database import db
+from src.config.database import db, ensure_schema, reset_connections
 from src.config.settings import settings
 
-__all__ = ['db', 'settings']
+__all__ = ['db', 'ensure_schema', 'reset_connections', 'settings']
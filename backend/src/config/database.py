@@ -1,3 +1,150 @@
+import hashlib
+from datetime import datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, literal
 
 db = SQLAlchemy()
+
+
+def utcnow():
+    """The current time in UTC (timezone-aware); SQLite DateTime columns read it back naive"""
+    return datetime.now(timezone.utc)
+
+
+def register_pragmas(engine, pragmas):
+    """Run `PRAGMA name=value` for each pair on every new DBAPI connection"""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _table_layout(table):
+    """The parts of a table that define the schema; reprs are avoided, they embed callables"""
+    columns = [(c.name, str(c.type), c.nullable, c.primary_key) for c in table.columns]
+    indexes = sorted((i.name, tuple(c.name for c in i.columns), bool(i.unique)) for i in table.indexes)
+    return repr((table.name, columns, indexes))
+
+
+def schema_version(metadata):
+    """Fingerprint of the tables and indexes declared in `metadata`, sized for PRAGMA user_version"""
+    digest = hashlib.sha1()
+    for table in metadata.sorted_tables:
+        digest.update(_table_layout(table).encode())
+    return int.from_bytes(digest.digest()[:4], "big") & 0x7FFFFFFF
+
+
+def missing_columns(engine, metadata):
+    """{table: [column, ...]} for declared columns that existing tables lack (create_all never adds them)"""
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    missing = {}
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        absent = [column.name for column in table.columns if column.name not in present]
+        if absent:
+            missing[table.name] = absent
+    return missing
+
+
+# Tables whose rows are rebuilt from the others (by the next lottery run, or seeded from the
+# students table); an outdated one is dropped and recreated rather than altered
+DERIVED_TABLES = ("assignments", "realtime_assignments", "roster_counters")
+
+
+def _addable(column):
+    """Whether ALTER TABLE ADD COLUMN can add `column` to a table with rows"""
+    if column.primary_key or column.foreign_keys:
+        return False
+    return column.nullable or (column.default is not None and column.default.is_scalar)
+
+
+def _add_column(conn, table, column):
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+    if not column.nullable:
+        default = literal(column.default.arg).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        ddl += f" NOT NULL DEFAULT {default}"
+    conn.exec_driver_sql(ddl)
+    if column.unique:
+        conn.exec_driver_sql(f"CREATE UNIQUE INDEX uq_{table.name}_{column.name} ON {table.name} ({column.name})")
+    if column.name == "seq":
+        # The numeric part of the `stu-N` id, as registration assigns it
+        conn.exec_driver_sql(f"UPDATE {table.name} SET seq = CAST(substr(id, instr(id, '-') + 1) AS INTEGER)")
+
+
+def upgrade_schema(engine, metadata):
+    """
+    Bring tables created by an older version up to `metadata` in place.
+    Missing columns and indexes are added (seq is filled from the student
+    id); outdated DERIVED_TABLES are recreated empty. Nothing is changed if
+    a table lacks a column that cannot be added: {table: columns} of those
+    is returned instead.
+    """
+    tables = {table.name: table for table in metadata.sorted_tables}
+    missing = {
+        name: [tables[name].columns[column] for column in columns]
+        for name, columns in missing_columns(engine, metadata).items()
+    }
+    blocked = {
+        name: [column.name for column in columns if not _addable(column)]
+        for name, columns in missing.items() if name not in DERIVED_TABLES
+    }
+    blocked = {name: columns for name, columns in blocked.items() if columns}
+    if blocked:
+        return blocked
+    with engine.begin() as conn:
+        for name, columns in missing.items():
+            if name in DERIVED_TABLES:
+                tables[name].drop(conn)
+                tables[name].create(conn)
+                continue
+            for column in columns:
+                _add_column(conn, tables[name], column)
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    return {}
+
+
+def ensure_schema(db):
+    """
+    db.create_all(), then stamp the schema version into the database file.
+    A database stamped with another version is first upgraded in place
+    (upgrade_schema); if that is not possible a RuntimeError names the
+    tables and how to recreate the file.
+    """
+    db.create_all()
+    version = schema_version(db.metadata)
+    with db.engine.connect() as conn:
+        stored = conn.exec_driver_sql("PRAGMA user_version").scalar()
+    if stored == version:
+        return
+    blocked = upgrade_schema(db.engine, db.metadata)
+    if blocked:
+        details = "; ".join(f"{table}: {', '.join(columns)}" for table, columns in blocked.items())
+        raise RuntimeError(
+            f"The database at {db.engine.url.database} predates the current schema and cannot be upgraded "
+            f"in place (missing {details}). To recreate it, stop the server, delete that file (or point "
+            "DB_PATH at a new one) and start again: the tables are created on start-up, empty."
+        )
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+
+
+def reset_connections(app, close=True):
+    """
+    Empty the connection pools of `app`'s engines. A SQLite connection must
+    never be shared across a fork: a preloading server master calls this
+    before forking (close=True), each worker right after it (close=False,
+    which drops the inherited connections without closing the master's).
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
@@ -1,8 +1,10 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-load_dotenv()
+# LOAD_DOTENV=false skips the .env lookup (containers that set the environment directly)
+if os.getenv('LOAD_DOTENV', 'True').lower() == 'true':
+    from dotenv import load_dotenv
+    load_dotenv()
 
 BACKEND_DIR = Path(__file__).parent.parent.parent.absolute()
 
@@ -14,17 +16,116 @@ class Settings:
     HOST = os.getenv('HOST', '0.0.0.0')
     DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
     
+    # Production server (src/serve.py): gunicorn worker processes (0 = 2 x CPUs + 1), threads per
+    # worker, app preloaded in the master before forking, and timeouts for hung and retiring workers
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', 0))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', 4))
+    WEB_PRELOAD = os.getenv('WEB_PRELOAD', 'True').lower() == 'true'
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 120))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+    WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', 0))  # recycle a worker after this many requests (0 = never)
+    
     # Database settings
     DB_PATH = os.getenv('DB_PATH', str(BACKEND_DIR / 'data' / 'app.db'))
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.abspath(DB_PATH)}'
+    IN_MEMORY_DB = DB_PATH == ':memory:'  # one shared connection, for benchmarks and experiments
+    SQLALCHEMY_DATABASE_URI = 'sqlite://' if IN_MEMORY_DB else f'sqlite:///{os.path.abspath(DB_PATH)}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Database engine profile: 'default' (bare SQLite) or 'production'
+    # (WAL journaling, per-connection pragmas and a sized connection pool)
+    DB_PROFILE = os.getenv('DB_PROFILE', 'default').lower()
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 3600))
+    DB_BUSY_TIMEOUT = float(os.getenv('DB_BUSY_TIMEOUT', 30))
+    DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', 256 * 1024 * 1024))
+    DB_CACHE_SIZE = int(os.getenv('DB_CACHE_SIZE', -64 * 1024))  # negative = KiB
+    
+    # Lottery room inventory (defaults are the 100 / 10 student presets)
+    PREDATA_PREMIUM_ROOMS = int(os.getenv('PREDATA_PREMIUM_ROOMS', 10))
+    PREDATA_SINGLE_ROOMS = int(os.getenv('PREDATA_SINGLE_ROOMS', 30))
+    PREDATA_DOUBLE_ROOMS = int(os.getenv('PREDATA_DOUBLE_ROOMS', 30))
+    REALTIME_PREMIUM_ROOMS = int(os.getenv('REALTIME_PREMIUM_ROOMS', 1))
+    REALTIME_SINGLE_ROOMS = int(os.getenv('REALTIME_SINGLE_ROOMS', 3))
+    REALTIME_DOUBLE_ROOMS = int(os.getenv('REALTIME_DOUBLE_ROOMS', 3))
+    
+    # Lottery runs per system whose assignment rows are kept (the published run always is);
+    # older runs keep only their seed and roster digest and are replayed on demand
+    LOTTERY_RUN_RETENTION = int(os.getenv('LOTTERY_RUN_RETENTION', 3))
+    
+    # Repair the published run in place when a student is added or deleted (per request: ?repair=1/0)
+    REPAIR_ON_ROSTER_CHANGE = os.getenv('REPAIR_ON_ROSTER_CHANGE', 'False').lower() == 'true'
+    
+    # Mirror dataset versions into the dataset_versions table, so a write in one worker
+    # process invalidates the roster and response caches of the others (multi-worker deployments)
+    SHARED_VERSIONS = os.getenv('SHARED_VERSIONS', 'False').lower() == 'true'
+    
+    # Open /api/realtime/events streams per process, each holding a request thread (0 = no cap;
+    # serve.py defaults it to half of WEB_THREADS)
+    SSE_MAX_SUBSCRIBERS = int(os.getenv('SSE_MAX_SUBSCRIBERS', 0))
+    
+    # In-process roster cache: most student rows kept across cached snapshots (0 = off)
+    ROSTER_CACHE_MAX_ROWS = int(os.getenv('ROSTER_CACHE_MAX_ROWS', 200000))
+    # Total bytes of serialized GET bodies kept by the response cache (per process)
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    
+    # Response JSON encoder: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto').lower()
+    
+    # Background workers for asynchronous lottery runs (per server process)
+    LOTTERY_JOB_WORKERS = int(os.getenv('LOTTERY_JOB_WORKERS', 2))
+    # Seconds a queued/running job may go without a heartbeat from its process before it counts
+    # as abandoned (its worker died or was recycled), and how long finished jobs are kept
+    LOTTERY_JOB_TIMEOUT = float(os.getenv('LOTTERY_JOB_TIMEOUT', 600))
+    LOTTERY_JOB_RETENTION = float(os.getenv('LOTTERY_JOB_RETENTION', 86400))
+    
+    # Odds simulator: process pool size (0 = one per CPU) and per-request trial cap
+    SIMULATION_WORKERS = int(os.getenv('SIMULATION_WORKERS', 0))
+    SIMULATION_MAX_TRIALS = int(os.getenv('SIMULATION_MAX_TRIALS', 1000000))
+    
+    # Multi-dorm lotteries: process pool size (0 = one per CPU; the pool is shared with the simulator)
+    DORM_LOTTERY_WORKERS = int(os.getenv('DORM_LOTTERY_WORKERS', 0))
+    
+    # Request instrumentation: /metrics endpoint and slow-request logging (0 = off)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 0))
+    
     @classmethod
     def get_database_uri(cls):
         return cls.SQLALCHEMY_DATABASE_URI
     
+    @classmethod
+    def get_engine_options(cls):
+        if cls.DB_PROFILE == 'default' or cls.IN_MEMORY_DB:
+            return {}
+        if cls.DB_PROFILE == 'production':
+            return {
+                'pool_size': cls.DB_POOL_SIZE,
+                'max_overflow': cls.DB_MAX_OVERFLOW,
+                'pool_recycle': cls.DB_POOL_RECYCLE,
+                'pool_pre_ping': True,
+                'connect_args': {'timeout': cls.DB_BUSY_TIMEOUT, 'check_same_thread': False}
+            }
+        raise ValueError(f"Unknown DB_PROFILE: {cls.DB_PROFILE}")
+    
+    @classmethod
+    def get_sqlite_pragmas(cls):
+        """Pragmas run on every new connection (in order) for the selected profile"""
+        if cls.DB_PROFILE != 'production':
+            return []
+        return [
+            ('journal_mode', 'WAL'),
+            ('synchronous', 'NORMAL'),
+            ('busy_timeout', int(cls.DB_BUSY_TIMEOUT * 1000)),
+            ('mmap_size', cls.DB_MMAP_SIZE),
+            ('cache_size', cls.DB_CACHE_SIZE),
+            ('temp_store', 'MEMORY')
+        ]
+    
     @classmethod
     def ensure_data_dir(cls):
+        if cls.IN_MEMORY_DB:
+            return
         data_dir = Path(cls.DB_PATH).parent
         data_dir.mkdir(parents=True, exist_ok=True)
 
@@ -1,8 +1,10 @@
 """
 Lottery controllers
 """
-from src.controllers.lottery.controllers.lottery_controller import run_lottery
-from src.controllers.lottery.controllers.assignments_controller import get_assignments
-from src.controllers.lottery.controllers.student_controller import add_student, delete_student, fetch_all_students, clear_all_students, populate_dummy_students
+from src.controllers.lottery.controllers.lottery_controller import run_lottery, run_all_dorms, simulate_lottery, get_runs, get_run_assignments, verify_lottery_run
+from src.controllers.lottery.controllers.dorm_controller import list_dorms, save_dorm, delete_dorm, dorm_configs, roster_capacity
+from src.controllers.lottery.controllers.room_controller import list_rooms, replace_rooms, clear_rooms, load_rooms
+from src.controllers.lottery.controllers.assignments_controller import ASSIGNMENT_COLUMNS, get_assignments, get_assignment_rows, iter_assignments
+from src.controllers.lottery.controllers.student_controller import STUDENT_COLUMNS, add_student, import_students, batch_students, delete_student, fetch_all_students, fetch_student_rows, iter_students, clear_all_students, populate_dummy_students
 
-__all__ = ['run_lottery', 'get_assignments', 'add_student', 'delete_student', 'fetch_all_students', 'clear_all_students', 'populate_dummy_students']
+__all__ = ['run_lottery', 'run_all_dorms', 'list_dorms', 'save_dorm', 'delete_dorm', 'dorm_configs', 'roster_capacity', 'list_rooms', 'replace_rooms', 'clear_rooms', 'load_rooms', 'simulate_lottery', 'get_runs', 'get_run_assignments', 'verify_lottery_run', 'ASSIGNMENT_COLUMNS', 'get_assignments', 'get_assignment_rows', 'iter_assignments', 'STUDENT_COLUMNS', 'add_student', 'import_students', 'batch_students', 'delete_student', 'fetch_all_students', 'fetch_student_rows', 'iter_students', 'clear_all_students', 'populate_dummy_students']
@@ -1,21 +1,67 @@
+from sqlalchemy import tuple_
+from src.config.database import db
 from src.models import Assignment, Student
+from src.services import STREAM_BATCH_SIZE, published_run_id
 
 
-def get_assignments():
-    assignments = Assignment.query.join(Student).order_by(Assignment.room_number, Assignment.student_id).all()
-    
-    result = []
-    for a in assignments:
-        result.append({
-            "id": a.id,
-            "student_id": a.student_id,
-            "name": a.student.name,
-            "gpa": a.student.gpa,
-            "corruption": a.student.corruption,
-            "disabled": a.student.disabled,
-            "room_number": a.room_number,
-            "room_type": a.room_type,
-            "roommate_id": a.roommate_id
-        })
-    
-    return result
+ASSIGNMENT_COLUMNS = (
+    "id", "student_id", "name", "gpa", "corruption", "disabled", "room_number", "room_type", "roommate_id", "dorm"
+)
+
+
+def _assignment_query(after=None, limit=None):
+    # One SELECT projecting only the columns the response needs
+    query = db.session.query(
+        Assignment.id,
+        Assignment.student_id,
+        Student.name,
+        Student.gpa,
+        Student.corruption,
+        Student.disabled,
+        Assignment.room_number,
+        Assignment.room_type,
+        Assignment.roommate_id,
+        Assignment.dorm
+    ).join(Student, Student.id == Assignment.student_id).filter(
+        Assignment.run_id == published_run_id(Assignment)
+    ).order_by(
+        Assignment.room_number,
+        Assignment.student_id
+    )
+    if after is not None:
+        query = query.filter(tuple_(Assignment.room_number, Assignment.student_id) > tuple_(*after))
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def _to_dict(row):
+    assignment_id, student_id, name, gpa, corruption, disabled, room_number, room_type, roommate_id, dorm = row
+    return {
+        "id": assignment_id,
+        "student_id": student_id,
+        "name": name,
+        "gpa": gpa,
+        "corruption": corruption,
+        "disabled": disabled,
+        "room_number": room_number,
+        "room_type": room_type,
+        "roommate_id": roommate_id,
+        "dorm": dorm
+    }
+
+
+def get_assignments(after=None, limit=None):
+    """Assignments ordered by (room_number, student_id); `after` is the keyset of the previous page"""
+    return [_to_dict(row) for row in _assignment_query(after, limit)]
+
+
+def iter_assignments():
+    """Yield every assignment from a server-side cursor, STREAM_BATCH_SIZE rows at a time"""
+    for row in _assignment_query().yield_per(STREAM_BATCH_SIZE):
+        yield _to_dict(row)
+
+
+def get_assignment_rows(after=None, limit=None):
+    """get_assignments as query rows in ASSIGNMENT_COLUMNS order, for `?shape=rows`"""
+    return _assignment_query(after, limit).all()
@@ -0,0 +1,82 @@
+from sqlalchemy import func
+from src.config.database import db
+from src.engine import LotteryConfig, predata_config
+from src.models import Dorm, Student, DEFAULT_DORM
+from src.controllers.lottery.controllers.room_controller import load_room_inventories, room_beds
+
+ROOM_FIELDS = ("premium_rooms", "single_rooms", "double_rooms", "top_gpa_singles", "disabled_singles")
+
+
+def _room_counts():
+    """Room counts per dorm; the default dorm falls back to the PreData preset"""
+    configs = {DEFAULT_DORM: predata_config()}
+    for dorm in Dorm.query.all():
+        configs[dorm.name] = dorm.to_config()
+    return configs
+
+
+def dorm_configs():
+    """Inventory per dorm: its rooms table (a RoomSpec list) if it has one, else its room counts"""
+    configs = _room_counts()
+    configs.update(load_room_inventories())
+    return configs
+
+
+def roster_capacity():
+    """Beds across every dorm, the most students the PreData roster may hold"""
+    capacity = {dorm: config.capacity for dorm, config in _room_counts().items()}
+    capacity.update({dorm: beds for dorm, (_, beds) in room_beds().items()})
+    return sum(capacity.values())
+
+
+def list_dorms():
+    """Every dorm with its room inventory and current number of students"""
+    counts = dict(db.session.query(Student.dorm, func.count(Student.id)).group_by(Student.dorm))
+    rooms = room_beds()
+    configs = _room_counts()
+    dorms = []
+    for name, config in sorted(configs.items()):
+        dorm = {"name": name, **{field: getattr(config, field) for field in ROOM_FIELDS}, "capacity": config.capacity}
+        if name in rooms:
+            # The rooms table replaces the room counts
+            dorm = {"name": name, "rooms": rooms[name][0], "capacity": rooms[name][1]}
+        dorms.append({**dorm, "students": counts.pop(name, 0)})
+    for name in sorted(set(rooms) - set(configs)):
+        dorms.append({"name": name, "rooms": rooms[name][0], "capacity": rooms[name][1], "students": counts.pop(name, 0)})
+    # Students assigned to a dorm that has no inventory yet
+    for name, count in sorted(counts.items()):
+        dorms.append({"name": name, "capacity": 0, "students": count})
+    return dorms
+
+
+def save_dorm(name: str, rooms: dict):
+    """Create or replace the room inventory of dorm `name`"""
+    name = (name or "").strip()
+    if not name or len(name) > 50:
+        raise ValueError("Dorm name must be 1 to 50 characters")
+    if not isinstance(rooms, dict):
+        raise ValueError("Room inventory must be a JSON object")
+    config = LotteryConfig(premium_rooms=0, single_rooms=0, double_rooms=0).with_overrides(rooms)
+    try:
+        dorm = db.session.get(Dorm, name) or Dorm(name=name)
+        for field in ROOM_FIELDS:
+            setattr(dorm, field, getattr(config, field))
+        db.session.add(dorm)
+        db.session.commit()
+        return dorm.to_dict()
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(f"Failed to save dorm: {str(e)}")
+
+
+def delete_dorm(name: str):
+    try:
+        dorm = db.session.get(Dorm, name)
+        if dorm:
+            db.session.delete(dorm)
+            db.session.commit()
+            return True
+        return False
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(f"Failed to delete dorm: {str(e)}")
@@ -1,131 +1,151 @@
-import random
 from src.config.database import db
-from src.models import Student, Assignment
+from src.config.settings import settings
+from src.engine import (
+    Applicant, summarize, predata_config, simulate_odds,
+    POLICY_VERSION, new_seed, roster_digest, dump_roster, dump_config, seeded_allocate,
+    rosters_digest, dump_rosters, allocate_dorms, dump_dorm_configs, PREFERENCE_FIELDS, preference_vector
+)
+from src.models import Student, Assignment, DEFAULT_DORM
+from src.services import publish_assignments, list_runs, run_assignments, verify_run, roster_cache
+from src.controllers.lottery.controllers.dorm_controller import dorm_configs
+from src.controllers.lottery.controllers.room_controller import load_rooms
 
 
-def run_lottery():
+PREFERENCE_COLUMNS = [getattr(Student, field) for field in PREFERENCE_FIELDS]
+
+
+def _query_applicants():
+    # Students of other dorms belong to runAllDorms, never to the single-building lottery
+    rows = db.session.query(
+        Student.id, Student.gpa, Student.corruption, Student.disabled, *PREFERENCE_COLUMNS
+    ).filter(Student.dorm == DEFAULT_DORM).order_by(Student.seq)
+    return (
+        Applicant(sid, gpa, bool(corruption), bool(disabled), preference_vector(prefs))
+        for sid, gpa, corruption, disabled, *prefs in rows
+    )
+
+
+def _load_applicants():
+    """The default dorm's roster in id order, from the roster cache until the next student write"""
+    return roster_cache.get(Student, f"applicants:{DEFAULT_DORM}", _query_applicants)
+
+
+def _query_rosters():
+    rows = db.session.query(
+        Student.dorm, Student.id, Student.gpa, Student.corruption, Student.disabled, *PREFERENCE_COLUMNS
+    ).order_by(Student.dorm, Student.seq)
+    rosters = {}
+    for dorm, sid, gpa, corruption, disabled, *prefs in rows:
+        rosters.setdefault(dorm, []).append(
+            Applicant(sid, gpa, bool(corruption), bool(disabled), preference_vector(prefs))
+        )
+    return ((dorm, tuple(roster)) for dorm, roster in rosters.items())
+
+
+def _load_rosters():
+    """Applicants grouped by dorm, each roster in id order (cached like `_load_applicants`)"""
+    rosters = roster_cache.get(
+        Student, "rosters", _query_rosters, size=lambda pairs: sum(len(roster) for _, roster in pairs)
+    )
+    return dict(rosters)
+
+
+def run_lottery(overrides=None):
     """
     Run the lottery with new distribution:
     - 10 premium rooms (for our relatives/friends that are students)
     - 30 single rooms (top 10 GPA + 10 disabled + 10 random)
-    - 60 double rooms (remaining students, 2 per room)
+    - 60 double rooms (remaining students, 2 per room, paired by preferences when given)
+
+    Room counts come from the PreData preset; `overrides` (e.g. the request
+    body) may change them, in which case the roster only has to fit. If the
+    default dorm has a rooms table and no counts are overridden, its rooms
+    are filled instead.
+    """
+    preset = predata_config()
+    config = preset.with_overrides(overrides or {})
+    rooms = load_rooms(DEFAULT_DORM) if config == preset else None
+
+    applicants = _load_applicants()
+
+    if rooms is None and config == preset and len(applicants) != config.capacity:
+        raise RuntimeError(f"Expected {config.capacity} students in dorm {DEFAULT_DORM}, found {len(applicants)}")
+    inventory = config if rooms is None else rooms
+
+    # A per-run seed makes the run reproducible from its record alone
+    seed = (overrides or {}).get("seed")
+    seed = new_seed() if seed is None else int(seed)
+    placements = seeded_allocate(applicants, inventory, seed)
+    provenance = {
+        "seed": seed,
+        "policy_version": POLICY_VERSION,
+        "roster_digest": roster_digest(applicants),
+        "roster": dump_roster(applicants),
+        "config": dump_config(inventory, DEFAULT_DORM)
+    }
+
+    # Write the run under a new run id, then switch readers over to it
+    run_id, write_ms = publish_assignments(Assignment, placements, provenance)
+
+    return {"message": "Lottery completed successfully", **summarize(placements), "run_id": run_id, "seed": seed, "write_ms": write_ms}
+
+
+def run_all_dorms(options=None):
     """
-    students = [s.to_dict() for s in Student.query.all()]
-    
-    if len(students) != 100:
-        raise RuntimeError(f"Expected 100 students in DB, found {len(students)}")
-
-    # Clear previous assignments
-    Assignment.query.delete()
-    db.session.commit()
-
-    students_by_id = {s["id"]: s for s in students}
-    assignments_list = []
-
-    # 1) Premium rooms (10 corrupt students, or all corrupt if less than 10)
-    corrupt_students = [s for s in students if s["corruption"]]
-    
-    # If less than 10 corrupt students, fill remaining with random students
-    if len(corrupt_students) < 10:
-        non_corrupt = [s for s in students if not s["corruption"]]
-        random.shuffle(non_corrupt)
-        premium_students = corrupt_students + non_corrupt[:10 - len(corrupt_students)]
-    else:
-        premium_students = corrupt_students[:10]
-    
-    for idx, student in enumerate(premium_students, start=1):
-        assignments_list.append({
-            "student_id": student["id"],
-            "room_number": idx,
-            "room_type": "premium",
-            "roommate_id": None
-        })
-    
-    selected_ids = [s["id"] for s in premium_students]
-
-    # 2) Single rooms (30 total: top GPA + disabled + random)
-    remaining = [s for s in students if s["id"] not in selected_ids]
-    
-    # Top 10 GPA
-    top_gpa = sorted(remaining, key=lambda x: x.get("gpa", 0), reverse=True)[:10]
-    single_students = top_gpa.copy()
-    selected_ids.extend([s["id"] for s in top_gpa])
-    
-    # Disabled students (up to 10)
-    remaining = [s for s in students if s["id"] not in selected_ids]
-    disabled = [s for s in remaining if s.get("disabled")]
-    if len(disabled) > 10:
-        disabled_pick = random.sample(disabled, 10)
-    else:
-        disabled_pick = disabled
-    single_students.extend(disabled_pick)
-    selected_ids.extend([s["id"] for s in disabled_pick])
-    
-    # Random to fill up to 30 singles
-    remaining = [s for s in students if s["id"] not in selected_ids]
-    need = 30 - len(single_students)
-    if need > 0:
-        random_pick = random.sample(remaining, need)
-        single_students.extend(random_pick)
-        selected_ids.extend([s["id"] for s in random_pick])
-    
-    # Assign single rooms (11-40)
-    for idx, student in enumerate(single_students, start=11):
-        assignments_list.append({
-            "student_id": student["id"],
-            "room_number": idx,
-            "room_type": "single",
-            "roommate_id": None
-        })
-
-    # 3) Double rooms (60 students = 30 rooms)
-    remaining = [s for s in students if s["id"] not in selected_ids]
-    random.shuffle(remaining)
-    
-    if len(remaining) != 60:
-        raise RuntimeError(f"Expected 60 students for double rooms, got {len(remaining)}")
-    
-    room_num = 41  # Start double rooms at 41 (cuz 40 rooms are single rooms)
-    i = 0
-    while i < len(remaining):
-        s1 = remaining[i]
-        s2 = remaining[i + 1]
-        
-        assignments_list.append({
-            "student_id": s1["id"],
-            "room_number": room_num,
-            "room_type": "double",
-            "roommate_id": s2["id"]
-        })
-        assignments_list.append({
-            "student_id": s2["id"],
-            "room_number": room_num,
-            "room_type": "double",
-            "roommate_id": s1["id"]
-        })
-        
-        room_num += 1
-        i += 2
-
-    # Persist all assignments to database
-    try:
-        for assignment_data in assignments_list:
-            assignment = Assignment(
-                student_id=assignment_data["student_id"],
-                room_number=assignment_data["room_number"],
-                room_type=assignment_data["room_type"],
-                roommate_id=assignment_data["roommate_id"]
-            )
-            db.session.add(assignment)
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-        raise
+    Run every dorm's lottery with its own room inventory in one request.
+    Dorms are allocated in parallel across processes and published together
+    as a single run, so readers switch over to all dorms at once.
+    """
+    rosters = _load_rosters()
+    if not rosters:
+        raise ValueError("No students to allocate")
+    configs = dorm_configs()
+    configs = {dorm: configs[dorm] for dorm in rosters if dorm in configs}
+
+    seed = (options or {}).get("seed")
+    seed = new_seed() if seed is None else int(seed)
+    by_dorm = allocate_dorms(rosters, configs, seed, settings.DORM_LOTTERY_WORKERS or None)
+    placements = [p for dorm in by_dorm for p in by_dorm[dorm]]
+    provenance = {
+        "seed": seed,
+        "policy_version": POLICY_VERSION,
+        "roster_digest": rosters_digest(rosters),
+        "roster": dump_rosters(rosters),
+        "config": dump_dorm_configs(configs)
+    }
+
+    run_id, write_ms = publish_assignments(Assignment, placements, provenance)
 
     return {
-        "message": "Lottery completed successfully",
-        "premium_rooms": 10,
-        "single_rooms": 30,
-        "double_rooms": 30,
-        "total_students": 100
+        "message": "Dorm lotteries completed successfully",
+        **summarize(placements),
+        "dorms": {dorm: summarize(by_dorm[dorm]) for dorm in by_dorm},
+        "run_id": run_id,
+        "seed": seed,
+        "write_ms": write_ms
     }
+
+
+def simulate_lottery(trials: int, overrides=None, seed=None):
+    """
+    Per-student odds of each room type over `trials` in-memory lotteries with
+    the PreData policy. Persisted assignments are not touched.
+    """
+    if not 1 <= trials <= settings.SIMULATION_MAX_TRIALS:
+        raise ValueError(f"trials must be between 1 and {settings.SIMULATION_MAX_TRIALS}")
+    config = predata_config().with_overrides(overrides or {})
+    return simulate_odds(_load_applicants(), config, trials, seed=seed, workers=settings.SIMULATION_WORKERS or None)
+
+
+def get_runs():
+    return list_runs(Assignment)
+
+
+def get_run_assignments(run_id):
+    """Assignments of one run, replayed from its seed if its rows were archived (None if unknown)"""
+    return run_assignments(Assignment, run_id, _load_applicants, _load_rosters, load_rooms)
+
+
+def verify_lottery_run(run_id):
+    """Replay one run and check it against its stored rows (None if unknown)"""
+    return verify_run(Assignment, run_id, _load_applicants, _load_rosters, load_rooms)
@@ -0,0 +1,107 @@
+from sqlalchemy import func, select
+from src.config.database import db
+from src.engine import RoomSpec
+from src.models import Room, DEFAULT_DORM
+from src.services import bump_version
+from src.services.roster_import import parse_bool
+
+
+def _room_rows(dorm=None):
+    query = select(Room.dorm, Room.number, Room.room_type, Room.capacity, Room.accessible, Room.out_of_service)
+    if dorm is not None:
+        query = query.where(Room.dorm == dorm)
+    return db.session.execute(query.order_by(Room.dorm, Room.number))
+
+
+def load_room_inventories():
+    """{dorm: [RoomSpec]} for every dorm with a rooms table, out-of-service rooms left out"""
+    inventories = {}
+    for dorm, number, room_type, capacity, accessible, out_of_service in _room_rows():
+        rooms = inventories.setdefault(dorm, [])
+        if not out_of_service:
+            rooms.append(RoomSpec(number, room_type, capacity, bool(accessible)))
+    return inventories
+
+
+def load_rooms(dorm=DEFAULT_DORM):
+    """In-service rooms of `dorm`, or None if it has no rooms table (room counts apply)"""
+    rows = _room_rows(dorm).all()
+    if not rows:
+        return None
+    return [
+        RoomSpec(number, room_type, capacity, bool(accessible))
+        for _, number, room_type, capacity, accessible, out_of_service in rows if not out_of_service
+    ]
+
+
+def room_beds():
+    """{dorm: (rooms, in-service beds)} for every dorm with a rooms table, in one aggregate query"""
+    rows = db.session.query(
+        Room.dorm,
+        func.count(Room.id),
+        func.coalesce(func.sum(Room.capacity).filter(Room.out_of_service.is_(False)), 0)
+    ).group_by(Room.dorm)
+    return {dorm: (rooms, beds) for dorm, rooms, beds in rows}
+
+
+def list_rooms(dorm=DEFAULT_DORM):
+    return [room.to_dict() for room in Room.query.filter_by(dorm=dorm).order_by(Room.number)]
+
+
+def _validate_room(record):
+    if not isinstance(record, dict):
+        raise ValueError("Room must be an object")
+    try:
+        number = int(record["number"])
+        capacity = int(record.get("capacity", 1))
+    except KeyError:
+        raise ValueError("Missing required field: number")
+    except (TypeError, ValueError):
+        raise ValueError("number and capacity must be integers")
+    room_type = str(record.get("room_type") or "").strip().lower()
+    if not room_type or len(room_type) > 20:
+        raise ValueError(f"Room {number}: room_type must be 1 to 20 characters")
+    if capacity < 1:
+        raise ValueError(f"Room {number}: capacity must be at least 1")
+    return {
+        "number": number,
+        "room_type": room_type,
+        "capacity": capacity,
+        "accessible": parse_bool(record.get("accessible"), "accessible"),
+        "out_of_service": parse_bool(record.get("out_of_service"), "out_of_service")
+    }
+
+
+def replace_rooms(dorm: str, rooms):
+    """Replace the whole room inventory of `dorm` in one transaction"""
+    if not isinstance(rooms, list) or not rooms:
+        raise ValueError("Rooms must be a non-empty JSON array")
+    rows = [{"dorm": dorm, **_validate_room(record)} for record in rooms]
+    numbers = {row["number"] for row in rows}
+    if len(numbers) != len(rows):
+        raise ValueError("Room numbers must be unique within a dorm")
+    try:
+        db.session.execute(Room.__table__.delete().where(Room.dorm == dorm))
+        db.session.execute(Room.__table__.insert(), rows)
+        db.session.commit()
+        bump_version(Room)
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(f"Failed to save rooms: {str(e)}")
+    return {
+        "dorm": dorm,
+        "rooms": len(rows),
+        "beds": sum(row["capacity"] for row in rows if not row["out_of_service"])
+    }
+
+
+def clear_rooms(dorm: str):
+    """Drop the rooms table of `dorm`; its room counts apply again"""
+    try:
+        deleted = db.session.execute(Room.__table__.delete().where(Room.dorm == dorm)).rowcount
+        db.session.commit()
+        bump_version(Room)
+        return deleted
+    except Exception as e:
+        db.session.rollback()
+        raise Exception(f"Failed to clear rooms: {str(e)}")
@@ -1,63 +1,141 @@
 from src.config.database import db
-from src.models import Student
+from src.config.settings import settings
+from src.engine import predata_config, PREFERENCE_FIELDS
+from src.models import Student, Assignment, DEFAULT_DORM
+from src.services import (
+    STREAM_BATCH_SIZE,
+    admit_seq,
+    reset_seq,
+    format_student_id,
+    parse_student_id,
+    import_roster,
+    delete_students,
+    apply_batch,
+    bump_version,
+    RosterRepair,
+    roster_cache
+)
+from src.controllers.lottery.controllers.dorm_controller import roster_capacity
 import random
 
 
-def fetch_all_students():
-    return [s.to_dict() for s in Student.query.all()]
+STUDENT_COLUMNS = (
+    "id", "name", "gpa", "corruption", "disabled", "dorm", "sleep_schedule", "noise_tolerance", "study_habits"
+)
 
 
-def add_student(name: str, gpa: float, corruption: bool = False, disabled: bool = False):
+def _student_query(after=None, limit=None):
+    query = db.session.query(*(getattr(Student, column) for column in STUDENT_COLUMNS)).order_by(Student.seq)
+    if after is not None:
+        query = query.filter(Student.seq > parse_student_id(after))
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def fetch_all_students(after=None, limit=None):
+    """
+    Students in id order; `after` (the last id of the previous page) and `limit` select a keyset page.
+    The full list comes from the roster cache until the next student write.
+    """
+    if after is None and limit is None:
+        return list(roster_cache.get(Student, "students", lambda: (row._asdict() for row in _student_query())))
+    return [row._asdict() for row in _student_query(after, limit)]
+
+
+def fetch_student_rows(after=None, limit=None):
+    """fetch_all_students as query rows in STUDENT_COLUMNS order, for `?shape=rows`"""
+    if after is None and limit is None:
+        return list(roster_cache.get(Student, "student_rows", _student_query))
+    return _student_query(after, limit).all()
+
+
+def iter_students():
+    """Yield every student from a server-side cursor, STREAM_BATCH_SIZE rows at a time"""
+    for row in _student_query().yield_per(STREAM_BATCH_SIZE):
+        yield row._asdict()
+
+
+def add_student(name: str, gpa: float, corruption: bool = False, disabled: bool = False, dorm: str = None,
+                preferences: dict = None, repair: bool = None):
+    """
+    Add a student; with `repair` (default REPAIR_ON_ROSTER_CHANGE) they are
+    also placed in the published run. Returns (student_id, repair summary or None).
+    """
+    if repair is None:
+        repair = settings.REPAIR_ON_ROSTER_CHANGE
     try:
-        # Check if we already have 100 students
-        student_count = Student.query.count()
-        if student_count >= 100:
-            raise ValueError("Maximum 100 students allowed for PreData lottery")
-        
-        # Generate new student ID by finding the latest ID and incrementing
-        all_students = Student.query.all()
-        if all_students:
-            # Extract numeric part from student IDs (format: stu-XXX)
-            max_id = 0
-            for student in all_students:
-                try:
-                    # Extract number from format like "stu-001"
-                    num = int(student.id.split('-')[1])
-                    if num > max_id:
-                        max_id = num
-                except (IndexError, ValueError):
-                    continue
-            new_id_num = max_id + 1
-        else:
-            new_id_num = 0
-        
-        student_id = f"stu-{new_id_num:03d}"
+        # Admit against the PreData capacity (summed over dorms) and reserve the next id in one
+        # guarded update of the roster counter, so concurrent writers can never overfill the roster
+        capacity = roster_capacity()
+        seq = admit_seq(Student, capacity)
+        if seq is None:
+            raise ValueError(f"Maximum {capacity} students allowed for PreData lottery")
+        student_id = format_student_id(seq)
         
         student = Student(
             id=student_id,
+            seq=seq,
             name=name,
             gpa=gpa,
             corruption=corruption,
-            disabled=disabled
+            disabled=disabled,
+            dorm=dorm or DEFAULT_DORM,
+            **(preferences or {})
         )
         db.session.add(student)
+        # A single-dorm run only houses the default dorm (multi-dorm runs are never repaired)
+        fixer = RosterRepair.for_published(Assignment, Student) if repair and student.dorm == DEFAULT_DORM else None
+        if fixer:
+            db.session.flush()
+            fixer.arrived(student_id)
         db.session.commit()
-        return student_id
+        if fixer:
+            bump_version(Student, Assignment)
+        else:
+            bump_version(Student)
+        return student_id, fixer.summary() if fixer else None
     except ValueError:
+        db.session.rollback()
         raise
     except Exception as e:
         db.session.rollback()
         raise Exception(f"Failed to add student: {str(e)}")
 
 
-def delete_student(student_id: str):
+def import_students(stream, fmt: str):
+    """Bulk-add students from a CSV/NDJSON upload, up to the PreData capacity (summed over dorms)"""
+    return import_roster(Student, stream, fmt, roster_capacity())
+
+
+def batch_students(operations: list, atomic: bool = False):
+    """
+    Add and delete students in one transaction, up to the PreData capacity.
+    The published run is not repaired. Returns the summary with a result per operation.
+    """
+    summary, _, _ = apply_batch(Student, Assignment, operations, roster_capacity(), atomic)
+    return summary
+
+
+def delete_student(student_id: str, repair: bool = None):
+    """
+    Delete a student; with `repair` (default REPAIR_ON_ROSTER_CHANGE) the bed
+    they free in the published run is refilled. Returns (deleted, repair summary or None).
+    """
+    if repair is None:
+        repair = settings.REPAIR_ON_ROSTER_CHANGE
     try:
-        student = Student.query.get(student_id)
-        if student:
-            db.session.delete(student)
-            db.session.commit()
-            return True
-        return False
+        fixer = RosterRepair.for_published(Assignment, Student) if repair else None
+        row = fixer.placement(student_id) if fixer else None
+        # The admission is only given back for a row this statement deleted
+        if not delete_students(Student, Assignment, [student_id]):
+            db.session.rollback()
+            return False, None
+        if row:
+            fixer.departed(row, bool(row.disabled))
+        db.session.commit()
+        bump_version(Student, Assignment)
+        return True, fixer.summary() if fixer else None
     except Exception as e:
         db.session.rollback()
         raise Exception(f"Failed to delete student: {str(e)}")
@@ -66,7 +144,9 @@ def delete_student(student_id: str):
 def clear_all_students():
     try:
         Student.query.delete()
+        reset_seq(Student)
         db.session.commit()
+        bump_version(Student, Assignment)
         return True
     except Exception as e:
         db.session.rollback()
@@ -88,9 +168,10 @@ def populate_dummy_students():
         if existing_count > 0:
             raise ValueError(f"Database already has {existing_count} students. Please clear the system first using /api/preData/clear")
         
+        reset_seq(Student)
         created = []
-        for i in range(1, 101):
-            sid = f"stu-{i:03d}"
+        for i in range(1, predata_config().capacity + 1):
+            sid = format_student_id(i)
             name = random_name()
             gpa = round(random.uniform(0.0, 5.0), 2)
             corruption = random.random() < 0.1
@@ -98,15 +179,18 @@ def populate_dummy_students():
             
             student = Student(
                 id=sid,
+                seq=i,
                 name=name,
                 gpa=gpa,
                 corruption=corruption,
-                disabled=disabled
+                disabled=disabled,
+                **{field: random.randint(1, 5) for field in PREFERENCE_FIELDS}
             )
             db.session.add(student)
             created.append(sid)
         
         db.session.commit()
+        bump_version(Student)
         return created
     except ValueError:
         raise
@@ -1,20 +1,54 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, url_for
 from src.controllers.lottery import (
     run_lottery,
+    simulate_lottery,
+    run_all_dorms,
+    list_dorms,
+    save_dorm,
+    delete_dorm,
+    list_rooms,
+    replace_rooms,
+    clear_rooms,
+    get_runs,
+    get_run_assignments,
+    verify_lottery_run,
+    ASSIGNMENT_COLUMNS,
     get_assignments,
+    get_assignment_rows,
+    iter_assignments,
+    STUDENT_COLUMNS,
     add_student,
+    import_students,
+    batch_students,
     delete_student,
     fetch_all_students,
+    fetch_student_rows,
+    iter_students,
     clear_all_students,
     populate_dummy_students
 )
+from src.models import Student, Assignment, Room, DEFAULT_DORM
+from src.services import LIST_ARGS, lottery_jobs, atomic_arg, batch_operations, job_key, conditional_get, import_format, parse_preferences, repair_arg, page_args, shape_arg, rows_payload, decode_cursor, next_cursor, stream_response
 
 lottery_bp = Blueprint("preData", __name__)
 
-
 @lottery_bp.route("/students", methods=["GET"])
+@conditional_get(Student, args=LIST_ARGS)
 def get_students_endpoint():
     try:
+        if request.args.get("stream"):
+            return stream_response(iter_students(), request.args["stream"])
+        limit, cursor = page_args(request.args)
+        if shape_arg(request.args):
+            rows = fetch_student_rows(after=cursor, limit=limit)
+            cursor = next_cursor(rows, limit, "id", columns=STUDENT_COLUMNS) if limit else None
+            return jsonify(rows_payload(STUDENT_COLUMNS, rows, next_cursor=cursor)), 200
+        if limit:
+            students = fetch_all_students(after=cursor, limit=limit)
+            return jsonify({
+                "students": students,
+                "next_cursor": next_cursor(students, limit, "id")
+            }), 200
         students = fetch_all_students()
         return jsonify(students), 200
     except Exception as e:
@@ -33,25 +67,52 @@ def add_student_endpoint():
             return jsonify({"error": f"Missing required field: {field}"}), 400
     
     try:
-        student_id = add_student(
+        student_id, repair = add_student(
             name=body["name"],
             gpa=float(body["gpa"]),
             corruption=bool(body.get("corruption", False)),
-            disabled=bool(body.get("disabled", False))
+            disabled=bool(body.get("disabled", False)),
+            dorm=body.get("dorm"),
+            preferences=parse_preferences(body),
+            repair=repair_arg(request.args)
         )
-        return jsonify({"id": student_id, "message": "PreData student added"}), 201
+        return jsonify({"id": student_id, "message": "PreData student added", "repair": repair}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@lottery_bp.route("/importStudents", methods=["POST"])
+def import_students_endpoint():
+    try:
+        fmt = import_format(request.args.get("format"), request.mimetype)
+        summary = import_students(request.stream, fmt)
+        return jsonify({"message": "PreData students imported", **summary}), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@lottery_bp.route("/batchStudents", methods=["POST"])
+def batch_students_endpoint():
+    try:
+        summary = batch_students(batch_operations(request.get_json(silent=True)), atomic=atomic_arg(request.args))
+        message = "PreData student batch applied" if summary["applied"] else "PreData student batch rolled back"
+        return jsonify({"message": message, **summary}), 200 if summary["applied"] else 400
+    except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 
 @lottery_bp.route("/deleteStudent/<student_id>", methods=["DELETE"])
 def delete_student_endpoint(student_id):
     try:
-        deleted = delete_student(student_id)
+        deleted, repair = delete_student(student_id, repair=repair_arg(request.args))
         if deleted:
-            return jsonify({"message": f"PreData student {student_id} deleted"}), 200
+            return jsonify({"message": f"PreData student {student_id} deleted", "repair": repair}), 200
         else:
             return jsonify({"error": "Student not found"}), 404
     except Exception as e:
@@ -61,15 +122,177 @@ def delete_student_endpoint(student_id):
 @lottery_bp.route("/runTheLottery", methods=["POST"])
 def run_lottery_endpoint():
     try:
-        result = run_lottery()
+        overrides = request.get_json(silent=True)
+        if request.args.get("async", "").lower() in ("1", "true"):
+            job, coalesced = lottery_jobs.submit(
+                current_app._get_current_object(),
+                job_key("preData", overrides),
+                run_lottery,
+                overrides
+            )
+            location = url_for(".lottery_job_endpoint", job_id=job["id"])
+            return jsonify({**job, "coalesced": coalesced}), 202, {"Location": location}
+        result = run_lottery(overrides)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@lottery_bp.route("/runAllDorms", methods=["POST"])
+def run_all_dorms_endpoint():
+    try:
+        options = request.get_json(silent=True)
+        if request.args.get("async", "").lower() in ("1", "true"):
+            job, coalesced = lottery_jobs.submit(
+                current_app._get_current_object(),
+                job_key("preData:dorms", options),
+                run_all_dorms,
+                options
+            )
+            location = url_for(".lottery_job_endpoint", job_id=job["id"])
+            return jsonify({**job, "coalesced": coalesced}), 202, {"Location": location}
+        result = run_all_dorms(options)
         return jsonify(result), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
+@lottery_bp.route("/dorms", methods=["GET"])
+def get_dorms_endpoint():
+    try:
+        return jsonify(list_dorms()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@lottery_bp.route("/dorms/<name>", methods=["PUT"])
+def save_dorm_endpoint(name):
+    try:
+        dorm = save_dorm(name, request.get_json(silent=True))
+        return jsonify(dorm), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@lottery_bp.route("/dorms/<name>", methods=["DELETE"])
+def delete_dorm_endpoint(name):
+    try:
+        if delete_dorm(name):
+            return jsonify({"message": f"Dorm {name} deleted"}), 200
+        return jsonify({"error": "Dorm not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@lottery_bp.route("/rooms", methods=["GET"])
+@conditional_get(Room, args=("dorm",))
+def get_rooms_endpoint():
+    try:
+        return jsonify(list_rooms(request.args.get("dorm", DEFAULT_DORM))), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@lottery_bp.route("/rooms", methods=["PUT"])
+def replace_rooms_endpoint():
+    try:
+        summary = replace_rooms(request.args.get("dorm", DEFAULT_DORM), request.get_json(silent=True))
+        return jsonify({"message": "Room inventory saved", **summary}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@lottery_bp.route("/rooms", methods=["DELETE"])
+def clear_rooms_endpoint():
+    try:
+        deleted = clear_rooms(request.args.get("dorm", DEFAULT_DORM))
+        return jsonify({"message": "Room inventory cleared", "count": deleted}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@lottery_bp.route("/simulateOdds", methods=["GET", "POST"])
+def simulate_odds_endpoint():
+    try:
+        trials = request.args.get("trials", 10000, type=int)
+        seed = request.args.get("seed", type=int)
+        result = simulate_lottery(trials, request.get_json(silent=True), seed=seed)
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@lottery_bp.route("/lotteryJobs/<job_id>", methods=["GET"])
+def lottery_job_endpoint(job_id):
+    try:
+        job = lottery_jobs.get(job_id)
+        if job:
+            return jsonify(job), 200
+        return jsonify({"error": "Job not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@lottery_bp.route("/runs", methods=["GET"])
+@conditional_get(Assignment)
+def get_runs_endpoint():
+    try:
+        return jsonify(get_runs()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@lottery_bp.route("/runs/<int:run_id>/assignments", methods=["GET"])
+@conditional_get(Student, Assignment)
+def get_run_assignments_endpoint(run_id):
+    try:
+        run = get_run_assignments(run_id)
+        if run is None:
+            return jsonify({"error": "Run not found"}), 404
+        return jsonify(run), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@lottery_bp.route("/runs/<int:run_id>/verify", methods=["GET"])
+def verify_run_endpoint(run_id):
+    try:
+        result = verify_lottery_run(run_id)
+        if result is None:
+            return jsonify({"error": "Run not found"}), 404
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @lottery_bp.route("/assignments", methods=["GET"])
+@conditional_get(Student, Assignment, args=LIST_ARGS)
 def get_assignments_endpoint():
     try:
+        if request.args.get("stream"):
+            return stream_response(iter_assignments(), request.args["stream"])
+        limit, cursor = page_args(request.args)
+        after = decode_cursor(cursor, int, str) if cursor else None
+        if shape_arg(request.args):
+            rows = get_assignment_rows(after=after, limit=limit)
+            cursor = next_cursor(rows, limit, "room_number", "student_id", columns=ASSIGNMENT_COLUMNS) if limit else None
+            return jsonify(rows_payload(ASSIGNMENT_COLUMNS, rows, next_cursor=cursor)), 200
+        if limit:
+            assignments = get_assignments(after=after, limit=limit)
+            return jsonify({
+                "assignments": assignments,
+                "next_cursor": next_cursor(assignments, limit, "room_number", "student_id")
+            }), 200
         assignments = get_assignments()
         return jsonify(assignments), 200
     except Exception as e:
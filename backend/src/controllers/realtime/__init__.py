@@ -1,22 +1,45 @@
 """
 RealTime lottery controllers
 """
-from src.controllers.realtime.controllers.lottery_controller import run_lottery
-from src.controllers.realtime.controllers.assignments_controller import get_assignments
+from src.controllers.realtime.controllers.lottery_controller import (
+    run_lottery,
+    simulate_lottery,
+    get_runs,
+    get_run_assignments,
+    verify_lottery_run
+)
+from src.controllers.realtime.controllers.assignments_controller import ASSIGNMENT_COLUMNS, get_assignments, get_assignment_rows, iter_assignments
 from src.controllers.realtime.controllers.student_controller import (
+    STUDENT_COLUMNS,
     add_student,
+    import_students,
+    batch_students,
     delete_student,
     fetch_all_students,
+    fetch_student_rows,
+    iter_students,
     get_student_count,
     clear_all_students
 )
 
 __all__ = [
     'run_lottery',
+    'simulate_lottery',
+    'get_runs',
+    'get_run_assignments',
+    'verify_lottery_run',
+    'ASSIGNMENT_COLUMNS',
     'get_assignments',
+    'get_assignment_rows',
+    'iter_assignments',
+    'STUDENT_COLUMNS',
     'add_student',
+    'import_students',
+    'batch_students',
     'delete_student',
     'fetch_all_students',
+    'fetch_student_rows',
+    'iter_students',
     'get_student_count',
     'clear_all_students'
 ]
@@ -1,33 +1,76 @@
+from sqlalchemy import tuple_
+from sqlalchemy.orm import aliased
+from src.config.database import db
 from src.models.realtime_assignment import RealtimeAssignment
 from src.models.realtime_student import RealtimeStudent
+from src.services import STREAM_BATCH_SIZE, published_run_id
 
 
-def get_assignments():
-    assignments = RealtimeAssignment.query.join(RealtimeStudent).order_by(
+ASSIGNMENT_COLUMNS = (
+    'assignment_id', 'student_id', 'student_name', 'gpa', 'corruption', 'disabled',
+    'room_number', 'room_type', 'roommate_id', 'roommate_name'
+)
+
+
+def _assignment_query(after=None, limit=None):
+    # One SELECT: the student table is joined a second time for the roommate name
+    Roommate = aliased(RealtimeStudent)
+    query = db.session.query(
+        RealtimeAssignment.id,
+        RealtimeStudent.id,
+        RealtimeStudent.name,
+        RealtimeStudent.gpa,
+        RealtimeStudent.corruption,
+        RealtimeStudent.disabled,
+        RealtimeAssignment.room_number,
+        RealtimeAssignment.room_type,
+        RealtimeAssignment.roommate_id,
+        Roommate.name
+    ).join(
+        RealtimeStudent, RealtimeStudent.id == RealtimeAssignment.student_id
+    ).outerjoin(
+        Roommate, Roommate.id == RealtimeAssignment.roommate_id
+    ).filter(
+        RealtimeAssignment.run_id == published_run_id(RealtimeAssignment)
+    ).order_by(
         RealtimeAssignment.room_number,
         RealtimeAssignment.student_id
-    ).all()
-    
-    result = []
-    for assignment in assignments:
-        student = assignment.student
-        roommate_name = None
-        if assignment.roommate_id:
-            roommate = RealtimeStudent.query.get(assignment.roommate_id)
-            if roommate:
-                roommate_name = roommate.name
-        
-        result.append({
-            'assignment_id': assignment.id,
-            'student_id': student.id,
-            'student_name': student.name,
-            'gpa': student.gpa,
-            'corruption': student.corruption,
-            'disabled': student.disabled,
-            'room_number': assignment.room_number,
-            'room_type': assignment.room_type,
-            'roommate_id': assignment.roommate_id,
-            'roommate_name': roommate_name
-        })
-    
-    return result
+    )
+    if after is not None:
+        query = query.filter(
+            tuple_(RealtimeAssignment.room_number, RealtimeAssignment.student_id) > tuple_(*after)
+        )
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def _to_dict(row):
+    (assignment_id, student_id, student_name, gpa, corruption, disabled,
+     room_number, room_type, roommate_id, roommate_name) = row
+    return {
+        'assignment_id': assignment_id,
+        'student_id': student_id,
+        'student_name': student_name,
+        'gpa': gpa,
+        'corruption': corruption,
+        'disabled': disabled,
+        'room_number': room_number,
+        'room_type': room_type,
+        'roommate_id': roommate_id,
+        'roommate_name': roommate_name
+    }
+
+
+def get_assignments(after=None, limit=None):
+    return [_to_dict(row) for row in _assignment_query(after, limit)]
+
+
+def iter_assignments():
+    for row in _assignment_query().yield_per(STREAM_BATCH_SIZE):
+        yield _to_dict(row)
+
+
+def get_assignment_rows(after=None, limit=None):
+    # get_assignments as query rows in ASSIGNMENT_COLUMNS order, for ?shape=rows
+    return _assignment_query(after, limit).all()
@@ -1,101 +1,88 @@
-import random
 from src.config.database import db
+from src.config.settings import settings
+from src.engine import (
+    Applicant, summarize, realtime_config, simulate_odds,
+    POLICY_VERSION, new_seed, roster_digest, dump_roster, dump_config, seeded_allocate, PREFERENCE_FIELDS, preference_vector
+)
 from src.models.realtime_student import RealtimeStudent
 from src.models.realtime_assignment import RealtimeAssignment
+from src.services import publish_assignments, realtime_events, list_runs, run_assignments, verify_run, roster_cache
 
 
-def run_lottery():
+def _query_applicants():
+    rows = db.session.query(
+        RealtimeStudent.id,
+        RealtimeStudent.gpa,
+        RealtimeStudent.corruption,
+        RealtimeStudent.disabled,
+        *(getattr(RealtimeStudent, field) for field in PREFERENCE_FIELDS)
+    ).order_by(RealtimeStudent.seq)
+    return (
+        Applicant(sid, gpa, bool(corruption), bool(disabled), preference_vector(prefs))
+        for sid, gpa, corruption, disabled, *prefs in rows
+    )
+
+
+def _load_applicants():
+    return roster_cache.get(RealtimeStudent, "applicants", _query_applicants)
+
+
+def run_lottery(overrides=None):
     """
     Run the lottery for exactly 10 students:
     - 1 premium room (corrupt or random)
     - 3 single rooms (top GPA + disabled + random)
-    - 3 double rooms (remaining 6 students, 2 per room)
+    - 3 double rooms (remaining 6 students, 2 per room, paired by preferences when given)
+
+    Room counts come from the RealTime preset; `overrides` (e.g. the request
+    body) may change them, in which case the roster only has to fit.
     """
+    preset = realtime_config()
+    config = preset.with_overrides(overrides or {})
+
+    applicants = _load_applicants()
+
     # Check if we have exactly 10 students
-    students = RealtimeStudent.query.all()
-    if len(students) != 10:
-        raise ValueError(f"Realtime lottery requires exactly 10 students, but found {len(students)}")
-    
-    RealtimeAssignment.query.delete()
-    
-    available_students = students.copy()
-    random.shuffle(available_students)
-    
-    assignments = []
-    
-    # 1. Premium Room
-    corrupt_students = [s for s in available_students if s.corruption]
-    if corrupt_students:
-        premium_student = corrupt_students[0]
-    else:
-        premium_student = available_students[0]
-    
-    assignments.append(RealtimeAssignment(
-        student_id=premium_student.id,
-        room_number=1,
-        room_type='premium',
-        roommate_id=None
-    ))
-    available_students.remove(premium_student)
-    
-    # 2. Single Rooms
-    single_room_students = []
-    
-    # Get top GPA student
-    available_students.sort(key=lambda s: s.gpa, reverse=True)
-    if available_students:
-        single_room_students.append(available_students.pop(0))
+    if config == preset and len(applicants) != config.capacity:
+        raise ValueError(f"Realtime lottery requires exactly {config.capacity} students, but found {len(applicants)}")
     
-    # Get disabled student/s
-    disabled_students = [s for s in available_students if s.disabled]
-    if disabled_students and len(single_room_students) < 3:
-        single_room_students.append(disabled_students[0])
-        available_students.remove(disabled_students[0])
-    
-    # Fill remaining single rooms randomly
-    while len(single_room_students) < 3 and available_students:
-        random_student = random.choice(available_students)
-        single_room_students.append(random_student)
-        available_students.remove(random_student)
-    
-    for i, student in enumerate(single_room_students):
-        assignments.append(RealtimeAssignment(
-            student_id=student.id,
-            room_number=2 + i,
-            room_type='single',
-            roommate_id=None
-        ))
-    
-    # 3. Double Rooms
-    random.shuffle(available_students)
-    for i in range(0, len(available_students), 2):
-        if i + 1 < len(available_students):
-
-            s1 = available_students[i]
-            s2 = available_students[i + 1]
-            room_number = 5 + (i // 2)
-            
-            assignments.append(RealtimeAssignment(
-                student_id=s1.id,
-                room_number=room_number,
-                room_type='double',
-                roommate_id=s2.id
-            ))
-            assignments.append(RealtimeAssignment(
-                student_id=s2.id,
-                room_number=room_number,
-                room_type='double',
-                roommate_id=s1.id
-            ))
+    # A per-run seed makes the run reproducible from its record alone
+    seed = (overrides or {}).get("seed")
+    seed = new_seed() if seed is None else int(seed)
+    placements = seeded_allocate(applicants, config, seed)
+    provenance = {
+        "seed": seed,
+        "policy_version": POLICY_VERSION,
+        "roster_digest": roster_digest(applicants),
+        "roster": dump_roster(applicants),
+        "config": dump_config(config)
+    }
+
+    run_id, write_ms = publish_assignments(RealtimeAssignment, placements, provenance)
     
-    for assignment in assignments:
-        db.session.add(assignment)
-    db.session.commit()
+    summary = summarize(placements)
+    realtime_events.publish("lottery_completed", {"run_id": run_id, **summary})
     
-    return {
-        "message": "Realtime lottery completed successfully",
-        "total_students": 10,
-        "premium_rooms": 1,
-        "single_rooms": 3,
-        "double_rooms": 3
-    }
+    return {"message": "Realtime lottery completed successfully", **summary, "run_id": run_id, "seed": seed, "write_ms": write_ms}
+
+
+def simulate_lottery(trials, overrides=None, seed=None):
+    # Odds per student with the RealTime policy, computed in memory only
+    if not 1 <= trials <= settings.SIMULATION_MAX_TRIALS:
+        raise ValueError(f"trials must be between 1 and {settings.SIMULATION_MAX_TRIALS}")
+    config = realtime_config().with_overrides(overrides or {})
+    return simulate_odds(_load_applicants(), config, trials, seed=seed, workers=settings.SIMULATION_WORKERS or None)
+
+
+def get_runs():
+    return list_runs(RealtimeAssignment)
+
+
+def get_run_assignments(run_id):
+    """Assignments of one run, replayed from its seed if its rows were archived (None if unknown)"""
+    return run_assignments(RealtimeAssignment, run_id, _load_applicants)
+
+
+def verify_lottery_run(run_id):
+    """Replay one run and check it against its stored rows (None if unknown)"""
+    return verify_run(RealtimeAssignment, run_id, _load_applicants)
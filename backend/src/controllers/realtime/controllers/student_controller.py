@@ -1,56 +1,146 @@
 from src.config.database import db
+from src.config.settings import settings
+from src.engine import realtime_config
 from src.models.realtime_student import RealtimeStudent
+from src.models.realtime_assignment import RealtimeAssignment
+from src.services import (
+    STREAM_BATCH_SIZE,
+    admit_seq,
+    reset_seq,
+    format_student_id,
+    parse_student_id,
+    import_roster,
+    delete_students,
+    apply_batch,
+    bump_version,
+    realtime_events,
+    RosterRepair,
+    roster_cache
+)
 
 
-def add_student(name, gpa, corruption=False, disabled=False):
-    # Check if we already have 10 students
-    student_count = RealtimeStudent.query.count()
-    if student_count >= 10:
-        raise ValueError("Maximum 10 students allowed for realtime lottery")
-    
-    # Generate new student ID by finding the latest ID and incrementing
-    all_students = RealtimeStudent.query.all()
-    if all_students:
-        # Extract numeric part from student IDs (format: stu-XXX)
-        max_id = 0
-        for student in all_students:
-            try:
-                # Extract number from format like "stu-001"
-                num = int(student.id.split('-')[1])
-                if num > max_id:
-                    max_id = num
-            except (IndexError, ValueError):
-                continue
-        new_id_num = max_id + 1
-    else:
-        new_id_num = 0
-    
-    student_id = f"stu-{new_id_num:03d}"
+STUDENT_COLUMNS = (
+    "id", "name", "gpa", "corruption", "disabled", "sleep_schedule", "noise_tolerance", "study_habits"
+)
+
+
+def add_student(name, gpa, corruption=False, disabled=False, preferences=None, repair=None):
+    """Add a student (placed in the published run with `repair`); returns (student_id, repair summary or None)"""
+    if repair is None:
+        repair = settings.REPAIR_ON_ROSTER_CHANGE
+    # Admit against the RealTime capacity and reserve the next id in one guarded counter update
+    capacity = realtime_config().capacity
+    seq = admit_seq(RealtimeStudent, capacity)
+    if seq is None:
+        db.session.rollback()
+        raise ValueError(f"Maximum {capacity} students allowed for realtime lottery")
+    student_id = format_student_id(seq)
     
     student = RealtimeStudent(
         id=student_id,
+        seq=seq,
         name=name,
         gpa=gpa,
         corruption=corruption,
-        disabled=disabled
+        disabled=disabled,
+        **(preferences or {})
     )
     db.session.add(student)
+    fixer = RosterRepair.for_published(RealtimeAssignment, RealtimeStudent) if repair else None
+    if fixer:
+        db.session.flush()
+        try:
+            fixer.arrived(student_id)
+        except Exception:
+            db.session.rollback()
+            raise
+    db.session.commit()
+    if fixer:
+        bump_version(RealtimeStudent, RealtimeAssignment)
+    else:
+        bump_version(RealtimeStudent)
+    realtime_events.publish("student_added", {
+        "id": student_id,
+        "name": name,
+        "gpa": gpa,
+        "corruption": corruption,
+        "disabled": disabled,
+        **(preferences or {})
+    })
+    if fixer:
+        realtime_events.publish("assignments_repaired", fixer.summary())
+    return student_id, fixer.summary() if fixer else None
+
+
+def import_students(stream, fmt):
+    summary = import_roster(RealtimeStudent, stream, fmt, realtime_config().capacity)
+    if summary["imported"]:
+        realtime_events.publish("students_imported", {"imported": summary["imported"]})
+    return summary
+
+
+def batch_students(operations, atomic=False):
+    """Add and delete students in one transaction, up to the RealTime capacity. Returns the summary"""
+    summary, added, deleted = apply_batch(
+        RealtimeStudent, RealtimeAssignment, operations, realtime_config().capacity, atomic
+    )
+    for student_id in deleted:
+        realtime_events.publish("student_deleted", {"id": student_id})
+    for row in added:
+        realtime_events.publish("student_added", {key: value for key, value in row.items() if key != "seq"})
+    return summary
+
+
+def delete_student(student_id, repair=None):
+    """Delete a student, refilling their bed with `repair`. Returns (deleted, repair summary or None)"""
+    if repair is None:
+        repair = settings.REPAIR_ON_ROSTER_CHANGE
+    fixer = RosterRepair.for_published(RealtimeAssignment, RealtimeStudent) if repair else None
+    row = fixer.placement(student_id) if fixer else None
+    if not delete_students(RealtimeStudent, RealtimeAssignment, [student_id]):
+        db.session.rollback()
+        return False, None
+    if row:
+        fixer.departed(row, bool(row.disabled))
     db.session.commit()
-    return student.id
+    bump_version(RealtimeStudent, RealtimeAssignment)
+    realtime_events.publish("student_deleted", {"id": student_id})
+    if fixer:
+        realtime_events.publish("assignments_repaired", fixer.summary())
+    return True, fixer.summary() if fixer else None
+
+
+def _student_query(after=None, limit=None):
+    query = db.session.query(
+        *(getattr(RealtimeStudent, column) for column in STUDENT_COLUMNS)
+    ).order_by(RealtimeStudent.seq)
+    if after is not None:
+        query = query.filter(RealtimeStudent.seq > parse_student_id(after))
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def fetch_all_students(after=None, limit=None):
+    """
+    Students in id order; `after` (the last id of the previous page) and `limit` select a keyset page.
+    The full list comes from the roster cache until the next student write.
+    """
+    if after is None and limit is None:
+        return list(roster_cache.get(RealtimeStudent, "students", lambda: (row._asdict() for row in _student_query())))
+    return [row._asdict() for row in _student_query(after, limit)]
 
 
-def delete_student(student_id):
-    student = RealtimeStudent.query.get(student_id)
-    if student:
-        db.session.delete(student)
-        db.session.commit()
-        return True
-    return False
+def fetch_student_rows(after=None, limit=None):
+    """fetch_all_students as query rows in STUDENT_COLUMNS order, for `?shape=rows`"""
+    if after is None and limit is None:
+        return list(roster_cache.get(RealtimeStudent, "student_rows", _student_query))
+    return _student_query(after, limit).all()
 
 
-def fetch_all_students():
-    students = RealtimeStudent.query.all()
-    return [student.to_dict() for student in students]
+def iter_students():
+    for row in _student_query().yield_per(STREAM_BATCH_SIZE):
+        yield row._asdict()
 
 
 def get_student_count():
@@ -59,5 +149,8 @@ def get_student_count():
 
 def clear_all_students():
     RealtimeStudent.query.delete()
+    reset_seq(RealtimeStudent)
     db.session.commit()
+    bump_version(RealtimeStudent, RealtimeAssignment)
+    realtime_events.publish("system_cleared")
     return True
@@ -1,25 +1,59 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, url_for
 from src.controllers.realtime import (
     run_lottery,
+    simulate_lottery,
+    get_runs,
+    get_run_assignments,
+    verify_lottery_run,
+    ASSIGNMENT_COLUMNS,
     get_assignments,
+    get_assignment_rows,
+    iter_assignments,
+    STUDENT_COLUMNS,
     add_student,
+    import_students,
+    batch_students,
     delete_student,
     fetch_all_students,
+    fetch_student_rows,
+    iter_students,
     get_student_count,
     clear_all_students
 )
+from src.engine import realtime_config
+from src.models import RealtimeStudent, RealtimeAssignment
+from src.services import LIST_ARGS, lottery_jobs, atomic_arg, batch_operations, job_key, realtime_events, conditional_get, import_format, parse_preferences, repair_arg, page_args, shape_arg, rows_payload, decode_cursor, next_cursor, stream_response
 
 realtime_bp = Blueprint("realtime", __name__)
 
-
 @realtime_bp.route("/students", methods=["GET"])
+@conditional_get(RealtimeStudent, args=LIST_ARGS)
 def get_students_endpoint():
     try:
+        if request.args.get("stream"):
+            return stream_response(iter_students(), request.args["stream"])
+        limit, cursor = page_args(request.args)
+        if shape_arg(request.args):
+            rows = fetch_student_rows(after=cursor, limit=limit)
+            return jsonify(rows_payload(
+                STUDENT_COLUMNS, rows,
+                count=get_student_count() if limit else len(rows),
+                max=realtime_config().capacity,
+                next_cursor=next_cursor(rows, limit, "id", columns=STUDENT_COLUMNS) if limit else None
+            )), 200
+        if limit:
+            students = fetch_all_students(after=cursor, limit=limit)
+            return jsonify({
+                "students": students,
+                "count": get_student_count(),
+                "max": realtime_config().capacity,
+                "next_cursor": next_cursor(students, limit, "id")
+            }), 200
         students = fetch_all_students()
         return jsonify({
             "students": students,
             "count": len(students),
-            "max": 10
+            "max": realtime_config().capacity
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
@@ -37,16 +71,19 @@ def add_student_endpoint():
             return jsonify({"error": f"Missing required field: {field}"}), 400
     
     try:
-        student_id = add_student(
+        student_id, repair = add_student(
             name=body["name"],
             gpa=float(body["gpa"]),
             corruption=bool(body.get("corruption", False)),
-            disabled=bool(body.get("disabled", False))
+            disabled=bool(body.get("disabled", False)),
+            preferences=parse_preferences(body),
+            repair=repair_arg(request.args)
         )
         return jsonify({
             "id": student_id,
             "message": "Realtime student added",
-            "current_count": get_student_count()
+            "current_count": get_student_count(),
+            "repair": repair
         }), 201
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
@@ -54,14 +91,43 @@ def add_student_endpoint():
         return jsonify({"error": str(e)}), 500
 
 
+@realtime_bp.route("/importStudents", methods=["POST"])
+def import_students_endpoint():
+    try:
+        fmt = import_format(request.args.get("format"), request.mimetype)
+        summary = import_students(request.stream, fmt)
+        return jsonify({"message": "Realtime students imported", **summary}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@realtime_bp.route("/batchStudents", methods=["POST"])
+def batch_students_endpoint():
+    try:
+        summary = batch_students(batch_operations(request.get_json(silent=True)), atomic=atomic_arg(request.args))
+        message = "Realtime student batch applied" if summary["applied"] else "Realtime student batch rolled back"
+        return jsonify({
+            "message": message,
+            "current_count": get_student_count(),
+            **summary
+        }), 200 if summary["applied"] else 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @realtime_bp.route("/deleteStudent/<student_id>", methods=["DELETE"])
 def delete_student_endpoint(student_id):
     try:
-        deleted = delete_student(student_id)
+        deleted, repair = delete_student(student_id, repair=repair_arg(request.args))
         if deleted:
             return jsonify({
                 "message": f"Realtime student {student_id} deleted",
-                "current_count": get_student_count()
+                "current_count": get_student_count(),
+                "repair": repair
             }), 200
         else:
             return jsonify({"error": "Student not found"}), 404
@@ -72,7 +138,17 @@ def delete_student_endpoint(student_id):
 @realtime_bp.route("/runTheLottery", methods=["POST"])
 def run_lottery_endpoint():
     try:
-        result = run_lottery()
+        overrides = request.get_json(silent=True)
+        if request.args.get("async", "").lower() in ("1", "true"):
+            job, coalesced = lottery_jobs.submit(
+                current_app._get_current_object(),
+                job_key("realtime", overrides),
+                run_lottery,
+                overrides
+            )
+            location = url_for(".lottery_job_endpoint", job_id=job["id"])
+            return jsonify({**job, "coalesced": coalesced}), 202, {"Location": location}
+        result = run_lottery(overrides)
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
@@ -80,9 +156,84 @@ def run_lottery_endpoint():
         return jsonify({"error": str(e)}), 500
 
 
+@realtime_bp.route("/simulateOdds", methods=["GET", "POST"])
+def simulate_odds_endpoint():
+    try:
+        trials = request.args.get("trials", 10000, type=int)
+        seed = request.args.get("seed", type=int)
+        result = simulate_lottery(trials, request.get_json(silent=True), seed=seed)
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@realtime_bp.route("/lotteryJobs/<job_id>", methods=["GET"])
+def lottery_job_endpoint(job_id):
+    try:
+        job = lottery_jobs.get(job_id)
+        if job:
+            return jsonify(job), 200
+        return jsonify({"error": "Job not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@realtime_bp.route("/runs", methods=["GET"])
+@conditional_get(RealtimeAssignment)
+def get_runs_endpoint():
+    try:
+        return jsonify(get_runs()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@realtime_bp.route("/runs/<int:run_id>/assignments", methods=["GET"])
+@conditional_get(RealtimeStudent, RealtimeAssignment)
+def get_run_assignments_endpoint(run_id):
+    try:
+        run = get_run_assignments(run_id)
+        if run is None:
+            return jsonify({"error": "Run not found"}), 404
+        return jsonify(run), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@realtime_bp.route("/runs/<int:run_id>/verify", methods=["GET"])
+def verify_run_endpoint(run_id):
+    try:
+        result = verify_lottery_run(run_id)
+        if result is None:
+            return jsonify({"error": "Run not found"}), 404
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @realtime_bp.route("/assignments", methods=["GET"])
+@conditional_get(RealtimeStudent, RealtimeAssignment, args=LIST_ARGS)
 def get_assignments_endpoint():
     try:
+        if request.args.get("stream"):
+            return stream_response(iter_assignments(), request.args["stream"])
+        limit, cursor = page_args(request.args)
+        after = decode_cursor(cursor, int, str) if cursor else None
+        if shape_arg(request.args):
+            rows = get_assignment_rows(after=after, limit=limit)
+            cursor = next_cursor(rows, limit, "room_number", "student_id", columns=ASSIGNMENT_COLUMNS) if limit else None
+            return jsonify(rows_payload(ASSIGNMENT_COLUMNS, rows, next_cursor=cursor)), 200
+        if limit:
+            assignments = get_assignments(after=after, limit=limit)
+            return jsonify({
+                "assignments": assignments,
+                "next_cursor": next_cursor(assignments, limit, "room_number", "student_id")
+            }), 200
         assignments = get_assignments()
         return jsonify(assignments), 200
     except Exception as e:
@@ -99,3 +250,19 @@ def clear_system_endpoint():
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
+
+
+# Server-Sent Events: student_added, student_deleted, students_imported, system_cleared, lottery_completed
+@realtime_bp.route("/events", methods=["GET"])
+def events_endpoint():
+    # Every open stream holds a request thread, so they are capped per worker
+    if not realtime_events.acquire():
+        return jsonify({"error": "Too many open event streams; retry later"}), 503, {"Retry-After": "5"}
+    last_event_id = request.headers.get("Last-Event-ID")
+    response = Response(
+        realtime_events.subscribe(last_event_id),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    response.call_on_close(realtime_events.release)
+    return response
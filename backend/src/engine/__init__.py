@@ -0,0 +1,22 @@
+"""
+Allocation engine
+"""
+from src.engine.allocation import Applicant, Placement, LotteryConfig, allocate, summarize
+from src.engine.presets import predata_config, realtime_config
+from src.engine.simulation import simulate_odds
+from src.engine.rooms import RoomSpec, allocate_rooms, inventory_beds, rooms_digest
+from src.engine.replay import (
+    POLICY_VERSION, new_seed, roster_digest, dump_roster, load_roster, dump_config, load_config, seeded_allocate,
+    inventory_capacity, describe_inventory, parse_inventory
+)
+from src.engine.matching import PREFERENCE_FIELDS, preference_vector, preference_distance, match_order
+from src.engine.dorms import shard_seed, rosters_digest, dump_rosters, load_rosters, allocate_dorms, dump_dorm_configs, load_dorm_configs
+
+__all__ = [
+    'Applicant', 'Placement', 'LotteryConfig', 'allocate', 'summarize', 'predata_config', 'realtime_config', 'simulate_odds',
+    'RoomSpec', 'allocate_rooms', 'inventory_beds', 'rooms_digest',
+    'POLICY_VERSION', 'new_seed', 'roster_digest', 'dump_roster', 'load_roster', 'dump_config', 'load_config', 'seeded_allocate',
+    'inventory_capacity', 'describe_inventory', 'parse_inventory',
+    'PREFERENCE_FIELDS', 'preference_vector', 'preference_distance', 'match_order',
+    'shard_seed', 'rosters_digest', 'dump_rosters', 'load_rosters', 'allocate_dorms', 'dump_dorm_configs', 'load_dorm_configs'
+]
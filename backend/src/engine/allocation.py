@@ -0,0 +1,157 @@
+"""
+Allocation engine - capacity-parameterized room lottery shared by both systems
+"""
+import heapq
+import random
+from dataclasses import dataclass, fields, replace
+from operator import attrgetter
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from src.engine.matching import has_preferences, match_order
+
+
+class Applicant(NamedTuple):
+    id: str
+    gpa: float
+    corruption: bool
+    disabled: bool
+    prefs: Optional[Tuple[Optional[int], ...]] = None  # lifestyle answers, see matching.PREFERENCE_FIELDS
+
+
+class Placement(NamedTuple):
+    student_id: str
+    room_number: int
+    room_type: str
+    roommate_id: Optional[str]
+    dorm: Optional[str] = None  # set by multi-dorm runs; room numbers restart in every dorm
+
+
+@dataclass(frozen=True)
+class LotteryConfig:
+    """
+    Room inventory for one lottery run.
+    Singles are split between top GPA, disabled and random picks; the GPA and
+    disabled quotas default to a third of the single rooms each.
+    """
+    premium_rooms: int
+    single_rooms: int
+    double_rooms: int
+    top_gpa_singles: Optional[int] = None
+    disabled_singles: Optional[int] = None
+
+    def __post_init__(self):
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value is not None and value < 0:
+                raise ValueError(f"{f.name} must not be negative")
+
+    @property
+    def capacity(self):
+        return self.premium_rooms + self.single_rooms + 2 * self.double_rooms
+
+    @property
+    def gpa_quota(self):
+        quota = self.single_rooms // 3 if self.top_gpa_singles is None else self.top_gpa_singles
+        return min(quota, self.single_rooms)
+
+    @property
+    def disabled_quota(self):
+        quota = self.single_rooms // 3 if self.disabled_singles is None else self.disabled_singles
+        return min(quota, self.single_rooms)
+
+    def with_overrides(self, overrides):
+        """Return a copy with any room counts present in `overrides` (e.g. a request body) applied"""
+        if not isinstance(overrides, dict):
+            raise ValueError("Lottery settings must be a JSON object")
+        changes = {}
+        for f in fields(self):
+            if overrides.get(f.name) is not None:
+                try:
+                    changes[f.name] = int(overrides[f.name])
+                except (TypeError, ValueError):
+                    raise ValueError(f"{f.name} must be an integer")
+        return replace(self, **changes) if changes else self
+
+
+def allocate(applicants: Sequence[Applicant], config: LotteryConfig, rng=None) -> List[Placement]:
+    """
+    Allocate rooms in three passes:
+    - premium rooms (corrupt students in id order, random fill if there are not enough)
+    - single rooms (top GPA + disabled + random)
+    - double rooms (remaining students paired by compatibility, or shuffled
+      and paired when nobody stated preferences)
+
+    Rooms are numbered premium first, then singles, then doubles. Every pass is
+    linear in the roster size: picks are tracked in a set, top GPA uses a
+    partial selection and random picks use `sample` instead of full shuffles.
+    """
+    rng = rng or random
+    if len(applicants) > config.capacity:
+        raise ValueError(
+            f"Roster of {len(applicants)} students exceeds lottery capacity of {config.capacity} beds"
+        )
+
+    placements = []
+    taken = set()
+
+    # 1) Premium rooms
+    corrupt = [a for a in applicants if a.corruption]
+    if len(corrupt) >= config.premium_rooms:
+        premium = corrupt[:config.premium_rooms]  # roster (id) order, as the original lottery did
+    else:
+        others = [a for a in applicants if not a.corruption]
+        need = min(config.premium_rooms - len(corrupt), len(others))
+        premium = corrupt + rng.sample(others, need)
+
+    for room_number, applicant in enumerate(premium, start=1):
+        placements.append(Placement(applicant.id, room_number, "premium", None))
+    taken.update(a.id for a in premium)
+
+    # 2) Single rooms
+    remaining = [a for a in applicants if a.id not in taken]
+    singles = heapq.nlargest(config.gpa_quota, remaining, key=attrgetter("gpa"))
+    taken.update(a.id for a in singles)
+
+    disabled = [a for a in remaining if a.disabled and a.id not in taken]
+    quota = min(config.disabled_quota, config.single_rooms - len(singles))
+    if len(disabled) > quota:
+        disabled = rng.sample(disabled, quota)
+    singles.extend(disabled)
+    taken.update(a.id for a in disabled)
+
+    remaining = [a for a in remaining if a.id not in taken]
+    need = min(config.single_rooms - len(singles), len(remaining))
+    if need > 0:
+        random_pick = rng.sample(remaining, need)
+        singles.extend(random_pick)
+        taken.update(a.id for a in random_pick)
+        remaining = [a for a in remaining if a.id not in taken]
+
+    for room_number, applicant in enumerate(singles, start=config.premium_rooms + 1):
+        placements.append(Placement(applicant.id, room_number, "single", None))
+
+    # 3) Double rooms (an odd leftover gets a double room to themselves)
+    if has_preferences(remaining):
+        remaining = match_order(remaining, rng)
+    else:
+        rng.shuffle(remaining)
+    room_number = config.premium_rooms + config.single_rooms + 1
+    for i in range(0, len(remaining), 2):
+        s1 = remaining[i]
+        s2 = remaining[i + 1] if i + 1 < len(remaining) else None
+        placements.append(Placement(s1.id, room_number, "double", s2.id if s2 else None))
+        if s2:
+            placements.append(Placement(s2.id, room_number, "double", s1.id))
+        room_number += 1
+
+    return placements
+
+
+def summarize(placements: Sequence[Placement]):
+    """Count used rooms per type for the run summary (`<type>_rooms`, premium/single/double always present)"""
+    rooms = {"premium": set(), "single": set(), "double": set()}
+    for p in placements:
+        rooms.setdefault(p.room_type, set()).add((p.dorm, p.room_number))
+    summary = {f"{room_type}_rooms": len(numbers) for room_type, numbers in rooms.items()}
+    summary["total_students"] = len(placements)
+    return summary
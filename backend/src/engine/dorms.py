@@ -0,0 +1,107 @@
+"""
+Multi-dorm lotteries.
+Every dorm (building) is an independent shard with its own room inventory,
+so shards are allocated in parallel on the shared process pool and wall time
+follows the largest dorm rather than the sum of all of them. Each shard
+draws from a seed derived from the run seed and the dorm name, so the
+result does not depend on how shards were scheduled.
+"""
+import hashlib
+import json
+import os
+import zlib
+from typing import Dict, List, Sequence
+
+from src.engine.allocation import Applicant, LotteryConfig, Placement
+from src.engine.pool import process_pool
+from src.engine.replay import (
+    roster_digest, roster_text, parse_roster_line, seeded_allocate, inventory_capacity, describe_inventory,
+    parse_inventory
+)
+
+# Below this many students in total a process pool costs more than it saves
+POOL_MIN_APPLICANTS = 20_000
+
+
+def shard_seed(seed, dorm):
+    """Independent per-dorm seed derived from the run seed"""
+    return int.from_bytes(hashlib.sha256(f"{seed}:{dorm}".encode()).digest()[:8], "big") >> 11
+
+
+def rosters_digest(rosters: Dict[str, Sequence[Applicant]]):
+    """SHA-256 over every dorm's roster digest, in dorm order"""
+    h = hashlib.sha256()
+    for dorm in sorted(rosters):
+        h.update(f"{dorm}\t{roster_digest(rosters[dorm])}\n".encode())
+    return h.hexdigest()
+
+
+def dump_rosters(rosters: Dict[str, Sequence[Applicant]]):
+    """Compressed snapshot of every dorm's roster: a `#dorm` line, then its `roster_text`"""
+    return zlib.compress("".join(
+        f"#{dorm}\n{roster_text(rosters[dorm])}" for dorm in sorted(rosters)
+    ).encode(), 6)
+
+
+def load_rosters(snapshot):
+    """{dorm: applicants} of a `dump_rosters` snapshot"""
+    rosters = {}
+    for line in zlib.decompress(snapshot).decode().splitlines():
+        if line.startswith("#"):
+            roster = rosters.setdefault(line[1:], [])
+        else:
+            roster.append(parse_roster_line(line))
+    return {dorm: tuple(roster) for dorm, roster in rosters.items()}
+
+
+def dump_dorm_configs(configs):
+    return json.dumps(
+        {"dorms": {dorm: describe_inventory(configs[dorm], dorm) for dorm in sorted(configs)}},
+        separators=(",", ":")
+    )
+
+
+def load_dorm_configs(text):
+    """Dorm inventories stored by `dump_dorm_configs` (see `load_config`), or None for a single-building run"""
+    data = json.loads(text)
+    if "dorms" not in data:
+        return None
+    return {dorm: parse_inventory(record) for dorm, record in data["dorms"].items()}
+
+
+def _allocate_shard(dorm, applicants, config, seed):
+    return [p._replace(dorm=dorm) for p in seeded_allocate(applicants, config, seed)]
+
+
+def allocate_dorms(rosters: Dict[str, Sequence[Applicant]], configs: Dict[str, LotteryConfig],
+                   seed: int, workers=None) -> Dict[str, List[Placement]]:
+    """
+    Allocate every dorm in `rosters` with its inventory (room counts or room list) from `configs`.
+    Returns {dorm: placements}; raises ValueError if a dorm has no config or
+    its roster exceeds its capacity.
+    """
+    missing = sorted(set(rosters) - set(configs))
+    if missing:
+        raise ValueError(f"No room inventory for dorm(s): {', '.join(missing)}")
+    for dorm, applicants in rosters.items():
+        capacity = inventory_capacity(configs[dorm])
+        if len(applicants) > capacity:
+            raise ValueError(
+                f"Dorm {dorm}: roster of {len(applicants)} students exceeds capacity of {capacity} beds"
+            )
+
+    # Largest first, so the longest shard starts right away
+    shards = sorted(rosters, key=lambda dorm: len(rosters[dorm]), reverse=True)
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    if workers <= 1 or sum(len(r) for r in rosters.values()) < POOL_MIN_APPLICANTS:
+        return {
+            dorm: _allocate_shard(dorm, rosters[dorm], configs[dorm], shard_seed(seed, dorm))
+            for dorm in sorted(shards)
+        }
+
+    pool = process_pool(workers)
+    futures = {
+        dorm: pool.submit(_allocate_shard, dorm, rosters[dorm], configs[dorm], shard_seed(seed, dorm))
+        for dorm in shards
+    }
+    return {dorm: futures[dorm].result() for dorm in sorted(futures)}
@@ -0,0 +1,161 @@
+"""
+Roommate compatibility matching.
+Students may state lifestyle preferences (sleep schedule, noise tolerance,
+study habits) on a 1-5 scale. Instead of pairing shuffled neighbours, the
+double-room pass orders students so that consecutive students are good
+matches:
+- blocking: students are sorted by their coarse preference profile and cut
+  into blocks of BLOCK_SIZE, so similarity is only computed inside a block
+  (n x BLOCK_SIZE work instead of an n x n matrix)
+- matching: blocks are matched CHUNK_BLOCKS at a time with greedy
+  mutual-best rounds on one (chunk x B x B) NumPy array; a pair is fixed
+  when both students are each other's most similar free candidate, which is
+  the greedy maximum-weight matching order
+- students left over in their block are matched again among themselves
+"""
+from typing import List, Sequence
+
+# numpy is imported inside the functions that use it: every controller imports
+# the engine, and only a lottery run or the simulator needs numpy
+
+PREFERENCE_FIELDS = ("sleep_schedule", "noise_tolerance", "study_habits")
+PREFERENCE_MIN, PREFERENCE_MAX = 1, 5
+# Students per block; even, so a full block can be matched completely
+BLOCK_SIZE = 128
+# Blocks matched per NumPy pass: a (CHUNK_BLOCKS x B x B) float32 array, 2 MB
+CHUNK_BLOCKS = 32
+# Profile resolution used for blocking (levels per preference)
+BLOCK_LEVELS = 3
+MAX_ROUNDS = 64
+# Smaller than any distance step between 1-5 answers
+TIE_BREAK = 1e-3
+
+
+def preference_vector(values):
+    """Applicant.prefs for a student's stored answers; None when nothing was answered"""
+    values = tuple(values)
+    return values if any(v is not None for v in values) else None
+
+
+def preference_distance(a, b):
+    """Squared distance between two students' answers (Applicant.prefs or None), the same measure `match_order` uses"""
+    neutral = (PREFERENCE_MIN + PREFERENCE_MAX) / 2
+    scale = PREFERENCE_MAX - PREFERENCE_MIN
+    a = a or (None,) * len(PREFERENCE_FIELDS)
+    b = b or (None,) * len(PREFERENCE_FIELDS)
+    return sum(
+        ((neutral if x is None else x) - (neutral if y is None else y)) ** 2 for x, y in zip(a, b)
+    ) / scale ** 2
+
+
+def has_preferences(applicants: Sequence):
+    """Whether any student stated preferences; without any, pairing stays random"""
+    return any(a.prefs is not None for a in applicants)
+
+
+def _vectors(applicants):
+    """(n, d) float32 preferences scaled to [0, 1]; missing answers sit in the middle"""
+    import numpy as np
+    neutral = (PREFERENCE_MIN + PREFERENCE_MAX) / 2
+    missing = (None,) * len(PREFERENCE_FIELDS)
+    # None becomes NaN in a float array
+    values = np.array([a.prefs or missing for a in applicants], dtype=np.float32)
+    values[np.isnan(values)] = neutral
+    return (values - PREFERENCE_MIN) / (PREFERENCE_MAX - PREFERENCE_MIN)
+
+
+def _match_chunk(x, valid):
+    """
+    Greedy mutual-best matching of each block in `x` (blocks x B x d vectors,
+    `valid` marks real students). Returns each slot's partner slot, -1 if unmatched.
+    """
+    import numpy as np
+    blocks = len(x)
+    # Similarity = negative squared distance, built one preference at a time
+    sim = np.zeros((blocks, BLOCK_SIZE, BLOCK_SIZE), dtype=np.float32)
+    for d in range(x.shape[2]):
+        diff = x[:, :, None, d] - x[:, None, :, d]
+        sim -= diff * diff
+    # Self-pairs are never chosen. Neighbours (0, 1), (2, 3), ... get a
+    # tie-break bonus, so students with identical profiles pair up in one
+    # round instead of one pair per round.
+    idx = np.arange(BLOCK_SIZE)
+    sim[:, idx, idx ^ 1] += TIE_BREAK
+    sim[:, idx, idx] = -np.inf
+    b, i = np.nonzero(~valid)
+    sim[b, i, :] = -np.inf
+    sim[b, :, i] = -np.inf
+
+    free = valid.copy()
+    partner = np.full((blocks, BLOCK_SIZE), -1, dtype=np.int64)
+    rows = np.arange(blocks)[:, None]
+    for _ in range(MAX_ROUNDS):
+        if not (free.sum(axis=1) >= 2).any():
+            break
+        best = sim.argmax(axis=2)
+        mutual = free & (best[rows, best] == idx[None, :]) & np.isfinite(sim[rows, idx[None, :], best])
+        if not mutual.any():
+            break
+        partner[mutual] = best[mutual]
+        free &= ~mutual
+        # Matched students drop out as rows and as candidates
+        b, i = np.nonzero(mutual)
+        sim[b, i, :] = -np.inf
+        sim[b, :, i] = -np.inf
+    return partner
+
+
+def _match_blocks(vectors, order):
+    """
+    Greedy mutual-best matching inside consecutive blocks of `order`, at most
+    CHUNK_BLOCKS blocks at a time so memory stays bounded.
+    Returns (pairs as an (k, 2) index array, unmatched indices).
+    """
+    import numpy as np
+    n = len(order)
+    blocks = -(-n // BLOCK_SIZE)
+    padded = np.full(blocks * BLOCK_SIZE, -1, dtype=np.int64)
+    padded[:n] = order
+    ids = padded.reshape(blocks, BLOCK_SIZE)
+    valid = ids >= 0
+    partner = np.concatenate([
+        _match_chunk(vectors[np.where(valid[c:c + CHUNK_BLOCKS], ids[c:c + CHUNK_BLOCKS], 0)], valid[c:c + CHUNK_BLOCKS])
+        for c in range(0, blocks, CHUNK_BLOCKS)
+    ])
+
+    idx = np.arange(BLOCK_SIZE)
+    first = (partner >= 0) & (partner > idx[None, :])
+    b, i = np.nonzero(first)
+    pairs = np.stack([ids[b, i], ids[b, partner[b, i]]], axis=1)
+    return pairs, ids[valid & (partner < 0)]
+
+
+def match_order(applicants: Sequence, rng) -> List:
+    """
+    `applicants` reordered so that positions (0, 1), (2, 3), ... are matched
+    roommates; an odd student out comes last. `rng` breaks ties, so equal
+    profiles are paired at random.
+    """
+    import numpy as np
+    n = len(applicants)
+    if n < 2:
+        return list(applicants)
+    vectors = _vectors(applicants)
+
+    # Blocking: sort by coarse profile, random order inside equal profiles
+    levels = np.minimum((vectors * BLOCK_LEVELS).astype(np.int64), BLOCK_LEVELS - 1)
+    tiebreak = np.array([rng.random() for _ in range(n)])
+    order = np.lexsort((tiebreak,) + tuple(levels[:, d] for d in reversed(range(levels.shape[1]))))
+
+    matched = []
+    while len(order) >= 2:
+        pairs, unmatched = _match_blocks(vectors, order)
+        if not len(pairs):
+            # Nothing mutual left (cannot happen with finite similarities); pair in order
+            pairs = order[: len(order) // 2 * 2].reshape(-1, 2)
+            unmatched = order[len(order) // 2 * 2:]
+        matched.append(pairs.reshape(-1))
+        order = unmatched
+
+    result = np.concatenate(matched + [order]) if matched else order
+    return [applicants[i] for i in result]
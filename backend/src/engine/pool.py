@@ -0,0 +1,28 @@
+"""
+Process pool shared by the CPU-bound engine jobs (odds simulation, dorm lotteries)
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+_pool = None
+_pool_workers = 0
+# Pools replaced by a larger one; other threads may still be submitting to them, so they are never shut down
+_retired = []
+_pool_lock = threading.Lock()
+
+
+def process_pool(workers):
+    """
+    The shared pool with at least `workers` processes. It only ever grows:
+    a larger request starts a new pool and leaves the old one running.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if workers > _pool_workers:
+            if _pool is not None:
+                _retired.append(_pool)
+            # spawn rather than fork: the server process has live threads
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+            _pool_workers = workers
+        return _pool
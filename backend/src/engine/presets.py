@@ -0,0 +1,23 @@
+"""
+Lottery presets - the PreData and RealTime room layouts as engine configs
+"""
+from src.config.settings import settings
+from src.engine.allocation import LotteryConfig
+
+
+def predata_config():
+    """10 premium + 30 single + 30 double rooms (100 students) unless overridden in settings"""
+    return LotteryConfig(
+        premium_rooms=settings.PREDATA_PREMIUM_ROOMS,
+        single_rooms=settings.PREDATA_SINGLE_ROOMS,
+        double_rooms=settings.PREDATA_DOUBLE_ROOMS
+    )
+
+
+def realtime_config():
+    """1 premium + 3 single + 3 double rooms (10 students) unless overridden in settings"""
+    return LotteryConfig(
+        premium_rooms=settings.REALTIME_PREMIUM_ROOMS,
+        single_rooms=settings.REALTIME_SINGLE_ROOMS,
+        double_rooms=settings.REALTIME_DOUBLE_ROOMS
+    )
@@ -0,0 +1,111 @@
+"""
+Reproducible lottery runs.
+A run is fully determined by its seed, the allocation policy version, the
+room configuration and the roster it was drawn from. Storing those (plus a
+digest to check the roster has not changed) is enough to re-materialize the
+assignments bit-for-bit instead of keeping every row forever.
+
+An inventory is either a LotteryConfig (room counts) or a list of RoomSpec
+(an explicit rooms table). Room lists are recorded by digest only; a replay
+has to supply the same rooms again. The roster is also kept as a compressed
+snapshot of exactly the text the digest covers, so a run stays replayable
+after students come and go.
+"""
+import hashlib
+import json
+import random
+import secrets
+import zlib
+from dataclasses import asdict
+from typing import List, Sequence
+
+from src.engine.allocation import Applicant, LotteryConfig, Placement, allocate
+from src.engine.rooms import allocate_rooms, inventory_beds, rooms_digest
+
+# Bump whenever `allocate` would draw different placements for the same seed
+# (2: premium goes to the first corrupt students in id order, not a random sample of them;
+#  3: rosters are read in numeric id order, so stu-1000 follows stu-999 instead of stu-100)
+POLICY_VERSION = 3
+
+
+def new_seed():
+    """Random run seed, kept within 53 bits so it survives JSON in browsers"""
+    return secrets.randbits(53)
+
+
+def _prefs_field(prefs):
+    if prefs is None:
+        return ""
+    return "\t" + ",".join("" if v is None else str(v) for v in prefs)
+
+
+def roster_text(applicants: Sequence[Applicant]):
+    """One line per applicant with every input the allocation depends on, in roster order"""
+    return "".join(
+        f"{a.id}\t{a.gpa!r}\t{int(a.corruption)}\t{int(a.disabled)}{_prefs_field(a.prefs)}\n"
+        for a in applicants
+    )
+
+
+def parse_roster_line(line):
+    """The Applicant of one `roster_text` line"""
+    sid, gpa, corruption, disabled, *prefs = line.split("\t")
+    if prefs:
+        prefs = tuple(int(v) if v else None for v in prefs[0].split(","))
+    return Applicant(sid, float(gpa), corruption == "1", disabled == "1", prefs or None)
+
+
+def roster_digest(applicants: Sequence[Applicant]):
+    """
+    SHA-256 over every input the allocation depends on, in roster order.
+    Preferences are only hashed when stated, so rosters without any keep
+    the digest they had before matching existed.
+    """
+    return hashlib.sha256(roster_text(applicants).encode()).hexdigest()
+
+
+def dump_roster(applicants: Sequence[Applicant]):
+    """Compressed snapshot of a roster (its `roster_text`)"""
+    return zlib.compress(roster_text(applicants).encode(), 6)
+
+
+def load_roster(snapshot):
+    """The applicants of a `dump_roster` snapshot, in roster order"""
+    return tuple(parse_roster_line(line) for line in zlib.decompress(snapshot).decode().splitlines())
+
+
+def inventory_capacity(inventory):
+    if isinstance(inventory, LotteryConfig):
+        return inventory.capacity
+    return inventory_beds(inventory)
+
+
+def describe_inventory(inventory, dorm=None):
+    """JSON-able record of an inventory: room counts, or the digest of a room list"""
+    if isinstance(inventory, LotteryConfig):
+        return asdict(inventory)
+    return {"dorm": dorm, "rooms_digest": rooms_digest(inventory), "beds": inventory_beds(inventory)}
+
+
+def dump_config(inventory, dorm=None):
+    return json.dumps(describe_inventory(inventory, dorm), separators=(",", ":"))
+
+
+def load_config(text):
+    """
+    Parse a config stored by `dump_config`: a LotteryConfig for room counts,
+    the raw record (with `rooms_digest`) for a room list.
+    """
+    return parse_inventory(json.loads(text))
+
+
+def parse_inventory(record):
+    return record if "rooms_digest" in record else LotteryConfig(**record)
+
+
+def seeded_allocate(applicants: Sequence[Applicant], inventory, seed: int) -> List[Placement]:
+    """Allocation driven by a private RNG, so the same inputs give the same placements"""
+    rng = random.Random(seed)
+    if isinstance(inventory, LotteryConfig):
+        return allocate(applicants, inventory, rng)
+    return allocate_rooms(applicants, inventory, rng)
@@ -0,0 +1,137 @@
+"""
+Room-inventory allocation.
+Instead of room counts, a building is described room by room (type,
+capacity, accessibility). Rooms are indexed once by type and by capacity,
+then every category is filled in a single pass over its beds:
+- premium rooms take corrupt students first (in id order), random fill otherwise
+- single rooms take the top GPA and disabled quotas (a third of the single
+  beds each), then random picks; disabled picks get accessible rooms first
+- every other type (double, triple, quad, ...) is shared: the remaining
+  students are shuffled (or ordered by roommate compatibility when
+  preferences are known) and packed largest rooms first, disabled students
+  into accessible rooms first
+Output has the same shape as `allocate`: one Placement per student, and in
+shared rooms `roommate_id` points at the next occupant (the other one in a
+double).
+"""
+import hashlib
+import heapq
+import random
+from collections import defaultdict
+from operator import attrgetter
+from typing import List, NamedTuple, Sequence
+
+from src.engine.allocation import Applicant, Placement
+from src.engine.matching import has_preferences, match_order
+
+PREMIUM = "premium"
+SINGLE = "single"
+
+
+class RoomSpec(NamedTuple):
+    number: int
+    room_type: str
+    capacity: int
+    accessible: bool = False
+
+
+def inventory_beds(rooms: Sequence[RoomSpec]):
+    return sum(r.capacity for r in rooms)
+
+
+def rooms_digest(rooms: Sequence[RoomSpec]):
+    """SHA-256 of the inventory in room number order"""
+    h = hashlib.sha256()
+    h.update("".join(
+        f"{r.number}\t{r.room_type}\t{r.capacity}\t{int(r.accessible)}\n"
+        for r in sorted(rooms, key=attrgetter("number"))
+    ).encode())
+    return h.hexdigest()
+
+
+def _beds(rooms, accessible_first):
+    """Rooms in fill order: accessible ones first if asked, then largest capacity first, then by number"""
+    by_capacity = defaultdict(list)
+    for room in rooms:
+        by_capacity[room.capacity].append(room)
+    ordered = [room for capacity in sorted(by_capacity, reverse=True) for room in by_capacity[capacity]]
+    if accessible_first:
+        ordered = [r for r in ordered if r.accessible] + [r for r in ordered if not r.accessible]
+    return ordered
+
+
+def _fill(rooms, occupants, placements):
+    """Pack `occupants` into `rooms` in order, each room up to its capacity"""
+    i = 0
+    for room in rooms:
+        if i >= len(occupants):
+            break
+        group = occupants[i:i + room.capacity]
+        i += len(group)
+        for k, applicant in enumerate(group):
+            roommate = group[(k + 1) % len(group)].id if len(group) > 1 else None
+            placements.append(Placement(applicant.id, room.number, room.room_type, roommate))
+
+
+def allocate_rooms(applicants: Sequence[Applicant], rooms: Sequence[RoomSpec], rng=None) -> List[Placement]:
+    """Allocate `applicants` to an explicit room inventory (out-of-service rooms already left out)"""
+    rng = rng or random
+    beds = inventory_beds(rooms)
+    if len(applicants) > beds:
+        raise ValueError(f"Roster of {len(applicants)} students exceeds lottery capacity of {beds} beds")
+
+    # Index the inventory by type once
+    by_type = defaultdict(list)
+    for room in sorted(rooms, key=attrgetter("number")):
+        by_type[room.room_type].append(room)
+    premium_rooms = by_type.pop(PREMIUM, [])
+    single_rooms = by_type.pop(SINGLE, [])
+    shared_rooms = [room for rooms_of_type in by_type.values() for room in rooms_of_type]
+
+    placements = []
+    taken = set()
+
+    # 1) Premium rooms
+    premium_beds = inventory_beds(premium_rooms)
+    corrupt = [a for a in applicants if a.corruption]
+    if len(corrupt) >= premium_beds:
+        premium = corrupt[:premium_beds]
+    else:
+        others = [a for a in applicants if not a.corruption]
+        premium = corrupt + rng.sample(others, min(premium_beds - len(corrupt), len(others)))
+    _fill(premium_rooms, premium, placements)
+    taken.update(a.id for a in premium)
+
+    # 2) Single rooms: top GPA, disabled, random
+    single_beds = inventory_beds(single_rooms)
+    remaining = [a for a in applicants if a.id not in taken]
+    top = heapq.nlargest(min(single_beds // 3, single_beds), remaining, key=attrgetter("gpa"))
+    taken.update(a.id for a in top)
+
+    disabled = [a for a in remaining if a.disabled and a.id not in taken]
+    quota = min(single_beds // 3, single_beds - len(top))
+    if len(disabled) > quota:
+        disabled = rng.sample(disabled, quota)
+    taken.update(a.id for a in disabled)
+
+    remaining = [a for a in remaining if a.id not in taken]
+    need = min(single_beds - len(top) - len(disabled), len(remaining))
+    random_pick = rng.sample(remaining, need) if need > 0 else []
+    taken.update(a.id for a in random_pick)
+    remaining = [a for a in remaining if a.id not in taken]
+
+    # Disabled picks first, so they land in the accessible rooms
+    _fill(_beds(single_rooms, accessible_first=True), disabled + top + random_pick, placements)
+
+    # 3) Shared rooms
+    disabled = [a for a in remaining if a.disabled]
+    others = [a for a in remaining if not a.disabled]
+    if has_preferences(remaining):
+        # Matched per group, so pairs survive the disabled-first ordering
+        remaining = match_order(disabled, rng) + match_order(others, rng)
+    else:
+        rng.shuffle(remaining)
+        remaining = [a for a in remaining if a.disabled] + [a for a in remaining if not a.disabled]
+    _fill(_beds(shared_rooms, accessible_first=True), remaining, placements)
+
+    return placements
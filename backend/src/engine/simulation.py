@@ -0,0 +1,132 @@
+"""
+Monte-Carlo odds simulator.
+Replays the allocation policy of `allocate` many times fully in memory and
+reports, per student, the probability of ending up in each room type. Each
+batch of trials is one NumPy array (trials x students): random priorities
+are drawn for the whole batch and every pass is a row-wise partial
+selection, so there is no Python loop per trial. Batches are spread over a
+process pool for large runs. Nothing is read from or written to the
+assignment tables.
+"""
+import os
+
+from src.engine.allocation import LotteryConfig
+from src.engine.pool import process_pool
+
+# Cells (trials x students) per batch, bounds the memory of one batch
+BATCH_CELLS = 2_000_000
+# Below this many cells a process pool costs more than it saves
+POOL_MIN_CELLS = 20_000_000
+
+
+def _top_mask(priority, k):
+    """Boolean mask of the k highest finite priorities in every row"""
+    import numpy as np
+    trials, n = priority.shape
+    mask = np.zeros((trials, n), dtype=bool)
+    if k <= 0:
+        return mask
+    if k >= n:
+        return np.isfinite(priority)
+    idx = np.argpartition(-priority, k - 1, axis=1)[:, :k]
+    np.put_along_axis(mask, idx, True, axis=1)
+    return mask & np.isfinite(priority)
+
+
+def _simulate_batch(gpa, corruption, disabled, config, trials, seed):
+    """Room-type counts (premium, single) per student over `trials` trials"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    n = gpa.shape[0]
+
+    # 1) Premium: corrupt students first in roster order, random fill after them
+    corrupt_rank = 3.0 - np.arange(n) / n
+    premium = _top_mask(np.where(corruption, corrupt_rank, rng.random((trials, n))), config.premium_rooms)
+    available = ~premium
+
+    # 2a) Top GPA among the rest (ties broken by roster order, like heapq.nlargest)
+    gpa_key = gpa - np.arange(n) * 1e-12
+    top_gpa = _top_mask(np.where(available, gpa_key, -np.inf), config.gpa_quota)
+    available &= ~top_gpa
+
+    # 2b) Disabled quota, drawn at random among available disabled students
+    quota = min(config.disabled_quota, config.single_rooms - config.gpa_quota)
+    disabled_pick = _top_mask(np.where(available & disabled, rng.random((trials, n)), -np.inf), quota)
+
+    # 2c) Random fill: disabled picks rank above everyone, so the top
+    # (singles left after GPA) are exactly the disabled picks plus random others
+    fill = config.single_rooms - config.gpa_quota
+    single_priority = np.where(disabled_pick, 2.0, np.where(available, rng.random((trials, n)), -np.inf))
+    singles = top_gpa | _top_mask(single_priority, fill)
+
+    return premium.sum(axis=0), singles.sum(axis=0)
+
+
+def _simulate_chunk(gpa, corruption, disabled, config, trials, seed):
+    """Run `trials` trials in memory-bounded batches from SeedSequence `seed`; picklable for the process pool"""
+    import numpy as np
+    n = max(gpa.shape[0], 1)
+    batch = max(1, BATCH_CELLS // n)
+    seeds = seed.spawn((trials + batch - 1) // batch)
+    premium = np.zeros(gpa.shape[0], dtype=np.int64)
+    single = np.zeros(gpa.shape[0], dtype=np.int64)
+    for i, child in enumerate(seeds):
+        size = min(batch, trials - i * batch)
+        p, s = _simulate_batch(gpa, corruption, disabled, config, size, child)
+        premium += p
+        single += s
+    return premium, single
+
+
+def simulate_odds(applicants, config: LotteryConfig, trials, seed=None, workers=None):
+    """
+    Probability of a premium, single and double room for every applicant over
+    `trials` simulated lotteries. Returns {"trials", "students": [...]} with
+    students in the order given.
+    """
+    import numpy as np
+    if trials < 1:
+        raise ValueError("trials must be at least 1")
+    n = len(applicants)
+    if n > config.capacity:
+        raise ValueError(f"Roster of {n} students exceeds lottery capacity of {config.capacity} beds")
+
+    gpa = np.fromiter((a.gpa for a in applicants), dtype=np.float64, count=n)
+    corruption = np.fromiter((a.corruption for a in applicants), dtype=bool, count=n)
+    disabled = np.fromiter((a.disabled for a in applicants), dtype=bool, count=n)
+
+    workers = workers or os.cpu_count() or 1
+    chunks = min(workers, trials) if trials * n >= POOL_MIN_CELLS else 1
+    sizes = [trials // chunks + (1 if i < trials % chunks else 0) for i in range(chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+
+    if chunks == 1:
+        premium, single = _simulate_chunk(gpa, corruption, disabled, config, trials, seeds[0])
+    else:
+        pool = process_pool(workers)
+        futures = [
+            pool.submit(_simulate_chunk, gpa, corruption, disabled, config, size, child)
+            for size, child in zip(sizes, seeds)
+        ]
+        premium = np.zeros(n, dtype=np.int64)
+        single = np.zeros(n, dtype=np.int64)
+        for future in futures:
+            p, s = future.result()
+            premium += p
+            single += s
+
+    p_premium = premium / trials
+    p_single = single / trials
+    p_double = 1.0 - p_premium - p_single
+    return {
+        "trials": trials,
+        "students": [
+            {
+                "id": a.id,
+                "premium": round(float(pp), 6),
+                "single": round(float(ps), 6),
+                "double": round(float(pd), 6)
+            }
+            for a, pp, ps, pd in zip(applicants, p_premium, p_single, p_double)
+        ]
+    }
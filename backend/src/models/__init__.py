@@ -5,5 +5,12 @@ from src.models.student import Student
 from src.models.assignment import Assignment
 from src.models.realtime_student import RealtimeStudent
 from src.models.realtime_assignment import RealtimeAssignment
+from src.models.roster_counter import RosterCounter
+from src.models.lottery_run import LotteryRun
+from src.models.published_run import PublishedRun
+from src.models.lottery_job import LotteryJob
+from src.models.dorm import Dorm, DEFAULT_DORM
+from src.models.room import Room
+from src.models.dataset_version import DatasetVersion
 
-__all__ = ['Student', 'Assignment', 'RealtimeStudent', 'RealtimeAssignment']
+__all__ = ['Student', 'Assignment', 'RealtimeStudent', 'RealtimeAssignment', 'RosterCounter', 'LotteryRun', 'PublishedRun', 'LotteryJob', 'Dorm', 'DEFAULT_DORM', 'Room', 'DatasetVersion']
@@ -3,21 +3,34 @@ Assignment model
 """
 from src.config.database import db
 
+# Students alone in a double room; incremental repairs look these up to pair them
+LONE_DOUBLE = "room_type = 'double' AND roommate_id IS NULL"
+
 
 class Assignment(db.Model):
     __tablename__ = 'assignments'
+    __table_args__ = (
+        # Read endpoints select one run and order by (room_number, student_id)
+        db.Index('ix_assignments_run_room_student', 'run_id', 'room_number', 'student_id'),
+        db.Index('ix_assignments_run_student', 'run_id', 'student_id'),
+        db.Index('ix_assignments_run_lone', 'run_id', 'student_id', sqlite_where=db.text(LONE_DOUBLE)),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('lottery_runs.id'), nullable=False)
     student_id = db.Column(db.String(50), db.ForeignKey('students.id'), nullable=False)
     room_number = db.Column(db.Integer, nullable=False)
     room_type = db.Column(db.String(20), nullable=False)  # 'premium', 'single', 'double'
     roommate_id = db.Column(db.String(50), nullable=True)
+    dorm = db.Column(db.String(50), nullable=True)  # set by multi-dorm runs
     
     def to_dict(self):
         return {
             'id': self.id,
+            'run_id': self.run_id,
             'student_id': self.student_id,
             'room_number': self.room_number,
             'room_type': self.room_type,
-            'roommate_id': self.roommate_id
+            'roommate_id': self.roommate_id,
+            'dorm': self.dorm
         }
@@ -0,0 +1,17 @@
+"""
+Dataset version model - write counter per table, shared by every worker process
+"""
+from src.config.database import db
+
+
+class DatasetVersion(db.Model):
+    __tablename__ = 'dataset_versions'
+    
+    dataset = db.Column(db.String(50), primary_key=True)  # table name
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'dataset': self.dataset,
+            'version': self.version
+        }
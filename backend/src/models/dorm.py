@@ -0,0 +1,39 @@
+"""
+Dorm model - room inventory of one building for multi-dorm lotteries
+"""
+from src.config.database import db
+from src.engine import LotteryConfig
+
+# Dorm of students added without one; uses the PreData preset unless configured
+DEFAULT_DORM = 'main'
+
+
+class Dorm(db.Model):
+    __tablename__ = 'dorms'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    premium_rooms = db.Column(db.Integer, nullable=False, default=0)
+    single_rooms = db.Column(db.Integer, nullable=False, default=0)
+    double_rooms = db.Column(db.Integer, nullable=False, default=0)
+    top_gpa_singles = db.Column(db.Integer, nullable=True)
+    disabled_singles = db.Column(db.Integer, nullable=True)
+    
+    def to_config(self):
+        return LotteryConfig(
+            premium_rooms=self.premium_rooms,
+            single_rooms=self.single_rooms,
+            double_rooms=self.double_rooms,
+            top_gpa_singles=self.top_gpa_singles,
+            disabled_singles=self.disabled_singles
+        )
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'premium_rooms': self.premium_rooms,
+            'single_rooms': self.single_rooms,
+            'double_rooms': self.double_rooms,
+            'top_gpa_singles': self.top_gpa_singles,
+            'disabled_singles': self.disabled_singles,
+            'capacity': self.to_config().capacity
+        }
@@ -0,0 +1,43 @@
+"""
+Lottery job model - an asynchronous lottery run and its outcome
+"""
+from src.config.database import db
+
+ACTIVE_JOB_STATUSES = ('queued', 'running')
+
+
+class LotteryJob(db.Model):
+    __tablename__ = 'lottery_jobs'
+    __table_args__ = (
+        # At most one queued/running job per submission key, so duplicates coalesce
+        db.Index(
+            'uq_lottery_jobs_active_key', 'key', unique=True,
+            sqlite_where=db.text("status IN ('queued', 'running')")
+        ),
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)
+    key = db.Column(db.String(200), nullable=False)  # system + lottery settings
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'done', 'failed'
+    submitted_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # last sign of life from the owning process
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    
+    def to_dict(self):
+        def ms(start, end):
+            return round((end - start).total_seconds() * 1000, 2) if start and end else None
+        
+        return {
+            'id': self.id,
+            'status': self.status,
+            'submitted_at': self.submitted_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'queued_ms': ms(self.submitted_at, self.started_at),
+            'run_ms': ms(self.started_at, self.finished_at),
+            'result': self.result,
+            'error': self.error
+        }
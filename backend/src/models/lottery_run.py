@@ -0,0 +1,39 @@
+"""
+Lottery run model - one row per lottery run of either system
+"""
+import json
+from src.config.database import db, utcnow
+
+
+class LotteryRun(db.Model):
+    __tablename__ = 'lottery_runs'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    dataset = db.Column(db.String(50), nullable=False, index=True)  # assignments table name
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'published', 'archived'
+    total_students = db.Column(db.Integer, nullable=False, default=0)
+    # Enough to re-materialize the run once its assignment rows are archived
+    seed = db.Column(db.BigInteger, nullable=True)
+    policy_version = db.Column(db.Integer, nullable=True)
+    roster_digest = db.Column(db.String(64), nullable=True)  # SHA-256 hex of the input roster
+    config = db.Column(db.Text, nullable=True)  # room counts as JSON (per dorm for multi-dorm runs)
+    # Compressed copy of the input roster, so the run outlives roster changes; only loaded for replays
+    roster = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    repairs = db.Column(db.Integer, nullable=False, default=0)  # incremental roster repairs applied in place
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    published_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'dataset': self.dataset,
+            'status': self.status,
+            'total_students': self.total_students,
+            'seed': self.seed,
+            'policy_version': self.policy_version,
+            'roster_digest': self.roster_digest,
+            'config': json.loads(self.config) if self.config else None,
+            'repairs': self.repairs,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'published_at': self.published_at.isoformat() if self.published_at else None
+        }
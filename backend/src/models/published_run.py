@@ -0,0 +1,17 @@
+"""
+Published run model - pointer to the run readers see, one row per dataset
+"""
+from src.config.database import db
+
+
+class PublishedRun(db.Model):
+    __tablename__ = 'published_runs'
+    
+    dataset = db.Column(db.String(50), primary_key=True)  # assignments table name
+    run_id = db.Column(db.Integer, db.ForeignKey('lottery_runs.id'), nullable=False)
+    
+    def to_dict(self):
+        return {
+            'dataset': self.dataset,
+            'run_id': self.run_id
+        }
@@ -2,12 +2,20 @@
 RealTime Assignment model - for live 10-student lottery system
 """
 from src.config.database import db
+from src.models.assignment import LONE_DOUBLE
 
 
 class RealtimeAssignment(db.Model):
     __tablename__ = 'realtime_assignments'
+    __table_args__ = (
+        # Read endpoints select one run and order by (room_number, student_id)
+        db.Index('ix_realtime_assignments_run_room_student', 'run_id', 'room_number', 'student_id'),
+        db.Index('ix_realtime_assignments_run_student', 'run_id', 'student_id'),
+        db.Index('ix_realtime_assignments_run_lone', 'run_id', 'student_id', sqlite_where=db.text(LONE_DOUBLE)),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('lottery_runs.id'), nullable=False)
     student_id = db.Column(db.String(50), db.ForeignKey('realtime_students.id'), nullable=False)
     room_number = db.Column(db.Integer, nullable=False)
     room_type = db.Column(db.String(20), nullable=False)  # 'premium', 'single', 'double'
@@ -16,6 +24,7 @@ class RealtimeAssignment(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'run_id': self.run_id,
             'student_id': self.student_id,
             'room_number': self.room_number,
             'room_type': self.room_type,
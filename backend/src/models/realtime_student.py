@@ -8,13 +8,18 @@ class RealtimeStudent(db.Model):
     __tablename__ = 'realtime_students'
     
     id = db.Column(db.String(50), primary_key=True)
+    seq = db.Column(db.Integer, unique=True)  # numeric part of id, used for ordering
     name = db.Column(db.String(100), nullable=False)
     gpa = db.Column(db.Float, nullable=False)
     corruption = db.Column(db.Boolean, default=False)
     disabled = db.Column(db.Boolean, default=False)
+    # Lifestyle preferences for roommate matching, 1-5 each (NULL = not answered)
+    sleep_schedule = db.Column(db.SmallInteger)
+    noise_tolerance = db.Column(db.SmallInteger)
+    study_habits = db.Column(db.SmallInteger)
     
-    # Relationship
-    assignment = db.relationship('RealtimeAssignment', backref='student', uselist=False, cascade='all, delete-orphan')
+    # Relationship (one assignment per kept lottery run)
+    assignments = db.relationship('RealtimeAssignment', backref='student', cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -22,5 +27,8 @@ class RealtimeStudent(db.Model):
             'name': self.name,
             'gpa': self.gpa,
             'corruption': self.corruption,
-            'disabled': self.disabled
+            'disabled': self.disabled,
+            'sleep_schedule': self.sleep_schedule,
+            'noise_tolerance': self.noise_tolerance,
+            'study_habits': self.study_habits
         }
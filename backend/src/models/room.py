@@ -0,0 +1,31 @@
+"""
+Room model - one physical room of a dorm, for explicit room inventories
+"""
+from src.config.database import db
+from src.models.dorm import DEFAULT_DORM
+
+
+class Room(db.Model):
+    __tablename__ = 'rooms'
+    __table_args__ = (
+        db.UniqueConstraint('dorm', 'number', name='uq_rooms_dorm_number'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    dorm = db.Column(db.String(50), nullable=False, default=DEFAULT_DORM)
+    number = db.Column(db.Integer, nullable=False)
+    room_type = db.Column(db.String(20), nullable=False)  # 'premium', 'single', 'double', 'triple', ...
+    capacity = db.Column(db.Integer, nullable=False)
+    accessible = db.Column(db.Boolean, nullable=False, default=False)
+    out_of_service = db.Column(db.Boolean, nullable=False, default=False)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'dorm': self.dorm,
+            'number': self.number,
+            'room_type': self.room_type,
+            'capacity': self.capacity,
+            'accessible': self.accessible,
+            'out_of_service': self.out_of_service
+        }
@@ -0,0 +1,19 @@
+"""
+Roster counter model - next student sequence number and admitted students per students table
+"""
+from src.config.database import db
+
+
+class RosterCounter(db.Model):
+    __tablename__ = 'roster_counters'
+    
+    dataset = db.Column(db.String(50), primary_key=True)  # students table name
+    next_seq = db.Column(db.Integer, nullable=False, default=0)
+    admitted = db.Column(db.Integer, nullable=False, default=0)  # students on the roster, checked against capacity
+    
+    def to_dict(self):
+        return {
+            'dataset': self.dataset,
+            'next_seq': self.next_seq,
+            'admitted': self.admitted
+        }
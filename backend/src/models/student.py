@@ -2,19 +2,32 @@
 Student model
 """
 from src.config.database import db
+from src.models.dorm import DEFAULT_DORM
 
 
 class Student(db.Model):
     __tablename__ = 'students'
+    __table_args__ = (
+        # Multi-dorm runs read every roster grouped by dorm
+        db.Index('ix_students_dorm_seq', 'dorm', 'seq'),
+        # Incremental repairs promote the top GPA student into a freed single
+        db.Index('ix_students_gpa', 'gpa'),
+    )
     
     id = db.Column(db.String(50), primary_key=True)
+    seq = db.Column(db.Integer, unique=True)  # numeric part of id, used for ordering
     name = db.Column(db.String(100), nullable=False)
     gpa = db.Column(db.Float, nullable=False)
     corruption = db.Column(db.Boolean, default=False)
     disabled = db.Column(db.Boolean, default=False)
+    dorm = db.Column(db.String(50), nullable=False, default=DEFAULT_DORM)
+    # Lifestyle preferences for roommate matching, 1-5 each (NULL = not answered)
+    sleep_schedule = db.Column(db.SmallInteger)
+    noise_tolerance = db.Column(db.SmallInteger)
+    study_habits = db.Column(db.SmallInteger)
     
-    # Relationship
-    assignment = db.relationship('Assignment', backref='student', uselist=False, cascade='all, delete-orphan')
+    # Relationship (one assignment per kept lottery run)
+    assignments = db.relationship('Assignment', backref='student', cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -22,5 +35,9 @@ class Student(db.Model):
             'name': self.name,
             'gpa': self.gpa,
             'corruption': self.corruption,
-            'disabled': self.disabled
+            'disabled': self.disabled,
+            'dorm': self.dorm,
+            'sleep_schedule': self.sleep_schedule,
+            'noise_tolerance': self.noise_tolerance,
+            'study_habits': self.study_habits
         }
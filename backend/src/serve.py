@@ -0,0 +1,129 @@
+"""
+Production server: gunicorn over create_app, several worker processes each
+serving requests from a thread pool (gthread workers).
+
+    python backend/src/serve.py
+    python backend/src/serve.py --workers 4 --threads 8 --bind 0.0.0.0:3001
+
+The app is built once in the master (WEB_PRELOAD) and the workers fork from
+it with everything imported. Signals to the master process:
+- HUP: graceful reload; new workers start, old ones finish their requests
+  first (with preload, new code needs USR2 for a new master, then QUIT
+  to the old one)
+- TERM: graceful shutdown within WEB_GRACEFUL_TIMEOUT; INT/QUIT: immediate
+- TTIN/TTOU: one worker more/less
+
+Every worker is a separate process with its own SQLite connections, caches
+and metrics: with more than one worker, SHARED_VERSIONS is turned on so a
+write in one worker invalidates the caches of all of them. The realtime
+event stream (/events) is per worker, and each subscriber holds a thread, so
+at most SSE_MAX_SUBSCRIBERS streams (default: half the threads) are open per
+worker; further subscribers get a 503.
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Add backend directory to sys.path so 'src' module can be imported
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from gunicorn.app.base import BaseApplication
+from src.config.database import reset_connections
+from src.config.settings import Settings, settings
+
+log = logging.getLogger(__name__)
+
+
+def prepare_settings(workers, threads):
+    """Adjust the settings for a multi-process server; must run before the app is created"""
+    if settings.IN_MEMORY_DB:
+        raise ValueError("DB_PATH=:memory: gives every worker process its own empty database; use a file")
+    if "DB_PROFILE" not in os.environ:
+        # WAL readers don't wait for writers, and busy_timeout makes concurrent writers queue up
+        Settings.DB_PROFILE = "production"
+    if "SSE_MAX_SUBSCRIBERS" not in os.environ:
+        # An event stream holds a thread for as long as it is open; keep half of them for requests
+        Settings.SSE_MAX_SUBSCRIBERS = max(threads // 2, 1)
+    if workers > 1 and not settings.SHARED_VERSIONS:
+        log.warning("%d workers: turning on SHARED_VERSIONS so their caches see each other's writes", workers)
+        Settings.SHARED_VERSIONS = True
+    if workers > 1:
+        log.warning("%d workers: /api/realtime/events only carries the writes of the worker a client is "
+                    "connected to; serve the realtime stream from one worker for complete event feeds", workers)
+
+
+def on_starting(server):
+    # No worker is running yet: jobs still queued or running were left by a previous server
+    from src.services import lottery_jobs
+    if server.cfg.preload_app:
+        app = server.app.wsgi()
+    else:
+        from src.app import create_app
+        app = create_app()
+    with app.app_context():
+        lottery_jobs.recover()
+    reset_connections(app)
+
+
+def post_fork(server, worker):
+    # The master emptied its pools before forking; drop anything inherited anyway
+    if server.cfg.preload_app:
+        reset_connections(server.app.wsgi(), close=False)
+
+
+class Server(BaseApplication):
+    """gunicorn application serving create_app()"""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from src.app import create_app
+        app = create_app()
+        # When preloading this runs in the master: fork without open connections
+        reset_connections(app)
+        return app
+
+
+def server_options(args, workers):
+    return {
+        "bind": args.bind,
+        "workers": workers,
+        "worker_class": "gthread",
+        "threads": args.threads,
+        "preload_app": args.preload,
+        "timeout": settings.WEB_TIMEOUT,
+        "graceful_timeout": settings.WEB_GRACEFUL_TIMEOUT,
+        "max_requests": settings.WEB_MAX_REQUESTS,
+        "max_requests_jitter": settings.WEB_MAX_REQUESTS // 10,
+        "on_starting": on_starting,
+        "post_fork": post_fork,
+        "accesslog": "-" if args.access_log else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the backend with gunicorn (worker processes x threads)")
+    parser.add_argument("--bind", default=f"{settings.HOST}:{settings.PORT}")
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS, help="worker processes (0 = 2 x CPUs + 1)")
+    parser.add_argument("--threads", type=int, default=settings.WEB_THREADS, help="request threads per worker")
+    parser.add_argument("--no-preload", dest="preload", action="store_false", default=settings.WEB_PRELOAD,
+                        help="build the app in every worker instead of once in the master")
+    parser.add_argument("--access-log", action="store_true", help="log every request to stdout")
+    args = parser.parse_args()
+
+    workers = args.workers or 2 * (os.cpu_count() or 1) + 1
+    prepare_settings(workers, args.threads)
+    Server(server_options(args, workers)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Shared services used by both lottery systems
+"""
+from src.services.assignment_store import (
+    publish_assignments,
+    publish_run,
+    published_run_id,
+    insert_assignments,
+    delete_runs,
+    archive_runs,
+    prune_runs
+)
+from src.services.run_replay import replay_cache, list_runs, replay_run, run_assignments, verify_run
+from src.services.roster_repair import RosterRepair, repair_arg
+from src.services.sql_stats import count_statements
+from src.services.id_allocator import admit_seq, release_seq, admitted_count, reset_seq, format_student_id, parse_student_id
+from src.services.roster_import import import_roster, import_format, parse_preferences
+from src.services.roster_batch import delete_students, apply_batch, batch_operations, atomic_arg, MAX_BATCH_OPERATIONS
+from src.services.http_cache import versions, response_cache, bump_version, conditional_get
+from src.services.roster_cache import RosterCache, roster_cache
+from src.services.events import EventHub, realtime_events
+from src.services.jobs import JobRunner, lottery_jobs, job_key
+from src.services.metrics import metrics, init_metrics
+from src.services.pagination import LIST_ARGS, page_args, shape_arg, rows_payload, encode_cursor, decode_cursor, next_cursor, stream_response, STREAM_BATCH_SIZE
+from src.services.json_provider import OrjsonProvider, StdlibProvider, json_provider_class
+
+__all__ = [
+    'publish_assignments', 'publish_run', 'published_run_id', 'insert_assignments', 'delete_runs', 'archive_runs', 'prune_runs',
+    'replay_cache', 'list_runs', 'replay_run', 'run_assignments', 'verify_run',
+    'RosterRepair', 'repair_arg',
+    'count_statements',
+    'admit_seq', 'release_seq', 'admitted_count', 'reset_seq', 'format_student_id', 'parse_student_id',
+    'import_roster', 'import_format', 'parse_preferences',
+    'delete_students', 'apply_batch', 'batch_operations', 'atomic_arg', 'MAX_BATCH_OPERATIONS',
+    'versions', 'response_cache', 'bump_version', 'conditional_get',
+    'RosterCache', 'roster_cache',
+    'EventHub', 'realtime_events',
+    'JobRunner', 'lottery_jobs', 'job_key',
+    'metrics', 'init_metrics',
+    'LIST_ARGS', 'page_args', 'shape_arg', 'rows_payload', 'encode_cursor', 'decode_cursor', 'next_cursor', 'stream_response', 'STREAM_BATCH_SIZE',
+    'OrjsonProvider', 'StdlibProvider', 'json_provider_class'
+]
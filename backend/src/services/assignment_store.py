@@ -0,0 +1,125 @@
+"""
+Versioned, bulk persistence for lottery results.
+Every run is written under its own run id with one executemany, then made
+visible by switching the dataset's published_runs pointer in a short second
+transaction. Readers always select the published run, so they never see an
+empty or half-written table, and a crash mid-run leaves the previous
+results in place. Past the retention window a run is archived: its
+assignment rows are dropped and only the run record (seed, policy version,
+roster digest and room counts) is kept, from which it can be replayed.
+"""
+import time
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from src.config.database import db, utcnow
+from src.config.settings import settings
+from src.engine import Placement
+from src.services.http_cache import bump_version
+from src.models.lottery_run import LotteryRun
+from src.models.published_run import PublishedRun
+
+# Column order matches the Placement tuple so rows can be passed through as-is
+PLACEMENT_COLUMNS = Placement._fields
+
+
+def published_run_id(model):
+    """Scalar subquery for the run readers of `model` should see"""
+    return select(PublishedRun.run_id).where(
+        PublishedRun.dataset == model.__tablename__
+    ).scalar_subquery()
+
+
+def insert_assignments(model, placements, run_id):
+    """Insert a run's placements in a single statement (no commit)"""
+    if not placements:
+        return
+    table = model.__table__
+    # Tables without a dorm column take the leading Placement fields only
+    width = sum(1 for name in PLACEMENT_COLUMNS if name in table.c)
+    conn = db.session.connection()
+    if conn.dialect.paramstyle == "qmark":
+        columns = ", ".join(("run_id",) + PLACEMENT_COLUMNS[:width])
+        marks = ", ".join("?" for _ in range(width + 1))
+        conn.exec_driver_sql(
+            f"INSERT INTO {table.name} ({columns}) VALUES ({marks})",
+            [(run_id,) + p[:width] for p in placements]
+        )
+    else:
+        conn.execute(table.insert(), [
+            {"run_id": run_id, **dict(zip(PLACEMENT_COLUMNS[:width], p))} for p in placements
+        ])
+
+
+def delete_runs(model, run_ids):
+    """Delete the assignment rows and run records of `run_ids` in bulk (no commit)"""
+    if not run_ids:
+        return
+    db.session.execute(model.__table__.delete().where(model.run_id.in_(run_ids)))
+    db.session.execute(LotteryRun.__table__.delete().where(LotteryRun.id.in_(run_ids)))
+
+
+def archive_runs(model, run_ids):
+    """Drop the assignment rows of `run_ids` but keep their run records (no commit)"""
+    if not run_ids:
+        return
+    db.session.execute(model.__table__.delete().where(model.run_id.in_(run_ids)))
+    db.session.execute(
+        LotteryRun.__table__.update().where(LotteryRun.id.in_(run_ids)).values(status="archived")
+    )
+
+
+def prune_runs(model, keep=None):
+    """Archive all but the newest `keep` runs of `model`'s dataset, never the published one (no commit)"""
+    keep = settings.LOTTERY_RUN_RETENTION if keep is None else keep
+    kept = select(LotteryRun.id).where(
+        LotteryRun.dataset == model.__tablename__
+    ).order_by(LotteryRun.id.desc()).limit(max(keep, 1))
+    stale = db.session.execute(
+        select(LotteryRun.id).where(
+            LotteryRun.dataset == model.__tablename__,
+            LotteryRun.status != "archived",
+            LotteryRun.id.not_in(kept),
+            LotteryRun.id != func.coalesce(published_run_id(model), -1)
+        )
+    ).scalars().all()
+    archive_runs(model, stale)
+
+
+def publish_run(model, run_id):
+    """Atomically point readers of `model` at `run_id`"""
+    stmt = insert(PublishedRun).values(dataset=model.__tablename__, run_id=run_id)
+    stmt = stmt.on_conflict_do_update(index_elements=[PublishedRun.dataset], set_={"run_id": run_id})
+    db.session.execute(stmt)
+    db.session.execute(
+        LotteryRun.__table__.update().where(LotteryRun.id == run_id).values(
+            status="published", published_at=utcnow()
+        )
+    )
+    db.session.commit()
+    bump_version(model)
+
+
+def publish_assignments(model, placements, provenance=None):
+    """
+    Write `placements` as a new run, publish it and prune runs past retention.
+    `provenance` holds the LotteryRun replay columns (seed, policy_version,
+    roster_digest, roster, config). Returns (run_id, write phase duration in milliseconds).
+    """
+    started = time.perf_counter()
+    try:
+        run = LotteryRun(dataset=model.__tablename__, total_students=len(placements), **(provenance or {}))
+        db.session.add(run)
+        db.session.flush()
+        run_id = run.id
+        insert_assignments(model, placements, run_id)
+        db.session.commit()
+        publish_run(model, run_id)
+        write_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        # Housekeeping, outside the timed write phase: readers already see the new run
+        prune_runs(model)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return run_id, write_ms
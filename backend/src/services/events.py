@@ -0,0 +1,109 @@
+"""
+In-process publish/subscribe hub for Server-Sent Events.
+Events are serialized once into a bounded ring buffer and subscribers wait
+on a shared condition, so publishing costs the same however many browsers
+are listening and no subscriber ever queries the database.
+
+Under the WSGI servers this app runs on, every open stream holds a request
+thread until the client disconnects. Streams are therefore capped at
+SSE_MAX_SUBSCRIBERS per process (serve.py defaults it to half the worker's
+threads), and further subscribers get a 503 instead of starving other
+requests. Thousands of subscribers would need an async server or an
+external broker, which this app does not ship.
+
+The hub lives in one process. Event ids are `<epoch>-<n>`, with an epoch
+drawn when the hub is created, so a client resuming with an id from before
+a restart, or from another worker process, is told to resync instead of
+waiting for the counter to catch up. Under a multi-worker server a
+subscriber only sees the writes its own worker handles; run the realtime
+stream with one worker or have clients refetch on resync.
+"""
+import json
+import threading
+import uuid
+from collections import deque
+from src.config.settings import settings
+
+HISTORY_SIZE = 1024
+HEARTBEAT_SECONDS = 15
+
+
+class EventHub:
+    def __init__(self, history=HISTORY_SIZE):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)  # (id, name, data as JSON)
+        self._last_id = 0
+        self.epoch = uuid.uuid4().hex[:8]
+        self.subscribers = 0
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def acquire(self):
+        """Reserve a stream slot; False when SSE_MAX_SUBSCRIBERS streams are already open"""
+        with self._cond:
+            if settings.SSE_MAX_SUBSCRIBERS and self.subscribers >= settings.SSE_MAX_SUBSCRIBERS:
+                return False
+            self.subscribers += 1
+            return True
+
+    def release(self):
+        """Give back the slot of a closed stream"""
+        with self._cond:
+            self.subscribers -= 1
+
+    def publish(self, name, data=None):
+        payload = json.dumps(data or {}, separators=(",", ":"))
+        with self._cond:
+            self._last_id += 1
+            self._events.append((self._last_id, name, payload))
+            self._cond.notify_all()
+
+    def _resume_from(self, last_event_id):
+        """Counter value to resume after, or None if the id is not one of this hub's"""
+        epoch, _, number = (last_event_id or "").partition("-")
+        if epoch != self.epoch or not number.isdigit() or int(number) > self._last_id:
+            return None
+        return int(number)
+
+    def _after(self, last_seen):
+        """Events newer than `last_seen`, or None if some were already dropped"""
+        if not self._events or self._events[-1][0] <= last_seen:
+            return []
+        if self._events[0][0] > last_seen + 1:
+            return None
+        return [e for e in self._events if e[0] > last_seen]
+
+    def subscribe(self, last_event_id=None, heartbeat=HEARTBEAT_SECONDS):
+        """
+        Yield SSE-formatted chunks from `last_event_id` on (new events only by
+        default). A subscriber that fell behind the history, or resumes from an
+        id this hub never issued, gets a `resync` event telling it to refetch; idle streams get a comment line as keepalive.
+        """
+        with self._cond:
+            last_seen = self._last_id if last_event_id is None else self._resume_from(last_event_id)
+            newest = self._last_id
+        yield "retry: 3000\n\n"
+        if last_seen is None:
+            # An id from before a restart or from another process: whatever happened since is unknown
+            last_seen = newest
+            yield f"id: {self.epoch}-{newest}\nevent: resync\ndata: {{}}\n\n"
+        while True:
+            with self._cond:
+                pending = self._after(last_seen)
+                if pending == []:
+                    self._cond.wait(heartbeat)
+                    pending = self._after(last_seen)
+                newest = self._last_id
+            if pending is None:
+                last_seen = newest
+                yield f"id: {self.epoch}-{newest}\nevent: resync\ndata: {{}}\n\n"
+            elif pending:
+                last_seen = pending[-1][0]
+                yield "".join(f"id: {self.epoch}-{i}\nevent: {name}\ndata: {data}\n\n" for i, name, data in pending)
+            else:
+                yield ": keepalive\n\n"
+
+
+realtime_events = EventHub()
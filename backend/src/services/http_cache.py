@@ -0,0 +1,190 @@
+"""
+Dataset versions, ETags and an in-process response body cache.
+Every write to a roster or to lottery results bumps that dataset's version.
+Read endpoints derive their ETag from the versions they depend on, answer a
+matching If-None-Match with 304 before touching the database, and reuse the
+serialized body of the last response built for the same URL and versions.
+
+With SHARED_VERSIONS, bumps are also counted in the dataset_versions table
+and readers sync from it first (one primary-key query), so caches in
+several worker processes see each other's writes. The ETag epoch then comes
+from the database too, so every worker issues the same tags.
+
+Cached bodies are keyed by path and the query arguments the view declares
+(sorted), and bounded by RESPONSE_CACHE_MAX_BYTES in total.
+"""
+import random
+import threading
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, request
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from src.config.database import db
+from src.config.settings import settings
+from src.models.dataset_version import DatasetVersion
+
+MAX_CACHED_RESPONSES = 256
+EPOCH_ROW = "__epoch__"  # dataset_versions row holding the shared ETag epoch
+
+
+class DatasetVersions:
+    """
+    Monotonic per-dataset counters; the epoch keeps ETags unique across
+    restarts (per process, or per database file in shared mode)
+    """
+
+    def __init__(self, shared=False):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self.epoch = uuid.uuid4().hex[:8]
+        self.shared = shared
+        self._shared_epoch = False
+
+    def bump(self, *datasets):
+        if self.shared:
+            return self._bump_shared(datasets)
+        with self._lock:
+            for dataset in datasets:
+                self._versions[dataset] = self._versions.get(dataset, 0) + 1
+
+    def _bump_shared(self, datasets):
+        """Increment the table rows in one upsert and commit (callers bump right after their own commit)"""
+        stmt = insert(DatasetVersion).values([{"dataset": d, "version": 1} for d in datasets])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DatasetVersion.dataset], set_={"version": DatasetVersion.version + 1}
+        ).returning(DatasetVersion.dataset, DatasetVersion.version)
+        try:
+            rows = db.session.execute(stmt).all()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self._merge(rows)
+
+    def sync(self, datasets):
+        """Pick up versions bumped by other processes (shared mode only)"""
+        if not self.shared:
+            return
+        if not self._shared_epoch:
+            self._load_epoch()
+        self._merge(db.session.execute(
+            select(DatasetVersion.dataset, DatasetVersion.version).where(DatasetVersion.dataset.in_(datasets))
+        ))
+
+    def _load_epoch(self):
+        """Adopt the database's epoch, drawing it if this is the first process to ask"""
+        db.session.execute(insert(DatasetVersion).values(
+            dataset=EPOCH_ROW, version=random.getrandbits(31)
+        ).on_conflict_do_nothing(index_elements=[DatasetVersion.dataset]))
+        epoch = db.session.execute(
+            select(DatasetVersion.version).where(DatasetVersion.dataset == EPOCH_ROW)
+        ).scalar_one()
+        db.session.commit()
+        self.epoch = f"{epoch:08x}"
+        self._shared_epoch = True
+
+    def _merge(self, rows):
+        with self._lock:
+            for dataset, version in rows:
+                if version > self._versions.get(dataset, 0):
+                    self._versions[dataset] = version
+
+    def current(self, dataset):
+        return self._versions.get(dataset, 0)
+
+    def etag(self, datasets):
+        return "-".join([self.epoch] + [f"{d}.{self.current(d)}" for d in datasets])
+
+
+class ResponseCache:
+    """LRU of serialized bodies, valid for one ETag, bounded by entries and total body bytes"""
+
+    def __init__(self, max_entries=MAX_CACHED_RESPONSES, max_bytes=None):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = settings.RESPONSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.size = 0
+
+    def get(self, key, etag):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1:]
+
+    def put(self, key, etag, body, mimetype):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[1])
+            if len(body) > self.max_bytes:
+                return  # larger than the whole cache
+            self._entries[key] = (etag, body, mimetype)
+            self.size += len(body)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+versions = DatasetVersions(shared=settings.SHARED_VERSIONS)
+response_cache = ResponseCache()
+
+
+def bump_version(*models):
+    """Record a write to the tables of `models`"""
+    versions.bump(*(m.__tablename__ for m in models))
+
+
+def _with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _cache_key(args):
+    """Request path plus the values of the query arguments in `args`, in a fixed order"""
+    values = tuple((name, tuple(request.args.getlist(name))) for name in args if name in request.args)
+    return (request.path, values)
+
+
+def conditional_get(*models, args=()):
+    """
+    Serve a GET view with ETag revalidation and a per-version body cache.
+    The view only runs when the tables of `models` changed since the body
+    for this path and these `args` (the query arguments the view reads;
+    any others are ignored) was last built.
+    """
+    datasets = tuple(m.__tablename__ for m in models)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*view_args, **view_kwargs):
+            # Taken before the view runs, so a concurrent write can only make the tag older
+            versions.sync(datasets)
+            etag = versions.etag(datasets)
+            if request.if_none_match.contains(etag):
+                return _with_etag(Response(status=304), etag)
+
+            key = _cache_key(args)
+            cached = response_cache.get(key, etag)
+            if cached is not None:
+                body, mimetype = cached
+                return _with_etag(Response(body, status=200, mimetype=mimetype), etag)
+
+            result = view(*view_args, **view_kwargs)
+            response, status = result if isinstance(result, tuple) else (result, 200)
+            if status != 200 or response.is_streamed:
+                return result
+            response_cache.put(key, etag, response.get_data(), response.mimetype)
+            return _with_etag(response, etag), status
+        return wrapper
+    return decorator
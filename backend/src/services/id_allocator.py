@@ -0,0 +1,91 @@
+"""
+Student ID allocation and roster admission.
+Each students table has a row in roster_counters holding the next sequence
+number and the number of students admitted to the roster. Admitting a
+student is a single guarded UPDATE that checks the capacity, counts the
+student and reserves the id at once:
+
+    UPDATE roster_counters SET next_seq = next_seq + n, admitted = admitted + n
+    WHERE dataset = ? AND admitted + n <= capacity RETURNING next_seq
+
+so concurrent registrations in any number of processes can never admit more
+than the capacity or receive the same id (the row is write-locked until
+commit). A full roster is recognised by a plain read first, so rejects
+take no write lock.
+"""
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from src.config.database import db
+from src.models.roster_counter import RosterCounter
+
+ID_PREFIX = "stu-"
+
+
+def format_student_id(seq):
+    return f"{ID_PREFIX}{seq:03d}"
+
+
+def parse_student_id(student_id):
+    """Sequence number of a `stu-N` id (any width)"""
+    prefix, _, number = student_id.partition("-")
+    if prefix + "-" != ID_PREFIX or not number.isdigit():
+        raise ValueError(f"Invalid student id: {student_id}")
+    return int(number)
+
+
+def _seed(model):
+    """Create the counter row from the table (indexed MAX(seq), COUNT(*)) unless it exists"""
+    db.session.execute(insert(RosterCounter).values(
+        dataset=model.__tablename__,
+        next_seq=select(func.coalesce(func.max(model.seq), -1) + 1).scalar_subquery(),
+        admitted=select(func.count()).select_from(model).scalar_subquery()
+    ).on_conflict_do_nothing(index_elements=[RosterCounter.dataset]))
+
+
+def admitted_count(model):
+    """Students on `model`'s roster (a plain read, no lock)"""
+    admitted = db.session.execute(
+        select(RosterCounter.admitted).where(RosterCounter.dataset == model.__tablename__)
+    ).scalar()
+    if admitted is None:
+        return db.session.execute(select(func.count()).select_from(model)).scalar()
+    return admitted
+
+
+def admit_seq(model, capacity, count=1):
+    """
+    Admit `count` students to `model`'s roster inside the current transaction
+    if the roster stays within `capacity`, and reserve their consecutive
+    sequence numbers. Returns the first one, or None if they do not fit.
+    """
+    dataset = model.__tablename__
+    admitted = db.session.execute(
+        select(RosterCounter.admitted).where(RosterCounter.dataset == dataset)
+    ).scalar()
+    if admitted is None:
+        _seed(model)
+    elif admitted + count > capacity:
+        return None
+    next_seq = db.session.execute(
+        update(RosterCounter).where(
+            RosterCounter.dataset == dataset,
+            RosterCounter.admitted + count <= capacity
+        ).values(
+            next_seq=RosterCounter.next_seq + count,
+            admitted=RosterCounter.admitted + count
+        ).returning(RosterCounter.next_seq)
+    ).scalar()
+    return None if next_seq is None else next_seq - count
+
+
+def release_seq(model, count=1):
+    """Give back the admission of `count` deleted students (in the caller's transaction)"""
+    db.session.execute(
+        update(RosterCounter).where(RosterCounter.dataset == model.__tablename__)
+        .values(admitted=RosterCounter.admitted - count)
+    )
+
+
+def reset_seq(model):
+    """Forget the counter so the next allocation re-seeds from the table (no commit)"""
+    db.session.execute(RosterCounter.__table__.delete().where(RosterCounter.dataset == model.__tablename__))
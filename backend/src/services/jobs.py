@@ -0,0 +1,183 @@
+"""
+Asynchronous lottery jobs.
+Submitting a job records a lottery_jobs row and hands the run to a bounded
+thread pool; the request returns immediately with the job id. Job state
+lives in the database, so any server process can report it, and a partial
+unique index on the submission key makes a duplicate submission while a
+job is queued or running return that job instead of starting another run.
+
+A job whose process dies (crash, reload, worker recycling) would hold its
+key forever. Every runner therefore stamps `heartbeat_at` on the jobs it
+owns every LOTTERY_JOB_TIMEOUT / 4 seconds. An active job without a
+heartbeat for LOTTERY_JOB_TIMEOUT is failed as abandoned before a
+submission coalesces onto it; a job that merely runs long keeps its
+heartbeat and is left alone. A server start fails every job left active by
+the previous one. Status changes are conditional on the status they move
+from, so a job that was failed is never flipped to done afterwards.
+Finished jobs are pruned after LOTTERY_JOB_RETENTION.
+"""
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from src.config.database import db, utcnow
+from src.config.settings import settings
+from src.models.lottery_job import LotteryJob, ACTIVE_JOB_STATUSES
+
+
+ABANDONED_ERROR = "Abandoned: the process running it stopped"
+
+
+def job_key(system, overrides):
+    """Submissions for the same system with the same settings coalesce"""
+    return f"{system}:{json.dumps(overrides or {}, sort_keys=True)}"
+
+
+class JobRunner:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._owned = set()  # ids of the jobs this process has queued or is running
+        self._heartbeat = None
+
+    @property
+    def executor(self):
+        # Created on first use so pre-forking servers don't fork live threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers or settings.LOTTERY_JOB_WORKERS,
+                    thread_name_prefix="lottery-job"
+                )
+            return self._executor
+
+    def _start_heartbeat(self, app):
+        with self._lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(
+                    target=self._beat, args=(app,), name="lottery-job-heartbeat", daemon=True
+                )
+                self._heartbeat.start()
+
+    def _beat(self, app):
+        """Stamp the jobs this process owns, so other processes can tell them from abandoned ones"""
+        while True:
+            time.sleep(max(settings.LOTTERY_JOB_TIMEOUT / 4, 0.1))
+            with self._lock:
+                owned = list(self._owned)
+            if not owned:
+                continue
+            with app.app_context():
+                try:
+                    db.session.execute(LotteryJob.__table__.update().where(
+                        LotteryJob.id.in_(owned), LotteryJob.status.in_(ACTIVE_JOB_STATUSES)
+                    ).values(heartbeat_at=utcnow()))
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def submit(self, app, key, fn, *args):
+        """
+        Queue `fn(*args)` under `key` and return (job dict, coalesced).
+        `coalesced` is True when an identical job was already queued or running.
+        """
+        self.expire(key)
+        job = LotteryJob(id=uuid.uuid4().hex, key=key, status="queued", submitted_at=utcnow())
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            active = LotteryJob.query.filter(
+                LotteryJob.key == key,
+                LotteryJob.status.in_(ACTIVE_JOB_STATUSES)
+            ).first()
+            if active:
+                return active.to_dict(), True
+            return self.submit(app, key, fn, *args)
+        snapshot = job.to_dict()
+        self.prune()
+        with self._lock:
+            self._owned.add(snapshot["id"])
+        self._start_heartbeat(app)
+        self.executor.submit(self._run, app, snapshot["id"], fn, args)
+        return snapshot, False
+
+    def _run(self, app, job_id, fn, args):
+        with app.app_context():
+            try:
+                # A job failed while it was queued is not run any more
+                if not self._update(job_id, "queued", status="running", started_at=utcnow()):
+                    return
+                try:
+                    result = fn(*args)
+                except Exception as e:
+                    db.session.rollback()
+                    self._update(job_id, "running", status="failed", error=str(e), finished_at=utcnow())
+                else:
+                    self._update(job_id, "running", status="done", result=result, finished_at=utcnow())
+            finally:
+                with self._lock:
+                    self._owned.discard(job_id)
+                db.session.remove()
+
+    @staticmethod
+    def _fail_active(*conditions, error):
+        db.session.execute(LotteryJob.__table__.update().where(
+            LotteryJob.status.in_(ACTIVE_JOB_STATUSES), *conditions
+        ).values(status="failed", error=error, finished_at=utcnow()))
+        db.session.commit()
+
+    @staticmethod
+    def _abandoned():
+        """Active jobs whose process has not stamped them for LOTTERY_JOB_TIMEOUT"""
+        cutoff = utcnow() - timedelta(seconds=settings.LOTTERY_JOB_TIMEOUT)
+        seen = func.coalesce(LotteryJob.heartbeat_at, LotteryJob.started_at, LotteryJob.submitted_at)
+        return seen < cutoff
+
+    def expire(self, key=None):
+        """Fail active jobs (for `key`, or all) whose owning process is gone"""
+        conditions = [self._abandoned()]
+        if key is not None:
+            conditions.append(LotteryJob.key == key)
+        self._fail_active(*conditions, error=ABANDONED_ERROR)
+
+    def recover(self):
+        """Fail every job left queued or running by a previous server; call once at start-up, before serving"""
+        self._fail_active(error="Interrupted: the server restarted")
+
+    @staticmethod
+    def prune():
+        """Delete jobs that finished more than LOTTERY_JOB_RETENTION seconds ago"""
+        cutoff = utcnow() - timedelta(seconds=settings.LOTTERY_JOB_RETENTION)
+        db.session.execute(LotteryJob.__table__.delete().where(
+            LotteryJob.status.notin_(ACTIVE_JOB_STATUSES),
+            LotteryJob.finished_at < cutoff
+        ))
+        db.session.commit()
+
+    @staticmethod
+    def _update(job_id, expected, **values):
+        """Move a job on from status `expected`; False if something else (e.g. expiry) moved it first"""
+        moved = db.session.execute(LotteryJob.__table__.update().where(
+            LotteryJob.id == job_id, LotteryJob.status == expected
+        ).values(**values)).rowcount
+        db.session.commit()
+        return moved == 1
+
+    def get(self, job_id):
+        job = db.session.get(LotteryJob, job_id)
+        if job and job.status in ACTIVE_JOB_STATUSES:
+            self._fail_active(LotteryJob.id == job_id, self._abandoned(), error=ABANDONED_ERROR)
+            job = db.session.get(LotteryJob, job_id, populate_existing=True)
+        return job.to_dict() if job else None
+
+
+lottery_jobs = JobRunner()
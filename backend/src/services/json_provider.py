@@ -0,0 +1,72 @@
+"""
+JSON encoding of requests and responses.
+Flask's default provider encodes every response with the stdlib json module,
+which dominates the latency of large list responses. OrjsonProvider keeps
+the same interface and output conventions (sorted keys, compact unless
+debugging, HTTP dates) but encodes with orjson and writes the bytes straight
+into the response. orjson is optional: without it (or with
+JSON_PROVIDER=stdlib) the stdlib provider is used.
+
+Both providers encode SQLAlchemy rows as JSON arrays, so `?shape=rows`
+responses hand query rows to jsonify without building a dict per row.
+"""
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_PROVIDERS = ("auto", "orjson", "stdlib")
+
+
+def _default(o):
+    if isinstance(o, Row):
+        return tuple(o)
+    return DefaultJSONProvider.default(o)
+
+
+class StdlibProvider(DefaultJSONProvider):
+    """Flask's provider, plus query rows as arrays"""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(StdlibProvider):
+    """orjson encoder and decoder behind the Flask provider interface"""
+
+    def _encode(self, obj, indent=False):
+        # Dates go through `default` so they keep Flask's HTTP date format
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)  # stdlib-only arguments
+        return self._encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self._encode(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+def json_provider_class(name):
+    """Provider class for a JSON_PROVIDER setting; 'auto' picks orjson when it is installed"""
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER must be one of: {', '.join(JSON_PROVIDERS)}")
+    if name == "orjson" and orjson is None:
+        raise ValueError("JSON_PROVIDER=orjson but orjson is not installed")
+    if name == "stdlib" or orjson is None:
+        return StdlibProvider
+    return OrjsonProvider
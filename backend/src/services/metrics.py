@@ -0,0 +1,214 @@
+"""
+Per-request instrumentation and a Prometheus text /metrics endpoint.
+Flask request hooks time every request, streamed ones until their body is
+sent; SQLAlchemy cursor events count the statements each request issues and
+the time spent in the database. Nothing
+is registered when METRICS_ENABLED is off, so a disabled build pays nothing.
+"""
+import bisect
+import logging
+import threading
+import time
+from functools import partial
+from flask import Response, g, request
+from sqlalchemy import event
+from src.services.roster_cache import roster_cache
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds (Prometheus `le` upper bounds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Statements-per-request buckets
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 1000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a running sum, as Prometheus expects"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        total = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {total}'
+        yield f'{name}_sum{{{labels}}} {round(self.sum, 6)}'
+        yield f'{name}_count{{{labels}}} {total}'
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.statuses = {}
+
+
+class Metrics:
+    """Thread-safe registry keyed by (method, route rule)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._local = threading.local()  # statement tally for the request on this thread
+        self.statements_total = 0  # every statement, including background jobs
+        self.db_seconds_total = 0.0
+        self.slow_request_ms = 0  # log requests at least this slow (0 = off)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self.statements_total = 0
+            self.db_seconds_total = 0.0
+
+    # -- SQLAlchemy cursor events --
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        with self._lock:
+            self.statements_total += 1
+            self.db_seconds_total += elapsed
+        tally = getattr(self._local, "tally", None)
+        if tally is not None:
+            tally[0] += 1
+            tally[1] += elapsed
+
+    def handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get("metrics_started"):
+            context.connection.info["metrics_started"].pop()
+
+    # -- Flask request hooks --
+
+    def before_request(self):
+        g.metrics_started = time.perf_counter()
+        self._local.tally = [0, 0.0]
+
+    def after_request(self, response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            self._local.tally = None
+            return response
+
+        rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+        finish = partial(self._finish, request.method, rule, request.full_path.rstrip("?"), response.status_code, started)
+        if response.is_streamed:
+            # A streamed body (SSE, ?stream=1 lists) is produced after this hook,
+            # so time it, and count its statements, until the server closes it
+            response.call_on_close(finish)
+        else:
+            finish()
+        return response
+
+    def _finish(self, method, rule, path, status, started):
+        elapsed = time.perf_counter() - started
+        tally = getattr(self._local, "tally", None)
+        self._local.tally = None
+        statements, db_seconds = tally or (0, 0.0)
+        self.observe(method, rule, status, elapsed, statements, db_seconds)
+
+        if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+            logger.warning("slow request %s %s -> %s in %.1f ms (%d statements, %.1f ms in db)",
+                           method, path, status, elapsed * 1000, statements, db_seconds * 1000)
+
+    def observe(self, method, rule, status, elapsed, statements, db_seconds):
+        with self._lock:
+            stats = self._endpoints.get((method, rule))
+            if stats is None:
+                stats = self._endpoints[(method, rule)] = EndpointStats()
+            stats.latency.observe(elapsed)
+            stats.statements.observe(statements)
+            stats.db_seconds += db_seconds
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    # -- exposition --
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = [
+                "# HELP http_request_duration_seconds Request latency by endpoint.",
+                "# TYPE http_request_duration_seconds histogram"
+            ]
+            for (method, rule), stats in endpoints:
+                lines.extend(stats.latency.lines("http_request_duration_seconds", _labels(method, rule)))
+
+            lines += [
+                "# HELP http_requests_total Requests by endpoint and status code.",
+                "# TYPE http_requests_total counter"
+            ]
+            for (method, rule), stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_requests_total{{{_labels(method, rule)},status="{status}"}} {count}')
+
+            lines += [
+                "# HELP http_request_sql_statements SQL statements issued per request.",
+                "# TYPE http_request_sql_statements histogram"
+            ]
+            for (method, rule), stats in endpoints:
+                lines.extend(stats.statements.lines("http_request_sql_statements", _labels(method, rule)))
+
+            lines += [
+                "# HELP http_request_db_seconds_total Time spent executing SQL per endpoint.",
+                "# TYPE http_request_db_seconds_total counter"
+            ]
+            for (method, rule), stats in endpoints:
+                lines.append(f'http_request_db_seconds_total{{{_labels(method, rule)}}} {stats.db_seconds:.6f}')
+
+            lines += [
+                "# HELP sql_statements_total SQL statements executed by this process.",
+                "# TYPE sql_statements_total counter",
+                f"sql_statements_total {self.statements_total}",
+                "# HELP sql_db_seconds_total Time spent executing SQL in this process.",
+                "# TYPE sql_db_seconds_total counter",
+                f"sql_db_seconds_total {self.db_seconds_total:.6f}"
+            ]
+
+        cache = roster_cache.stats()
+        lines += [
+            "# HELP roster_cache_requests_total Roster cache lookups by result.",
+            "# TYPE roster_cache_requests_total counter",
+            f'roster_cache_requests_total{{result="hit"}} {cache["hits"]}',
+            f'roster_cache_requests_total{{result="miss"}} {cache["misses"]}',
+            "# HELP roster_cache_evictions_total Roster snapshots evicted to stay within the row bound.",
+            "# TYPE roster_cache_evictions_total counter",
+            f"roster_cache_evictions_total {cache['evictions']}",
+            "# HELP roster_cache_rows Student rows held in the roster cache.",
+            "# TYPE roster_cache_rows gauge",
+            f"roster_cache_rows {cache['rows']}"
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method, rule):
+    rule = rule.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",endpoint="{rule}"'
+
+
+metrics = Metrics()
+
+
+def init_metrics(app, engine, slow_request_ms=0):
+    """Hook `metrics` into `app` and `engine` and add GET /metrics"""
+    event.listen(engine, "before_cursor_execute", metrics.before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", metrics.after_cursor_execute)
+    event.listen(engine, "handle_error", metrics.handle_error)
+
+    metrics.slow_request_ms = slow_request_ms
+    app.before_request(metrics.before_request)
+    app.after_request(metrics.after_request)
+
+    @app.route("/metrics", methods=["GET"])
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
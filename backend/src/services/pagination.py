@@ -0,0 +1,109 @@
+"""
+Keyset pagination and streamed JSON responses for the read endpoints
+"""
+from flask import Response, current_app, stream_with_context
+
+MAX_PAGE_SIZE = 10000
+STREAM_BATCH_SIZE = 1000
+STREAM_FORMATS = ("json", "ndjson")
+SHAPES = ("objects", "rows")
+LIST_ARGS = ("stream", "limit", "cursor", "shape")  # query arguments of the list endpoints
+
+
+def page_args(args):
+    """
+    Read `limit` and `cursor` from the query string.
+    Returns (None, None) when the client did not ask for a page.
+    """
+    limit = args.get("limit")
+    if limit is None:
+        return None, None
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit, args.get("cursor") or None
+
+
+def shape_arg(args):
+    """
+    `?shape=rows` asks for {"columns": [...], "rows": [[...], ...]}: the query
+    rows serialized as they are, instead of one object per row (the default)
+    """
+    shape = args.get("shape", "objects")
+    if shape not in SHAPES:
+        raise ValueError(f"shape must be one of: {', '.join(SHAPES)}")
+    return shape == "rows"
+
+
+def rows_payload(columns, rows, **extra):
+    return {"columns": list(columns), "rows": rows, **extra}
+
+
+def encode_cursor(*values):
+    return ":".join(str(v) for v in values)
+
+
+def decode_cursor(cursor, *types):
+    """Split a cursor produced by encode_cursor back into typed values"""
+    parts = cursor.split(":", len(types) - 1)
+    if len(parts) != len(types):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    try:
+        return tuple(t(p) for t, p in zip(types, parts))
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def next_cursor(page, limit, *keys, columns=None):
+    """
+    Cursor for the page after `page`, or None if this was the last one.
+    With `columns` the page holds rows in that column order instead of dicts.
+    """
+    if len(page) < limit:
+        return None
+    last = page[-1]
+    if columns is not None:
+        keys = [columns.index(k) for k in keys]
+    return encode_cursor(*(last[k] for k in keys))
+
+
+def stream_response(items, fmt):
+    """
+    Stream `items` (an iterator of dicts) as a JSON array or NDJSON, a batch of
+    rows per chunk, so memory stays flat whatever the row count.
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    dumps = current_app.json.dumps
+
+    def ndjson():
+        batch = []
+        for item in items:
+            batch.append(dumps(item))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield "\n".join(batch) + "\n"
+                batch = []
+        if batch:
+            yield "\n".join(batch) + "\n"
+
+    def json_array():
+        # One encoder call per batch: the batch's array without its brackets
+        yield "["
+        separator = ""
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield separator + dumps(batch)[1:-1]
+                separator = ","
+                batch = []
+        if batch:
+            yield separator + dumps(batch)[1:-1]
+        yield "]"
+
+    if fmt == "ndjson":
+        return Response(stream_with_context(ndjson()), mimetype="application/x-ndjson")
+    return Response(stream_with_context(json_array()), mimetype="application/json")
@@ -0,0 +1,140 @@
+"""
+Batch roster changes: many student adds and deletes in one transaction.
+All deletes run first as set-based statements (WHERE id IN ...), then all
+adds are admitted through the roster counter at once and inserted with a
+single executemany, so a batch costs one commit however many operations it
+carries. Every operation gets its own result; invalid ones are reported and
+skipped unless the batch is atomic, in which case nothing is applied.
+"""
+from sqlalchemy import delete
+from src.config.database import db
+from src.services.http_cache import bump_version
+from src.services.id_allocator import admit_seq, admitted_count, release_seq, format_student_id
+from src.services.roster_import import parse_bool, validate_row
+
+MAX_BATCH_OPERATIONS = 1000
+DELETE_CHUNK_SIZE = 500  # ids per IN (...) list, well below SQLite's bound-parameter limit
+BATCH_OPS = ("add", "delete")
+
+
+def atomic_arg(args):
+    """`?atomic=1`: apply the batch only if every operation succeeds"""
+    return parse_bool(args.get("atomic"), "atomic")
+
+
+def batch_operations(body):
+    """The operation list of a batch request body: an array, or {"operations": [...]}"""
+    operations = body.get("operations") if isinstance(body, dict) else body
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("Request body must be a non-empty array of operations")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+    return operations
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def delete_students(model, assignment_model, ids):
+    """
+    Delete the students `ids` of `model` with their assignments (no commit)
+    and give back their admissions. Returns the ids that were deleted; a
+    student that a concurrent request deleted first is not released twice.
+    """
+    deleted = []
+    for chunk in _chunks(list(ids), DELETE_CHUNK_SIZE):
+        # Bulk deletes skip the ORM cascade, so drop the students' assignments explicitly
+        db.session.execute(delete(assignment_model).where(assignment_model.student_id.in_(chunk)))
+        deleted += db.session.execute(delete(model).where(model.id.in_(chunk)).returning(model.id)).scalars().all()
+    if deleted:
+        release_seq(model, len(deleted))
+    return deleted
+
+
+def apply_batch(model, assignment_model, operations, capacity, atomic=False):
+    """
+    Apply add/delete `operations` to `model`'s roster in one transaction.
+    Returns (summary, added rows, deleted ids); the summary has a result per
+    operation, in request order, with an HTTP-style status.
+    """
+    results = [None] * len(operations)
+    adds, deletes = [], {}
+
+    def fail(index, op, status, error, **extra):
+        results[index] = {"index": index, "op": op, "status": status, "error": error, **extra}
+
+    for index, operation in enumerate(operations):
+        op = operation.get("op") if isinstance(operation, dict) else None
+        if op not in BATCH_OPS:
+            fail(index, op, 400, f"op must be one of: {', '.join(BATCH_OPS)}")
+        elif op == "delete":
+            student_id = operation.get("id")
+            if not isinstance(student_id, str) or not student_id:
+                fail(index, op, 400, "Missing required field: id")
+            elif student_id in deletes:
+                fail(index, op, 400, f"Student {student_id} is deleted twice", id=student_id)
+            else:
+                deletes[student_id] = index
+        else:
+            try:
+                fields = validate_row({k: v for k, v in operation.items() if k != "op"})
+                if "dorm" in model.__table__.c:
+                    # Every row of an executemany needs the same keys
+                    fields.setdefault("dorm", model.__table__.c.dorm.default.arg)
+                elif "dorm" in fields:
+                    raise ValueError("This roster has no dorms")
+            except ValueError as e:
+                fail(index, op, 400, str(e))
+                continue
+            adds.append((index, fields))
+
+    try:
+        deleted = delete_students(model, assignment_model, deletes)
+        for student_id, index in deletes.items():
+            results[index] = {"index": index, "op": "delete", "id": student_id, "status": 200}
+        for student_id in set(deletes) - set(deleted):
+            fail(deletes[student_id], "delete", 404, "Student not found", id=student_id)
+
+        first = admit_seq(model, capacity, len(adds)) if adds else None
+        if adds and first is None:
+            # Admit the adds that still fit, in request order
+            fits = max(capacity - admitted_count(model), 0)
+            for index, _ in adds[fits:]:
+                fail(index, "add", 400, f"Maximum {capacity} students allowed")
+            del adds[fits:]
+            first = admit_seq(model, capacity, len(adds)) if adds else None
+            if first is None:
+                for index, _ in adds:
+                    fail(index, "add", 400, f"Maximum {capacity} students allowed")
+                adds = []
+        rows = [
+            {"id": format_student_id(first + offset), "seq": first + offset, **fields}
+            for offset, (_, fields) in enumerate(adds)
+        ]
+        if rows:
+            db.session.execute(model.__table__.insert(), rows)
+        for (index, _), row in zip(adds, rows):
+            results[index] = {"index": index, "op": "add", "id": row["id"], "status": 201}
+
+        failed = sum(result["status"] >= 400 for result in results)
+        if atomic and failed:
+            db.session.rollback()
+            for result in results:
+                if result["status"] < 400:
+                    if result["op"] == "add":
+                        del result["id"]  # never created
+                    result.update(status=424, error="Not applied: another operation in the atomic batch failed")
+            return {"applied": False, "added": 0, "deleted": 0, "failed": failed, "results": results}, [], []
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if deleted:
+        bump_version(model, assignment_model)
+    elif rows:
+        bump_version(model)
+    summary = {"applied": True, "added": len(rows), "deleted": len(deleted), "failed": failed, "results": results}
+    return summary, rows, deleted
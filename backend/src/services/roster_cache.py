@@ -0,0 +1,88 @@
+"""
+In-process roster cache.
+Roster reads (the student list, lottery applicants) are served from
+snapshots tagged with the dataset version they were loaded at. Every roster
+write bumps that version (bump_version), which invalidates the snapshots:
+the first read after a write reloads, every other read reuses. With
+SHARED_VERSIONS the version is synced from the dataset_versions table, so a
+write in one worker process invalidates the snapshots of all of them.
+
+Snapshots are tuples shared between threads and must be treated as
+read-only. The cache is an LRU bounded by the total number of rows held.
+"""
+import threading
+from collections import OrderedDict
+from src.config.settings import settings
+from src.services.http_cache import versions
+
+
+class RosterCache:
+    """Read-through LRU of roster snapshots keyed by (dataset, view), valid for one dataset version"""
+
+    def __init__(self, max_rows):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (dataset, view) -> (version, snapshot, rows)
+        self._rows = 0
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model, view, load, size=len):
+        """
+        Snapshot `view` of `model`'s roster: cached if no write happened since
+        it was loaded, else `load()` (turned into a tuple). `size(snapshot)`
+        is the number of rows it counts against the bound.
+        """
+        if self.max_rows <= 0:
+            return tuple(load())
+        dataset = model.__tablename__
+        versions.sync((dataset,))
+        # Read before loading, so a write racing the load can only make the snapshot look older
+        version = versions.current(dataset)
+        key = (dataset, view)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        snapshot = tuple(load())
+        self._put(key, version, snapshot, size(snapshot))
+        return snapshot
+
+    def _put(self, key, version, snapshot, rows):
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None:
+                if old[0] > version:
+                    return  # a concurrent reader already stored a newer snapshot
+                del self._entries[key]
+                self._rows -= old[2]
+            if rows > self.max_rows:
+                return
+            self._entries[key] = (version, snapshot, rows)
+            self._rows += rows
+            while self._rows > self.max_rows:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._rows -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+roster_cache = RosterCache(settings.ROSTER_CACHE_MAX_ROWS)
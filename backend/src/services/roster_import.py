@@ -0,0 +1,188 @@
+"""
+Streaming bulk roster import (CSV or NDJSON).
+The upload is parsed line by line from the request stream, validated row by
+row and inserted in batched transactions, so memory depends on the batch
+size rather than the file size. Bad rows are reported and skipped; they
+never abort the import.
+"""
+import codecs
+import csv
+import json
+from src.config.database import db
+from src.engine.matching import PREFERENCE_FIELDS, PREFERENCE_MIN, PREFERENCE_MAX
+from src.services.http_cache import bump_version
+from src.services.id_allocator import admit_seq, admitted_count, format_student_id
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+IMPORT_FORMATS = {
+    "csv": "csv",
+    "text/csv": "csv",
+    "ndjson": "ndjson",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson"
+}
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+FALSE_VALUES = {"", "0", "false", "no", "n", "f"}
+
+
+def import_format(fmt, mimetype):
+    """Resolve the upload format from ?format= or the request Content-Type"""
+    resolved = IMPORT_FORMATS.get((fmt or mimetype or "").lower())
+    if not resolved:
+        raise ValueError("Upload must be CSV (text/csv) or NDJSON (application/x-ndjson)")
+    return resolved
+
+
+def parse_bool(value, field):
+    if isinstance(value, bool) or value is None:
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid boolean for {field}: {value}")
+
+
+def parse_preferences(record):
+    """Roommate preference answers from a record; every field is present, None if unanswered"""
+    preferences = {}
+    for field in PREFERENCE_FIELDS:
+        value = record.get(field)
+        if value in (None, ""):
+            preferences[field] = None
+            continue
+        try:
+            number = int(str(value).strip())
+        except ValueError:
+            raise ValueError(f"Invalid {field}: {value}")
+        if not PREFERENCE_MIN <= number <= PREFERENCE_MAX:
+            raise ValueError(f"{field} must be between {PREFERENCE_MIN} and {PREFERENCE_MAX}, got {number}")
+        preferences[field] = number
+    return preferences
+
+
+def validate_row(record):
+    """Turn one uploaded record into student fields, raising ValueError on bad input"""
+    if not isinstance(record, dict):
+        raise ValueError("Row must be an object")
+    name = str(record.get("name") or "").strip()
+    if not name:
+        raise ValueError("Missing required field: name")
+    if len(name) > 100:
+        raise ValueError("name must be at most 100 characters")
+    if record.get("gpa") in (None, ""):
+        raise ValueError("Missing required field: gpa")
+    try:
+        gpa = float(record["gpa"])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid gpa: {record['gpa']}")
+    if not 0.0 <= gpa <= 5.0:
+        raise ValueError(f"gpa must be between 0.0 and 5.0, got {gpa}")
+    fields = {
+        "name": name,
+        "gpa": gpa,
+        "corruption": parse_bool(record.get("corruption"), "corruption"),
+        "disabled": parse_bool(record.get("disabled"), "disabled"),
+        **parse_preferences(record)
+    }
+    dorm = str(record.get("dorm") or "").strip()
+    if dorm:
+        if len(dorm) > 50:
+            raise ValueError("dorm must be at most 50 characters")
+        fields["dorm"] = dorm
+    return fields
+
+
+def _records(stream, fmt):
+    """Yield (line_number, record or exception) pairs from the upload"""
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            if None in record:
+                yield reader.line_num, ValueError("Row has more columns than the header")
+            else:
+                yield reader.line_num, record
+        return
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, ValueError("Invalid JSON")
+
+
+def import_roster(model, stream, fmt, capacity):
+    """
+    Import students into `model`'s table from `stream`.
+    Rows past `capacity` are rejected like any other bad row; every batch is
+    admitted through the roster counter, so registrations running at the
+    same time can never push the roster past it either.
+    """
+    summary = {"imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    available = capacity - admitted_count(model)
+    batch = []
+
+    def fail(line_number, message):
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line_number, "error": message})
+        else:
+            summary["errors_truncated"] = True
+
+    def flush():
+        try:
+            first = admit_seq(model, capacity, len(batch))
+            if first is None:
+                # Others registered meanwhile: admit what still fits, reject the rest
+                fits = max(capacity - admitted_count(model), 0)
+                for line_number, _ in batch[fits:]:
+                    fail(line_number, f"Maximum {capacity} students allowed")
+                del batch[fits:]
+                first = admit_seq(model, capacity, len(batch)) if batch else None
+                if first is None:
+                    for line_number, _ in batch:
+                        fail(line_number, f"Maximum {capacity} students allowed")
+                    db.session.rollback()
+                    batch.clear()
+                    return
+            rows = []
+            for offset, (_, fields) in enumerate(batch):
+                rows.append({"id": format_student_id(first + offset), "seq": first + offset, **fields})
+            db.session.execute(model.__table__.insert(), rows)
+            db.session.commit()
+            bump_version(model)
+            summary["imported"] += len(rows)
+        except Exception as e:
+            db.session.rollback()
+            for line_number, _ in batch:
+                fail(line_number, f"Failed to insert: {str(e)}")
+        batch.clear()
+
+    for line_number, record in _records(stream, fmt):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            fields = validate_row(record)
+            if "dorm" in model.__table__.c:
+                # Every row of an executemany needs the same keys
+                fields.setdefault("dorm", model.__table__.c.dorm.default.arg)
+            elif "dorm" in fields:
+                raise ValueError("This roster has no dorms")
+        except ValueError as e:
+            fail(line_number, str(e))
+            continue
+        if summary["imported"] + len(batch) >= available:
+            fail(line_number, f"Maximum {capacity} students allowed")
+            continue
+        batch.append((line_number, fields))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush()
+
+    if batch:
+        flush()
+    return summary
@@ -0,0 +1,242 @@
+"""
+Incremental repair of the published lottery run after a roster change.
+Re-running the lottery reshuffles everyone and rewrites every row; a repair
+applies the allocation policy to just the beds a change touches and updates
+the published run's rows in place:
+- a departure frees a bed: a premium bed goes to a corrupt student (any
+  student in a double if none is left), a single to a disabled student when
+  a disabled student left, otherwise to the top GPA student in a double;
+  a double leaves the roommate alone, who is paired with the most
+  compatible other lone student
+- a promotion frees the promoted student's old bed, which is repaired the
+  same way (premium -> single -> double, so a handful of moves at most)
+- an arrival takes a free premium or single room, else joins the most
+  compatible lone student in a double, else an empty double room
+Every step is an indexed lookup plus single-row writes, so the cost follows
+the size of the change rather than the roster. Only runs drawn from room
+counts can be repaired; multi-dorm and rooms-table runs have to be re-run.
+"""
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import aliased
+from src.config.database import db
+from src.engine import LotteryConfig, PREFERENCE_FIELDS, load_config, preference_distance, preference_vector
+from src.models.assignment import LONE_DOUBLE
+from src.models.lottery_run import LotteryRun
+from src.services.assignment_store import published_run_id
+from src.services.roster_import import parse_bool
+
+PREMIUM, SINGLE, DOUBLE = "premium", "single", "double"
+# Lone students considered when pairing; a repaired run rarely has more than one
+MAX_LONE_CANDIDATES = 64
+
+
+def _preferences(row):
+    return preference_vector(getattr(row, field) for field in PREFERENCE_FIELDS)
+
+
+def repair_arg(args):
+    """`?repair=1/0` on a roster change; None (absent) means the REPAIR_ON_ROSTER_CHANGE default"""
+    value = args.get("repair")
+    return None if value is None else parse_bool(value, "repair")
+
+
+class RosterRepair:
+    """One repair of the published run of `model` (no commit; the caller's transaction)"""
+
+    def __init__(self, model, student_model, run, config):
+        self.model = model
+        self.student_model = student_model
+        self.run = run
+        self.config = config
+        self.moves = []
+        self.rows_written = 0
+
+    @classmethod
+    def for_published(cls, model, student_model):
+        """Repair of the published run, or None if there is none or it was not drawn from room counts"""
+        run = db.session.execute(
+            select(LotteryRun).where(LotteryRun.id == published_run_id(model))
+        ).scalar_one_or_none()
+        if run is None or not run.config:
+            return None
+        try:
+            config = load_config(run.config)
+        except (TypeError, ValueError):
+            return None  # per-dorm room counts
+        if not isinstance(config, LotteryConfig):
+            return None
+        return cls(model, student_model, run, config)
+
+    def summary(self):
+        return {"run_id": self.run.id, "rows_written": self.rows_written, "moves": self.moves}
+
+    # Lookups
+
+    def _placements(self, *columns):
+        A, S = self.model, self.student_model
+        return select(A.id, A.student_id, A.room_number, A.room_type, A.roommate_id, *columns).join(
+            S, S.id == A.student_id
+        ).where(A.run_id == self.run.id)
+
+    def placement(self, student_id):
+        return db.session.execute(
+            self._placements(self.student_model.disabled).where(self.model.student_id == student_id)
+        ).first()
+
+    def _pick(self, *conditions, room_types=(DOUBLE,), order_by=None):
+        """
+        Placement of the first student (by `order_by`, then id) matching
+        `conditions` and placed in one of `room_types`. Walks the students
+        index and probes the run per student, so it stops at the first hit
+        instead of sorting the run.
+        """
+        A, S = self.model, self.student_model
+        placed = select(A.id).where(
+            A.run_id == self.run.id, A.student_id == S.id, A.room_type.in_(room_types)
+        ).exists()
+        order = (order_by, S.seq) if order_by is not None else (S.seq,)
+        student_id = db.session.execute(
+            select(S.id).where(placed, *conditions).order_by(*order).limit(1)
+        ).scalar()
+        return self.placement(student_id) if student_id is not None else None
+
+    def _lone(self, exclude=None, limit=MAX_LONE_CANDIDATES):
+        S = self.student_model
+        columns = [S.disabled] + [getattr(S, field) for field in PREFERENCE_FIELDS]
+        query = self._placements(*columns).where(db.text(LONE_DOUBLE))
+        if exclude is not None:
+            query = query.where(self.model.student_id != exclude)
+        return db.session.execute(query.order_by(self.model.student_id).limit(limit)).all()
+
+    def _rooms(self, room_type):
+        """First and last room number of `room_type`, in `allocate`'s numbering"""
+        c = self.config
+        first = {PREMIUM: 1, SINGLE: c.premium_rooms + 1, DOUBLE: c.premium_rooms + c.single_rooms + 1}[room_type]
+        count = {PREMIUM: c.premium_rooms, SINGLE: c.single_rooms, DOUBLE: c.double_rooms}[room_type]
+        return first, first + count - 1
+
+    def _free_room(self, room_type):
+        """An empty room of `room_type`: past the highest one in use, else the first gap"""
+        first, last = self._rooms(room_type)
+        if last < first:
+            return None
+        A = self.model
+        in_range = (A.run_id == self.run.id, A.room_number.between(first, last))
+        top = db.session.execute(select(func.max(A.room_number)).where(*in_range)).scalar()
+        if top is None:
+            return first
+        if top < last:
+            return top + 1
+        if db.session.execute(select(A.id).where(A.run_id == self.run.id, A.room_number == first).limit(1)).first() is None:
+            return first
+        # Walk the (run_id, room_number) index to the first used room whose next room is empty
+        B = aliased(A)
+        next_free = ~exists().where(B.run_id == self.run.id, B.room_number == A.room_number + 1)
+        return db.session.execute(
+            select(A.room_number + 1)
+            .where(A.run_id == self.run.id, A.room_number.between(first, last - 1), next_free)
+            .order_by(A.room_number)
+            .limit(1)
+        ).scalar()
+
+    # Writes
+
+    def _update(self, row_id, **values):
+        db.session.execute(self.model.__table__.update().where(self.model.id == row_id).values(**values))
+        self.rows_written += 1
+
+    def _move(self, row, room_number, room_type, roommate_id=None):
+        """Move a placed student to another bed, then repair the bed they left"""
+        self._update(row.id, room_number=room_number, room_type=room_type, roommate_id=roommate_id)
+        self.moves.append({
+            "student_id": row.student_id,
+            "from": {"room_type": row.room_type, "room_number": row.room_number},
+            "to": {"room_type": room_type, "room_number": room_number}
+        })
+        self.vacate(row, bool(row.disabled))
+
+    def vacate(self, row, disabled=False):
+        """Give the bed `row` no longer holds to the student the policy picks next"""
+        S = self.student_model
+        if row.room_type == PREMIUM:
+            # Corrupt students first, then a student alone in a double, then anyone in a double
+            candidate = self._pick(S.corruption.is_(True), room_types=(SINGLE, DOUBLE))
+            if candidate is None:
+                lone = self._lone(limit=1)
+                candidate = lone[0] if lone else self._pick()
+            if candidate:
+                self._move(candidate, row.room_number, PREMIUM)
+        elif row.room_type == SINGLE:
+            candidate = (
+                (disabled and self._pick(S.disabled.is_(True)))
+                or self._pick(order_by=S.gpa.desc())
+            )
+            if candidate:
+                self._move(candidate, row.room_number, SINGLE)
+        elif row.roommate_id:
+            mate = self.placement(row.roommate_id)
+            if mate and mate.roommate_id == row.student_id:
+                self._update(mate.id, roommate_id=None)
+                self.pair(mate)
+
+    def pair(self, lone):
+        """Move the most compatible other lone student in with `lone`"""
+        others = self._lone(exclude=lone.student_id)
+        if not others:
+            return
+        prefs = self._student_preferences(lone.student_id)
+        partner = min(others, key=lambda r: preference_distance(prefs, _preferences(r)))
+        self._update(lone.id, roommate_id=partner.student_id)
+        self._update(partner.id, room_number=lone.room_number, roommate_id=lone.student_id)
+        self.moves.append({
+            "student_id": partner.student_id,
+            "from": {"room_type": DOUBLE, "room_number": partner.room_number},
+            "to": {"room_type": DOUBLE, "room_number": lone.room_number}
+        })
+
+    def _student_preferences(self, student_id):
+        S = self.student_model
+        return preference_vector(db.session.execute(
+            select(*(getattr(S, field) for field in PREFERENCE_FIELDS)).where(S.id == student_id)
+        ).one())
+
+    def _insert(self, student_id, room_number, room_type, roommate_id=None):
+        db.session.execute(self.model.__table__.insert().values(
+            run_id=self.run.id, student_id=student_id, room_number=room_number,
+            room_type=room_type, roommate_id=roommate_id
+        ))
+        self.rows_written += 1
+        self.moves.append({"student_id": student_id, "from": None, "to": {"room_type": room_type, "room_number": room_number}})
+
+    # Roster changes
+
+    def departed(self, row, disabled=False):
+        """Repair after the student of `row` left (their rows already deleted)"""
+        self.vacate(row, disabled)
+        self._count(-1)
+
+    def arrived(self, student_id):
+        """Place a student who joined after the run"""
+        for room_type in (PREMIUM, SINGLE):
+            room = self._free_room(room_type)
+            if room is not None:
+                self._insert(student_id, room, room_type)
+                return self._count(1)
+        lone = self._lone(exclude=student_id)
+        if lone:
+            prefs = self._student_preferences(student_id)
+            partner = min(lone, key=lambda r: preference_distance(prefs, _preferences(r)))
+            self._insert(student_id, partner.room_number, DOUBLE, partner.student_id)
+            self._update(partner.id, roommate_id=student_id)
+            return self._count(1)
+        room = self._free_room(DOUBLE)
+        if room is None:
+            raise ValueError(f"Run {self.run.id} has no free bed left; rerun the lottery")
+        self._insert(student_id, room, DOUBLE)
+        self._count(1)
+
+    def _count(self, delta):
+        db.session.execute(LotteryRun.__table__.update().where(LotteryRun.id == self.run.id).values(
+            total_students=LotteryRun.total_students + delta,
+            repairs=LotteryRun.repairs + 1
+        ))
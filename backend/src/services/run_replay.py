@@ -0,0 +1,176 @@
+"""
+Run history, replay and verification.
+Archived runs keep no assignment rows, only their seed, policy version,
+room counts, roster digest and a compressed roster snapshot. Their
+assignments are re-materialized on demand by re-running the seeded
+allocation over the current roster while it still hashes to the stored
+digest, else over the snapshot (runs on a rooms table also need the same
+rooms). Runs without a snapshot need an unchanged roster.
+Replayed runs never change, so the last few are kept in memory.
+"""
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+from sqlalchemy import select
+from src.config.database import db
+from src.config.settings import settings
+from src.engine import (
+    POLICY_VERSION, LotteryConfig, Placement, load_config, roster_digest, seeded_allocate,
+    rosters_digest, allocate_dorms, load_dorm_configs, rooms_digest, load_roster, load_rosters as parse_rosters
+)
+from src.models.lottery_run import LotteryRun
+
+MAX_REPLAYED_RUNS = 4
+
+_order = attrgetter("room_number", "student_id")
+
+
+class ReplayCache:
+    """Small LRU of replayed placements keyed by (dataset, run id)"""
+
+    def __init__(self, max_entries=MAX_REPLAYED_RUNS):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_entries = max_entries
+
+    def get(self, key):
+        with self._lock:
+            placements = self._entries.get(key)
+            if placements is not None:
+                self._entries.move_to_end(key)
+            return placements
+
+    def put(self, key, placements):
+        with self._lock:
+            self._entries[key] = placements
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+replay_cache = ReplayCache()
+
+
+def list_runs(model):
+    """Run records of `model`'s dataset, newest first"""
+    runs = db.session.execute(
+        select(LotteryRun).where(LotteryRun.dataset == model.__tablename__).order_by(LotteryRun.id.desc())
+    ).scalars()
+    return [run.to_dict() for run in runs]
+
+
+def _get_run(model, run_id):
+    run = db.session.get(LotteryRun, run_id)
+    return run if run is not None and run.dataset == model.__tablename__ else None
+
+
+def _stored_placements(model, run_id):
+    columns = [model.__table__.c[name] for name in Placement._fields if name in model.__table__.c]
+    rows = db.session.execute(
+        select(*columns)
+        .where(model.run_id == run_id)
+        .order_by(model.room_number, model.student_id)
+    )
+    return [Placement(*row) for row in rows]
+
+
+def _resolve_inventory(run, inventory, load_rooms):
+    """Room counts as stored, or the current rooms of a dorm if they still match the run's digest"""
+    if isinstance(inventory, LotteryConfig):
+        return inventory
+    rooms = load_rooms(inventory["dorm"]) if load_rooms else None
+    if rooms is None or rooms_digest(rooms) != inventory["rooms_digest"]:
+        raise ValueError(f"The room inventory changed since run {run.id}; it can no longer be replayed")
+    return rooms
+
+
+def replay_run(model, run, load_applicants, load_rosters=None, load_rooms=None):
+    """
+    Re-run the seeded allocation of `run` over the roster from
+    `load_applicants()`, or the per-dorm rosters from `load_rosters()` for a
+    multi-dorm run; `load_rooms(dorm)` supplies rooms tables. Raises
+    ValueError if the run cannot be reproduced.
+    """
+    key = (model.__tablename__, run.id)
+    placements = replay_cache.get(key)
+    if placements is not None:
+        return placements
+
+    if run.seed is None or run.config is None:
+        raise ValueError(f"Run {run.id} predates seeded runs and cannot be replayed")
+    if run.policy_version != POLICY_VERSION:
+        raise ValueError(
+            f"Run {run.id} used allocation policy v{run.policy_version}, this server runs v{POLICY_VERSION}"
+        )
+    if run.repairs:
+        raise ValueError(f"Run {run.id} was repaired in place and no longer matches its seed")
+    dorm_configs = load_dorm_configs(run.config)
+    if dorm_configs is not None and load_rosters is None:
+        raise ValueError(f"Run {run.id} is a multi-dorm run and cannot be replayed here")
+    if dorm_configs is None:
+        applicants = load_applicants()
+        digest = roster_digest(applicants)
+    else:
+        rosters = load_rosters()
+        digest = rosters_digest(rosters)
+    if digest != run.roster_digest:
+        if run.roster is None:
+            raise ValueError(f"The roster changed since run {run.id} and it has no roster snapshot to replay from")
+        if dorm_configs is None:
+            applicants = load_roster(run.roster)
+            digest = roster_digest(applicants)
+        else:
+            rosters = parse_rosters(run.roster)
+            digest = rosters_digest(rosters)
+        if digest != run.roster_digest:
+            raise ValueError(f"The roster snapshot of run {run.id} does not match its digest")
+
+    if dorm_configs is None:
+        inventory = _resolve_inventory(run, load_config(run.config), load_rooms)
+        placements = seeded_allocate(applicants, inventory, run.seed)
+    else:
+        dorm_configs = {dorm: _resolve_inventory(run, c, load_rooms) for dorm, c in dorm_configs.items()}
+        by_dorm = allocate_dorms(rosters, dorm_configs, run.seed, settings.DORM_LOTTERY_WORKERS or None)
+        placements = [p for dorm in by_dorm for p in by_dorm[dorm]]
+    placements = sorted(placements, key=_order)
+    replay_cache.put(key, placements)
+    return placements
+
+
+def run_assignments(model, run_id, load_applicants, load_rosters=None, load_rooms=None):
+    """
+    Assignments of one run: the stored rows while the run is within retention,
+    replayed otherwise. Returns None if there is no such run.
+    """
+    run = _get_run(model, run_id)
+    if run is None:
+        return None
+    placements = None
+    if run.status != "archived":
+        placements = _stored_placements(model, run_id)
+    if not placements:
+        placements = replay_run(model, run, load_applicants, load_rosters, load_rooms)
+    return {**run.to_dict(), "assignments": [p._asdict() for p in placements]}
+
+
+def verify_run(model, run_id, load_applicants, load_rosters=None, load_rooms=None):
+    """
+    Replay `run_id` and compare it with its stored rows, if it still has any.
+    Returns None if there is no such run.
+    """
+    run = _get_run(model, run_id)
+    if run is None:
+        return None
+    replayed = replay_run(model, run, load_applicants, load_rosters, load_rooms)
+    stored = _stored_placements(model, run_id) if run.status != "archived" else []
+    return {
+        "run_id": run.id,
+        "roster_digest": run.roster_digest,
+        "replayed_students": len(replayed),
+        "stored_rows": len(stored),
+        "verified": replayed == stored if stored else None
+    }
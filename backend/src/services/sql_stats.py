@@ -0,0 +1,34 @@
+"""
+SQL statement counting via SQLAlchemy cursor events
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+from src.config.database import db
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_statements(engine=None):
+    """
+    Count statements sent to the database inside the block:
+
+        with count_statements() as counter:
+            get_assignments()
+        assert counter.count == 1
+    """
+    engine = engine or db.engine
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
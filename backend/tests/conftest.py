@@ -0,0 +1,57 @@
+"""
+Shared fixtures: one app per test session on a throwaway SQLite file, every
+roster cleared before each test
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Settings are read when src is first imported, so the environment comes first
+DB_PATH = tempfile.mktemp(prefix='test-', suffix='.db')
+os.environ.update({
+    'LOAD_DOTENV': 'False',
+    'DB_PATH': DB_PATH,
+    'DB_PROFILE': 'production',  # WAL + busy_timeout, so concurrent writers queue up
+    'REPAIR_ON_ROSTER_CHANGE': 'False',
+    'LOTTERY_RUN_RETENTION': '2'
+})
+
+
+@pytest.fixture(scope='session')
+def app():
+    from src.app import create_app
+    app = create_app()
+    yield app
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+
+
+@pytest.fixture
+def client(app):
+    """A test client inside an app context, with both rosters empty"""
+    from src.controllers import lottery, realtime
+    with app.app_context():
+        lottery.clear_all_students()
+        realtime.clear_all_students()
+        yield app.test_client()
+
+
+def add_students(client, n, dataset='preData'):
+    """Add `n` students through batchStudents; returns their ids"""
+    ids = []
+    for start in range(0, n, 1000):
+        response = client.post(f'/api/{dataset}/batchStudents', json=[
+            {'op': 'add', 'name': f'Student {i}', 'gpa': round(2 + (i % 20) / 10, 1), 'corruption': i % 7 == 0,
+             'disabled': i % 11 == 0, 'sleep_schedule': 1 + i % 5}
+            for i in range(start, min(n, start + 1000))
+        ])
+        assert response.status_code == 200, response.get_json()
+        ids += [r['id'] for r in response.get_json()['results']]
+    return ids
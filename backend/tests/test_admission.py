@@ -0,0 +1,68 @@
+"""
+Roster capacity is enforced exactly, also under concurrent writers
+"""
+import threading
+
+import pytest
+
+from src.controllers import realtime
+from src.engine import realtime_config
+from src.models import RealtimeStudent
+from src.services import admitted_count
+from tests.conftest import add_students
+
+CAPACITY = realtime_config().capacity
+
+
+def race(app, threads, fn):
+    """Run `fn()` in `threads` threads released at once; returns their results (exceptions included)"""
+    results = []
+    barrier = threading.Barrier(threads)
+
+    def run():
+        with app.app_context():
+            barrier.wait()
+            try:
+                results.append(fn())
+            except Exception as e:
+                results.append(e)
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return results
+
+
+def test_add_beyond_capacity_is_rejected(client):
+    add_students(client, CAPACITY, 'realtime')
+    with pytest.raises(ValueError):
+        realtime.add_student(name='One Too Many', gpa=3.0)
+    assert RealtimeStudent.query.count() == CAPACITY
+
+
+def test_batch_admits_only_what_fits(client):
+    add_students(client, CAPACITY - 2, 'realtime')
+    summary = realtime.batch_students([{'op': 'add', 'name': f'S{i}', 'gpa': 3.0} for i in range(4)])
+    assert [r['status'] for r in summary['results']] == [201, 201, 400, 400]
+    assert RealtimeStudent.query.count() == admitted_count(RealtimeStudent) == CAPACITY
+
+
+def test_concurrent_adds_admit_exactly_the_capacity(app, client):
+    results = race(app, CAPACITY * 3, lambda: realtime.add_student(name='Racer', gpa=3.0)[0])
+    admitted = [r for r in results if isinstance(r, str)]
+    assert len(admitted) == len(set(admitted)) == CAPACITY
+    assert all(isinstance(r, ValueError) for r in results if not isinstance(r, str))
+    assert RealtimeStudent.query.count() == admitted_count(RealtimeStudent) == CAPACITY
+
+
+def test_concurrent_deletes_release_one_admission(app, client):
+    student_id = add_students(client, CAPACITY, 'realtime')[0]
+    results = race(app, 6, lambda: realtime.delete_student(student_id)[0])
+    assert results.count(True) == 1
+    assert RealtimeStudent.query.count() == admitted_count(RealtimeStudent) == CAPACITY - 1
+
+    realtime.add_student(name='Refill', gpa=3.0)
+    with pytest.raises(ValueError):
+        realtime.add_student(name='One Too Many', gpa=3.0)
@@ -0,0 +1,89 @@
+"""
+Publishing a run is all-or-nothing, and archived runs replay to the
+assignments they were published with
+"""
+import sys
+
+import pytest
+
+from src.controllers import lottery
+from src.models import Student
+from src.models.lottery_run import LotteryRun
+from src.services import response_cache
+from tests.conftest import add_students
+
+ROOMS = {'premium_rooms': 2, 'single_rooms': 6, 'double_rooms': 20}
+store = sys.modules['src.services.assignment_store']
+
+
+def published():
+    return lottery.get_assignments()
+
+
+def test_failed_insert_leaves_the_published_run(client, monkeypatch):
+    add_students(client, 30)
+    run_id = lottery.run_lottery(ROOMS)['run_id']
+    before, runs = published(), LotteryRun.query.count()
+
+    insert = store.insert_assignments
+
+    def half_then_fail(model, placements, new_run_id):
+        insert(model, placements[:len(placements) // 2], new_run_id)
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(store, 'insert_assignments', half_then_fail)
+    with pytest.raises(RuntimeError):
+        lottery.run_lottery(ROOMS)
+
+    assert published() == before
+    assert LotteryRun.query.count() == runs
+    assert lottery.get_runs()[0]['id'] == run_id
+
+
+def test_failed_publish_leaves_the_published_run(client, monkeypatch):
+    add_students(client, 30)
+    lottery.run_lottery(ROOMS)
+    before = published()
+
+    def fail(model, run_id):
+        raise RuntimeError('lost the lock')
+
+    monkeypatch.setattr(store, 'publish_run', fail)
+    with pytest.raises(RuntimeError):
+        lottery.run_lottery(ROOMS)
+    assert published() == before
+
+
+def test_verify_matches_the_stored_rows(client):
+    add_students(client, 30)
+    run_id = lottery.run_lottery(ROOMS)['run_id']
+    result = lottery.verify_lottery_run(run_id)
+    assert result['verified'] is True
+    assert result['replayed_students'] == result['stored_rows'] == 30
+
+
+def test_archived_run_replays_after_roster_changes(client):
+    ids = add_students(client, 30)
+    run_id = lottery.run_lottery(ROOMS)['run_id']
+    original = lottery.get_run_assignments(run_id)['assignments']
+    for _ in range(2):  # LOTTERY_RUN_RETENTION=2 archives the first run
+        lottery.run_lottery(ROOMS)
+    lottery.delete_student(ids[0])
+    lottery.add_student(name='Newcomer', gpa=3.3)
+
+    replayed = lottery.get_run_assignments(run_id)
+    assert replayed['status'] == 'archived'
+    assert replayed['assignments'] == original
+    assert lottery.verify_lottery_run(run_id)['replayed_students'] == 30
+
+
+def test_repaired_run_is_not_replayed(client):
+    ids = add_students(client, 30)
+    run_id = lottery.run_lottery(ROOMS)['run_id']
+    lottery.delete_student(ids[0], repair=True)
+    response_cache.clear()
+
+    response = client.get(f'/api/preData/runs/{run_id}/verify')
+    assert response.status_code == 409
+    assert 'repaired' in response.get_json()['error']
+    assert Student.query.count() == 29
@@ -0,0 +1,55 @@
+"""
+A database left by an older version is upgraded in place on start-up, or
+refused with the recreate step when it cannot be
+"""
+import sqlite3
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine
+
+import src.models  # noqa: F401 - registers the tables on db.metadata
+from src.config.database import db, upgrade_schema
+
+# The tables as the first release created them
+BASELINE_DDL = """
+CREATE TABLE students (id VARCHAR(50) PRIMARY KEY, name VARCHAR(100) NOT NULL, gpa FLOAT NOT NULL,
+                       corruption BOOLEAN, disabled BOOLEAN);
+CREATE TABLE assignments (id INTEGER PRIMARY KEY, student_id VARCHAR(50) NOT NULL REFERENCES students (id),
+                          room_number INTEGER NOT NULL, room_type VARCHAR(20) NOT NULL, roommate_id VARCHAR(50));
+INSERT INTO students VALUES ('stu-007', 'A', 3.5, 0, 0), ('stu-1200', 'B', 2.0, 1, 0);
+INSERT INTO assignments VALUES (1, 'stu-007', 1, 'premium', NULL);
+"""
+
+
+def test_baseline_database_is_upgraded(tmp_path):
+    path = tmp_path / 'baseline.db'
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_DDL)
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+
+    assert upgrade_schema(engine, db.metadata) == {}
+
+    with engine.connect() as conn:
+        students = conn.exec_driver_sql("SELECT id, seq, dorm FROM students ORDER BY seq").all()
+        assignments = conn.exec_driver_sql("SELECT COUNT(*) FROM assignments").scalar()
+        indexes = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert students == [('stu-007', 7, 'main'), ('stu-1200', 1200, 'main')]
+    assert assignments == 0  # rebuilt by the next lottery run
+    assert {'ix_students_dorm_seq', 'ix_assignments_run_student', 'uq_students_seq'} <= indexes
+    engine.dispose()
+
+
+def test_unupgradable_database_is_left_alone(tmp_path):
+    path = tmp_path / 'old.db'
+    with sqlite3.connect(path) as conn:
+        conn.executescript("CREATE TABLE things (id INTEGER PRIMARY KEY); INSERT INTO things VALUES (1);")
+    metadata = MetaData()
+    Table('things', metadata, Column('id', Integer, primary_key=True), Column('kind', String, nullable=False))
+    engine = create_engine(f'sqlite:///{path}')
+
+    assert upgrade_schema(engine, metadata) == {'things': ['kind']}
+
+    with engine.connect() as conn:
+        assert [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(things)")] == ['id']
+    engine.dispose()
+
@@ -0,0 +1,72 @@
+"""
+Hot paths issue the same number of SQL statements at any roster size
+"""
+import pytest
+
+from src.controllers import lottery
+from src.services import count_statements, response_cache, roster_cache
+from tests.conftest import add_students
+
+SIZES = (10, 80)
+ROOMS = {'premium_rooms': 2, 'single_rooms': 6, 'double_rooms': 40}
+
+
+def statements(fn):
+    with count_statements() as counter:
+        fn()
+    return counter.count
+
+
+def counts_at(client, size):
+    add_students(client, size - 1)
+    counts = {'add_student': statements(lambda: lottery.add_student(name='New Student', gpa=3.1))}
+    lottery.run_lottery(ROOMS)
+    roster_cache.clear()
+    counts['fetch_all_students'] = statements(lottery.fetch_all_students)
+    counts['fetch_students_page'] = statements(lambda: lottery.fetch_all_students(limit=5))
+    counts['get_assignments'] = statements(lottery.get_assignments)
+    counts['get_assignments_page'] = statements(lambda: lottery.get_assignments(limit=5))
+    counts['get_assignment_rows'] = statements(lottery.get_assignment_rows)
+    return counts
+
+
+@pytest.fixture
+def by_size(client):
+    counts = {}
+    for size in SIZES:
+        lottery.clear_all_students()
+        counts[size] = counts_at(client, size)
+    return counts
+
+
+def test_counts_do_not_grow_with_the_roster(by_size):
+    small, large = (by_size[size] for size in SIZES)
+    assert small == large
+
+
+def test_reads_are_one_statement(by_size):
+    for op in ('fetch_all_students', 'fetch_students_page', 'get_assignments', 'get_assignments_page',
+               'get_assignment_rows'):
+        assert by_size[SIZES[-1]][op] == 1, op
+
+
+def test_cached_reads_skip_the_database(client):
+    add_students(client, 20)
+    lottery.fetch_all_students()
+    assert statements(lottery.fetch_all_students) == 0
+
+
+def test_unchanged_etag_is_a_304(client):
+    add_students(client, 20)
+    lottery.run_lottery(ROOMS)
+    response_cache.clear()
+    first = client.get('/api/preData/assignments')
+    assert first.status_code == 200
+    with count_statements() as counter:
+        again = client.get('/api/preData/assignments', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert counter.count == 0
+
+    lottery.add_student(name='Late Student', gpa=3.0)
+    stale = client.get('/api/preData/students', headers={'If-None-Match': first.headers['ETag']})
+    assert stale.status_code == 200